@@ -1,37 +1,132 @@
 import os
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_login import LoginManager
-from backend.models import db, User
+from werkzeug.middleware.proxy_fix import ProxyFix
+from backend.models import db
 from backend.routes import api
+from backend.services.cache import user_cache
+from backend.commands import register_commands
+from backend import metrics, migrations, passwords, profiling, sqlite_profile
 
-def create_app():
+def engine_options(database_uri):
+    """SQLAlchemy pool settings from the environment.
+
+    Each worker process gets its own pool; pool_size should cover the
+    worker's threads (GUNICORN_THREADS). In-memory SQLite keeps a single
+    connection and takes no pool sizing.
+    """
+    options = {"pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"}
+    if database_uri in ("sqlite://", "sqlite:///:memory:"):
+        return options
+    options.update(
+        pool_size=int(os.environ.get("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=int(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+    )
+    return options
+
+def create_app(config=None):
     app = Flask(__name__)
     
     # Configure database
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///app.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.secret_key = os.environ.get("SECRET_KEY", "dev_secret_key")
+    # Apply pending migrations at startup instead of requiring `db upgrade`
+    app.config["AUTO_MIGRATE"] = os.environ.get("AUTO_MIGRATE", "false").lower() == "true"
+    # Server-sent events: keepalive comment interval and maximum stream length
+    app.config["SSE_KEEPALIVE_SECONDS"] = float(os.environ.get("SSE_KEEPALIVE_SECONDS", "15"))
+    app.config["SSE_MAX_SECONDS"] = float(os.environ.get("SSE_MAX_SECONDS", "300"))
+    # Streams open at once per process; each holds a server thread (default:
+    # half of GUNICORN_THREADS, see gunicorn.conf.py)
+    app.config["SSE_MAX_STREAMS"] = int(os.environ.get(
+        "SSE_MAX_STREAMS", max(1, int(os.environ.get("GUNICORN_THREADS", "16")) // 2)
+    ))
+    # Reverse proxies in front of the app whose X-Forwarded-* headers are trusted
+    app.config["PROXY_HOPS"] = int(os.environ.get("PROXY_HOPS", "0"))
+    # Applied on connect when the database is SQLite (see sqlite_profile)
+    app.config["SQLITE_PRAGMAS"] = sqlite_profile.default_pragmas()
+    # Service writes re-run this many times on lock contention, backing off
+    # from WRITE_RETRY_DELAY seconds (doubled per attempt, with jitter)
+    app.config["WRITE_RETRY_ATTEMPTS"] = int(os.environ.get("WRITE_RETRY_ATTEMPTS", "5"))
+    app.config["WRITE_RETRY_DELAY"] = float(os.environ.get("WRITE_RETRY_DELAY", "0.02"))
+    # Log requests slower than this with their top SQL statements (0 = off)
+    app.config["SLOW_REQUEST_MS"] = float(os.environ.get("SLOW_REQUEST_MS", "0"))
+    # Response encoder: auto (orjson when installed), orjson or stdlib
+    app.config["JSON_BACKEND"] = os.environ.get("JSON_BACKEND", "auto")
+    # GET /api/metrics requires "Authorization: Bearer <token>" (404 while unset)
+    app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+    # Request profiling: "X-Profile: <token>" (or ?profile=<token>) profiles one
+    # request; PROFILE_SAMPLE_RATE profiles that fraction of all requests
+    app.config["PROFILE_TOKEN"] = os.environ.get("PROFILE_TOKEN")
+    app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+    app.config["PROFILE_INTERVAL_MS"] = float(os.environ.get("PROFILE_INTERVAL_MS", "2"))
+    app.config["PROFILE_KEEP"] = int(os.environ.get("PROFILE_KEEP", "50"))
+    # Password hashing: werkzeug method string (existing hashes are upgraded on
+    # login), hashing threads and how many more hashes may wait for one. The
+    # request thread waits for its hash, so workers + queue request threads
+    # per process can be busy with logins (see passwords.py)
+    app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", passwords.DEFAULT_METHOD)
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    app.config["PASSWORD_HASH_QUEUE"] = int(os.environ.get("PASSWORD_HASH_QUEUE", "16"))
+    # Failed logins allowed per username / client address in the window (0 = no
+    # limit). The address is the connecting peer: behind a reverse proxy set
+    # PROXY_HOPS, or all clients share the proxy's address and its limit
+    app.config["LOGIN_LIMIT_PER_USER"] = int(os.environ.get("LOGIN_LIMIT_PER_USER", "5"))
+    app.config["LOGIN_LIMIT_PER_ADDRESS"] = int(os.environ.get("LOGIN_LIMIT_PER_ADDRESS", "20"))
+    app.config["LOGIN_WINDOW_SECONDS"] = float(os.environ.get("LOGIN_WINDOW_SECONDS", "300"))
+    # user_loader cache: seconds a loaded user is reused (0 = off) and entries kept
+    app.config["USER_CACHE_TTL_SECONDS"] = float(os.environ.get("USER_CACHE_TTL_SECONDS", "30"))
+    app.config["USER_CACHE_SIZE"] = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+    
+    # Overrides (used by benchmarks and scripts to point at a scratch database)
+    if config:
+        app.config.update(config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
+    if app.config["PROXY_HOPS"]:
+        hops = app.config["PROXY_HOPS"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        sqlite_profile.install(db.engine, app.config["SQLITE_PRAGMAS"])
     CORS(app, supports_credentials=True)
+    # Before any other request hook, so every request is measured
+    metrics.init_app(app)
+    profiling.init_app(app)
+    passwords.init_app(app)
     
     login_manager = LoginManager()
     login_manager.init_app(app)
     
+    user_cache.configure(app.config["USER_CACHE_TTL_SECONDS"], app.config["USER_CACHE_SIZE"])
+    
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, user_id)
+        return user_cache.load(user_id)
     
     # Register blueprints
     app.register_blueprint(api, url_prefix="/api")
+    register_commands(app)
     
+    # Schema is migrated offline (`flask --app backend.app db upgrade`);
+    # startup only checks the version and refuses requests while it is behind
     with app.app_context():
-        db.create_all()
+        app.config["SCHEMA_CURRENT"] = migrations.check_schema(app)
+    
+    @app.before_request
+    def require_current_schema():
+        if not app.config["SCHEMA_CURRENT"]:
+            app.config["SCHEMA_CURRENT"] = migrations.schema_is_current()
+            if not app.config["SCHEMA_CURRENT"]:
+                return jsonify({"message": "Database schema is out of date"}), 503
         
     return app
 
+# Development server only; production runs gunicorn on backend.wsgi:app
 if __name__ == "__main__":
-    app = create_app()
+    app = create_app({"AUTO_MIGRATE": True})
     app.run(host="0.0.0.0", port=5001, debug=True)
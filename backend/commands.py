@@ -0,0 +1,63 @@
+import click
+from flask.cli import with_appcontext
+from backend.models import db
+from backend import migrations
+from backend.services.balance_service import BalanceService
+
+# ============================================
+# Maintenance Commands (flask --app backend.app <command>)
+# ============================================
+
+@click.command("check-balances")
+@click.option("--repair", is_flag=True, help="Rewrite drifted ledger rows from the raw splits.")
+@with_appcontext
+def check_balances(repair):
+    """Recompute every trip's balances from expense splits and report drift."""
+    drift = BalanceService.check_all(repair=repair)
+    for entry in drift:
+        click.echo(
+            f"trip {entry['tripId']} member {entry['memberId']}: "
+            f"stored {entry['stored']:.2f}, expected {entry['expected']:.2f}"
+        )
+    if repair:
+        db.session.commit()
+        click.echo(f"Repaired {len(drift)} ledger entries.")
+    elif drift:
+        raise click.ClickException(f"{len(drift)} ledger entries drifted (run with --repair).")
+    else:
+        click.echo("Ledger is consistent.")
+
+@click.group("db")
+def db_commands():
+    """Schema migrations."""
+
+@db_commands.command("upgrade")
+@click.option("--to", "target", type=int, default=None, help="Stop at this version.")
+@with_appcontext
+def db_upgrade(target):
+    """Apply pending migrations."""
+    try:
+        applied = migrations.upgrade(target)
+    except migrations.MigrationError as e:
+        raise click.ClickException(str(e))
+    for version, description in applied:
+        click.echo(f"{version:>4}  {description}")
+    if not applied:
+        click.echo(f"Database is up to date (version {migrations.get_version(db.engine)}).")
+
+@db_commands.command("current")
+@with_appcontext
+def db_current():
+    """Show the database's schema version."""
+    version = migrations.get_version(db.engine)
+    click.echo(f"{version if version is not None else 'unversioned'} (latest {migrations.LATEST_VERSION})")
+
+@db_commands.command("history")
+def db_history():
+    """List all migrations."""
+    for version, description, _ in migrations.MIGRATIONS:
+        click.echo(f"{version:>4}  {description}")
+
+def register_commands(app):
+    app.cli.add_command(check_balances)
+    app.cli.add_command(db_commands)
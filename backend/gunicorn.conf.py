@@ -0,0 +1,32 @@
+"""gunicorn settings, overridable from the environment.
+
+    gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+"""
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5001')}"
+
+# One process by default: the SSE event bus (and the trip and user caches)
+# live in the process, so a write handled by one worker would never reach
+# SSE clients connected to another. Scale with threads; run more workers
+# only with a shared event backend (event_bus.configure()).
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# Each open SSE stream holds a thread for up to SSE_MAX_SECONDS, so at most
+# SSE_MAX_STREAMS (default: half the threads) are served at once and the
+# rest stay free for API requests. DB_POOL_SIZE + DB_MAX_OVERFLOW should
+# cover the threads that are not streaming.
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+worker_class = "gthread"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = 100
+
+# ACCESS_LOG="" turns the access log off (e.g. for load tests)
+accesslog = os.environ.get("ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
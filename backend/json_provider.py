@@ -0,0 +1,38 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: responses fall back to the stdlib encoder
+    orjson = None
+
+# ============================================
+# JSON encoding backend
+# ============================================
+#
+# JSON_BACKEND = "auto" (orjson when installed), "orjson" or "stdlib".
+# orjson is optional: pip install -r backend/requirements-optional.txt
+# orjson output matches the stdlib encoder's apart from not escaping
+# non-ASCII characters; keys stay sorted and unknown types go through the
+# same default() (dates, UUIDs, Decimals, dataclasses).
+
+JSON_BACKENDS = ("auto", "orjson", "stdlib")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes compact responses with orjson"""
+    
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get("JSON_BACKEND", "auto")
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of {', '.join(JSON_BACKENDS)}, not {backend!r}")
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_BACKEND is orjson but orjson is not installed")
+        self.use_orjson = orjson is not None and backend != "stdlib"
+    
+    def dumps(self, obj, **kwargs):
+        # Indented (debug) output and custom arguments keep the stdlib encoder
+        if self.use_orjson and set(kwargs) <= {"separators"}:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        return super().dumps(obj, **kwargs)
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.json_provider import FastJSONProvider
+from typing import Dict, List, Optional, Tuple
+
+# ============================================
+# Request and SQL instrumentation
+# ============================================
+#
+# Every request is timed and tagged with its route rule and method; SQL
+# statements and JSON encoding done while it runs are attributed to it via
+# flask.g, so concurrent requests on other threads do not mix. Totals are
+# kept per process and rendered in the Prometheus text format by render().
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+# Statements listed in a slow-request log line
+SLOW_LOG_TOP = 5
+
+
+class RequestMetrics:
+    """What one request did; lives on flask.g while it runs"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements: List[Tuple[str, float]] = []
+        self.serialize_time = 0.0
+        # Statements a cache answered instead (e.g. the user_loader lookup)
+        self.saved_statements = 0
+    
+    @property
+    def sql_time(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """Process-wide totals per (route, method)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+            self.durations: Dict[Tuple[str, str], _Histogram] = {}
+            self.statement_counts: Dict[Tuple[str, str], _Histogram] = {}
+            self.sql_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+            self.serialize_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+            self.response_bytes: Dict[Tuple[str, str], int] = defaultdict(int)
+            self.saved_statements: Dict[Tuple[str, str], int] = defaultdict(int)
+    
+    def record(self, route: str, method: str, status: int, duration: float,
+               metrics: RequestMetrics, response_bytes: int) -> None:
+        key = (route, method)
+        with self._lock:
+            self.requests[(route, method, status)] += 1
+            self.durations.setdefault(key, _Histogram(DURATION_BUCKETS)).observe(duration)
+            self.statement_counts.setdefault(key, _Histogram(STATEMENT_BUCKETS)).observe(len(metrics.statements))
+            self.sql_seconds[key] += metrics.sql_time
+            self.serialize_seconds[key] += metrics.serialize_time
+            self.response_bytes[key] += response_bytes
+            self.saved_statements[key] += metrics.saved_statements
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            _counter(lines, "tripmate_http_requests_total", "Requests handled",
+                     {_labels(route=r, method=m, status=s): v for (r, m, s), v in self.requests.items()})
+            _histogram(lines, "tripmate_http_request_duration_seconds", "Request wall time", self.durations)
+            _histogram(lines, "tripmate_sql_statements_per_request", "SQL statements run per request",
+                       self.statement_counts)
+            _counter(lines, "tripmate_sql_duration_seconds_total", "Time spent in SQL statements",
+                     {_labels(route=r, method=m): v for (r, m), v in self.sql_seconds.items()})
+            _counter(lines, "tripmate_serialization_seconds_total", "Time spent encoding JSON responses",
+                     {_labels(route=r, method=m): v for (r, m), v in self.serialize_seconds.items()})
+            _counter(lines, "tripmate_response_bytes_total", "Response body bytes (streamed bodies excluded)",
+                     {_labels(route=r, method=m): v for (r, m), v in self.response_bytes.items()})
+            _counter(lines, "tripmate_sql_statements_saved_total", "SQL statements answered from in-process caches",
+                     {_labels(route=r, method=m): v for (r, m), v in self.saved_statements.items()})
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+def _counter(lines, name, help_text, samples, kind="counter"):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in sorted(samples.items()):
+        lines.append(f"{name}{{{labels}}} {value}")
+
+def _histogram(lines, name, help_text, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (route, method), histogram in sorted(histograms.items()):
+        labels = _labels(route=route, method=method)
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+def gauge_lines(name: str, help_text: str, samples: Dict[str, float]) -> str:
+    """Extra gauges (e.g. cache stats) in the same format, labelled by `kind`"""
+    lines: List[str] = []
+    _counter(lines, name, help_text, {_labels(kind=kind): value for kind, value in samples.items()}, kind="gauge")
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _current() -> Optional[RequestMetrics]:
+    return g.get("request_metrics") if has_app_context() else None
+
+def count_saved_statement() -> None:
+    """Credit the current request with a statement a cache made unnecessary"""
+    metrics = _current()
+    if metrics is not None:
+        metrics.saved_statements += 1
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current()
+    started = getattr(context, "_metrics_started", None)
+    if metrics is not None and started is not None:
+        metrics.statements.append((statement, time.perf_counter() - started))
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON provider that adds encoding time to the request's metrics"""
+    
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            metrics = _current()
+            if metrics is not None:
+                metrics.serialize_time += time.perf_counter() - started
+
+
+def init_app(app) -> None:
+    """Install the request hooks and the timed JSON provider on an app"""
+    app.json = TimedJSONProvider(app)
+    
+    @app.before_request
+    def _start_request_metrics():
+        g.request_metrics = RequestMetrics()
+    
+    @app.after_request
+    def _record_request_metrics(response):
+        metrics = g.pop("request_metrics", None)
+        if metrics is None:
+            return response
+        duration = time.perf_counter() - metrics.started
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        size = 0 if response.is_streamed else (response.calculate_content_length() or 0)
+        registry.record(route, request.method, response.status_code, duration, metrics, size)
+        
+        slow_ms = app.config.get("SLOW_REQUEST_MS")
+        if slow_ms and duration * 1000 >= slow_ms:
+            top = sorted(metrics.statements, key=lambda item: item[1], reverse=True)[:SLOW_LOG_TOP]
+            app.logger.warning(
+                "slow request %s %s: %.1f ms, %d statements (%.1f ms), serialize %.1f ms%s",
+                request.method, request.path, duration * 1000,
+                len(metrics.statements), metrics.sql_time * 1000, metrics.serialize_time * 1000,
+                "".join(f"\n  {elapsed * 1000:8.2f} ms  {' '.join(statement.split())[:200]}" for statement, elapsed in top),
+            )
+        return response
@@ -0,0 +1,291 @@
+from sqlalchemy import inspect, text, MetaData, Table, Integer
+from sqlalchemy.schema import CreateTable
+from backend.models import db, to_money
+from typing import Callable, List, Optional, Tuple
+
+# ============================================
+# Schema Migrations (flask --app backend.app db upgrade)
+# ============================================
+#
+# Migrations are numbered steps applied once, offline, by the `db upgrade`
+# command; the version reached is stored in the schema_version table. App
+# startup only reads that version and compares it with LATEST_VERSION.
+#
+# Steps must stay idempotent (inspect the live schema and only change what
+# is still in the old shape): a brand-new database is created straight from
+# the models and then runs every step as a no-op.
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Unparsable legacy money values listed when the conversion refuses to run
+MAX_REPORTED_VALUES = 20
+
+
+class MigrationError(RuntimeError):
+    """A step cannot run without losing data; nothing was changed"""
+
+
+# Money columns that used to be VARCHAR decimal strings and are now
+# integer cents (see models.Money)
+MONEY_COLUMNS = {
+    "trips": ["budget"],
+    "expenses": ["amount"],
+    "expense_splits": ["amount"],
+    "activities": ["cost"],
+    "drivers": ["cost"],
+    "hotels": ["cost"],
+    "member_balances": ["balance"],
+}
+
+def _to_cents_sql(column: str) -> str:
+    """SQL expression converting a decimal string/real column to integer cents"""
+    return (
+        f"CASE WHEN {column} IS NULL OR TRIM({column}) = '' THEN NULL "
+        f"ELSE CAST(ROUND(CAST({column} AS REAL) * 100) AS INTEGER) END"
+    )
+
+def _unparsable_money(conn, table_name: str, money_columns: list) -> list:
+    """"table.column=value (key)" for each legacy value that is not a number.
+    
+    CAST(... AS REAL) would quietly turn "$20" or "approx 50" into 0 (and
+    "20 USD" into 20), so these are reported instead of converted.
+    """
+    key = inspect(conn).get_pk_constraint(table_name)["constrained_columns"][0]
+    bad = []
+    for column in money_columns:
+        rows = conn.execute(text(
+            f"SELECT {key}, {column} FROM {table_name} "
+            f"WHERE {column} IS NOT NULL AND TRIM(CAST({column} AS TEXT)) <> ''"
+        ))
+        for row_key, value in rows:
+            try:
+                to_money(value.strip() if isinstance(value, str) else value)
+            except ValueError:
+                bad.append(f"{table_name}.{column}={value!r} ({key} {row_key})")
+    return bad
+
+def _rebuild_sqlite_table(conn, table_name: str, money_columns: list) -> None:
+    """SQLite cannot ALTER COLUMN TYPE, so copy into a new table and swap.
+
+    The new table is built from the reflected old one (not from the current
+    models) so only the money column types change.
+    """
+    old = Table(table_name, MetaData(), autoload_with=conn)
+    new = old.to_metadata(old.metadata, name=f"{table_name}__new")
+    for column in money_columns:
+        new.c[column].type = Integer()
+
+    conn.execute(CreateTable(new))
+    columns = [column.name for column in old.columns]
+    select_list = [
+        _to_cents_sql(name) if name in money_columns else name
+        for name in columns
+    ]
+    conn.execute(text(
+        f"INSERT INTO {new.name} ({', '.join(columns)}) "
+        f"SELECT {', '.join(select_list)} FROM {table_name}"
+    ))
+    conn.execute(text(f"DROP TABLE {table_name}"))
+    conn.execute(text(f"ALTER TABLE {new.name} RENAME TO {table_name}"))
+
+def migrate_money_columns(engine) -> list:
+    """Convert legacy string/real money columns to integer cents.
+
+    Raises MigrationError, before converting anything, if any value is not a
+    number. Returns the names of the tables that were converted.
+    """
+    converted = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        pending = {}
+        for table_name, money_columns in MONEY_COLUMNS.items():
+            if table_name not in existing_tables:
+                continue
+            types = {column["name"]: column["type"] for column in inspector.get_columns(table_name)}
+            legacy = [name for name in money_columns if not isinstance(types.get(name), Integer)]
+            if legacy:
+                pending[table_name] = legacy
+
+        bad = [value for table_name, legacy in pending.items() for value in _unparsable_money(conn, table_name, legacy)]
+        if bad:
+            shown = "\n  ".join(bad[:MAX_REPORTED_VALUES])
+            more = f"\n  ... and {len(bad) - MAX_REPORTED_VALUES} more" if len(bad) > MAX_REPORTED_VALUES else ""
+            raise MigrationError(
+                f"{len(bad)} money values are not numbers; fix or clear them and re-run:\n  {shown}{more}"
+            )
+
+        for table_name, legacy in pending.items():
+            if engine.dialect.name == "sqlite":
+                _rebuild_sqlite_table(conn, table_name, legacy)
+            elif engine.dialect.name == "postgresql":
+                for column in legacy:
+                    conn.execute(text(
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column} TYPE INTEGER "
+                        f"USING ROUND(NULLIF(TRIM({column}::text), '')::numeric * 100)::integer"
+                    ))
+            else:
+                raise RuntimeError(f"No money column migration for dialect {engine.dialect.name}")
+            converted.append(table_name)
+    return converted
+
+def create_missing_indexes(engine, metadata) -> list:
+    """Create any index declared on the models that the database lacks.
+
+    db.create_all() skips tables that already exist, indexes included, so
+    indexes added to existing tables are created here. Returns their names.
+    """
+    created = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created.append(index.name)
+    return created
+
+def drop_indexes(engine, names: dict) -> list:
+    """Drop the given {table: [index, ...]} indexes that still exist.
+    
+    Returns the names of the indexes dropped.
+    """
+    dropped = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table_name, index_names in names.items():
+            if table_name not in existing_tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table_name)}
+            for name in index_names:
+                if name in existing:
+                    conn.execute(text(f"DROP INDEX {name}"))
+                    dropped.append(name)
+    return dropped
+
+def add_missing_columns(engine, metadata) -> list:
+    """ALTER TABLE ... ADD COLUMN for every model column the database lacks.
+
+    New NOT NULL columns need a server_default. Returns "table.column" for
+    each column added.
+    """
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"{column.name} {column.type.compile(dialect=conn.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def _create_tables():
+    db.create_all()
+
+def _money_columns():
+    migrate_money_columns(db.engine)
+
+def _rebuild_ledger():
+    from backend.services.balance_service import BalanceService
+    # The rebuild goes through the models, which select (and write) columns
+    # that later steps add; add them up front so this step runs on old schemas
+    add_missing_columns(db.engine, db.metadata)
+    BalanceService.check_all(repair=True)
+    db.session.commit()
+
+def _indexes():
+    create_missing_indexes(db.engine, db.metadata)
+
+def _new_columns():
+    add_missing_columns(db.engine, db.metadata)
+
+def _delta_sync():
+    # Row revisions, the tombstones table and their (trip_id, revision) indexes
+    db.create_all()
+    add_missing_columns(db.engine, db.metadata)
+    create_missing_indexes(db.engine, db.metadata)
+
+def _drop_trip_amount_index():
+    # ix_expenses_trip_analytics leads with trip_id and carries amount, so it
+    # already serves SUM(amount) per trip index-only
+    drop_indexes(db.engine, {"expenses": ["ix_expenses_trip_amount"]})
+
+# (version, description, step) in the order they must run; append only
+MIGRATIONS: List[Tuple[int, str, Callable[[], None]]] = [
+    (1, "create missing tables", _create_tables),
+    (2, "store money columns as integer cents", _money_columns),
+    (3, "rebuild the member balance ledger", _rebuild_ledger),
+    (4, "add foreign key and pagination indexes", _indexes),
+    (5, "add trips.revision for ETags", _new_columns),
+    (6, "add row revisions and tombstones for delta sync", _delta_sync),
+    (7, "add covering index for trip analytics", _indexes),
+    (8, "drop the index made redundant by the analytics index", _drop_trip_amount_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_version(engine) -> Optional[int]:
+    """Stored schema version; None for a database that was never versioned"""
+    if not inspect(engine).has_table(SCHEMA_VERSION_TABLE):
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+
+def _set_version(engine, version: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (version INTEGER NOT NULL)"))
+        conn.execute(text(f"DELETE FROM {SCHEMA_VERSION_TABLE}"))
+        conn.execute(text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version) VALUES (:version)"), {"version": version})
+
+def is_empty(engine) -> bool:
+    """True for a database with no tables at all"""
+    return not inspect(engine).get_table_names()
+
+def upgrade(target: Optional[int] = None) -> List[Tuple[int, str]]:
+    """Apply every migration above the stored version (up to target).
+
+    Must run inside an app context. Returns the (version, description) of
+    each step applied.
+    """
+    target = LATEST_VERSION if target is None else target
+    current = get_version(db.engine) or 0
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if current < version <= target:
+            step()
+            _set_version(db.engine, version)
+            applied.append((version, description))
+    return applied
+
+def schema_is_current() -> bool:
+    version = get_version(db.engine)
+    return version is not None and version >= LATEST_VERSION
+
+def check_schema(app) -> bool:
+    """Startup check. Only reads the stored version, except that an empty
+    database is created and stamped, and AUTO_MIGRATE=true upgrades in place
+    (for local development)."""
+    if is_empty(db.engine) or app.config.get("AUTO_MIGRATE"):
+        upgrade()
+    if schema_is_current():
+        return True
+    app.logger.error(
+        "Database schema is at version %s, expected %s; run `flask --app backend.app db upgrade`",
+        get_version(db.engine), LATEST_VERSION,
+    )
+    return False
@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import String, Text, ForeignKey, Integer, Index
+from sqlalchemy.types import TypeDecorator
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional, List
 import uuid
 
@@ -12,8 +14,53 @@ db = SQLAlchemy(model_class=Base)
 def generate_uuid():
     return str(uuid.uuid4())
 
+CENT = Decimal("0.01")
+
+def to_money(value, blank: Optional[Decimal] = None) -> Optional[Decimal]:
+    """Parse a request value (number or numeric string) into a 2dp Decimal.
+    None and "" give `blank`; NaN and infinities are rejected."""
+    if value is None or value == "":
+        return blank
+    try:
+        amount = Decimal(str(value))
+        if amount.is_finite():
+            return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        pass
+    raise ValueError(f"Invalid amount: {value!r}")
+
+def required_money(value, field: str) -> Decimal:
+    """to_money for a required amount; a blank value is a missing field"""
+    amount = to_money(value)
+    if amount is None:
+        raise ValueError(f"Missing field: {field}")
+    return amount
+
+def split_evenly(amount: Decimal, parts: int) -> List[Decimal]:
+    """Split an amount into `parts` shares that add up exactly to the amount.
+    Leftover cents go to the first shares (100 / 3 -> 33.34, 33.33, 33.33)."""
+    cents = int(amount / CENT)
+    share, remainder = divmod(cents, parts)
+    return [(share + (1 if i < remainder else 0)) * CENT for i in range(parts)]
+
+class Money(TypeDecorator):
+    """Money stored as integer minor units (cents), exposed as Decimal.
+
+    Keeps amounts exact and lets the database SUM()/ORDER BY them; func.sum()
+    over a Money column comes back as a Decimal too.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        value = to_money(value)
+        return None if value is None else int(value / CENT)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Decimal(int(value)) * CENT
+
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from backend import passwords
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
@@ -24,10 +71,14 @@ class User(UserMixin, db.Model):
     avatar: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        # Made with an older PASSWORD_HASH_METHOD
+        return passwords.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -39,15 +90,22 @@ class User(UserMixin, db.Model):
 
 class Trip(db.Model):
     __tablename__ = "trips"
+    __table_args__ = (
+        # Keyset pagination of a user's trips: WHERE user_id = ? ORDER BY start_date, id
+        Index("ix_trips_user_start", "user_id", "start_date", "id"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     user_id: Mapped[Optional[str]] = mapped_column(ForeignKey("users.id"), nullable=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     destination: Mapped[str] = mapped_column(String, nullable=False)
     start_date: Mapped[str] = mapped_column(String, nullable=False)
     end_date: Mapped[str] = mapped_column(String, nullable=False)
-    budget: Mapped[str] = mapped_column(String, nullable=False)
+    budget: Mapped[Decimal] = mapped_column(Money, nullable=False)
     cover_image: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Bumped once per committed transaction that touches the trip (see
+    # services.changes); drives the ETags of the trip-scoped endpoints
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     user: Mapped["User"] = relationship("User", backref=db.backref("trips", cascade="all, delete-orphan"))
     members: Mapped[List["Member"]] = relationship(back_populates="trip", cascade="all, delete-orphan")
@@ -56,27 +114,12 @@ class Trip(db.Model):
 
     drivers: Mapped[List["Driver"]] = relationship(back_populates="trip", cascade="all, delete-orphan")
     hotels: Mapped[List["Hotel"]] = relationship(back_populates="trip", cascade="all, delete-orphan")
+    balances: Mapped[List["MemberBalance"]] = relationship(viewonly=True)
+    tombstones: Mapped[List["Tombstone"]] = relationship(cascade="all, delete-orphan")
 
     def to_dict(self):
-        # Calculate balances
-        balances = {member.id: 0.0 for member in self.members}
-        
-        for expense in self.expenses:
-            try:
-                expense_amount = float(expense.amount) if expense.amount else 0.0
-                
-                # Creditor (Paid By) gets positive balance (money owed TO them)
-                if expense.paid_by_id in balances:
-                    balances[expense.paid_by_id] += expense_amount
-                
-                # Debtors (Split Among) get negative balance (money they OWE)
-                if expense.splits:
-                    for split in expense.splits:
-                        if split.member_id in balances:
-                            split_amount = float(split.amount) if split.amount else 0.0
-                            balances[split.member_id] -= split_amount
-            except (ValueError, TypeError):
-                continue
+        # Balances are maintained incrementally in the member_balances ledger
+        balances = {entry.member_id: float(entry.balance) for entry in self.balances}
         
         return {
             "id": self.id,
@@ -95,6 +138,11 @@ class Trip(db.Model):
 
 class Member(db.Model):
     __tablename__ = "members"
+    __table_args__ = (
+        Index("ix_members_trip", "trip_id", "id"),
+        # Delta sync: WHERE trip_id = ? AND revision > ?
+        Index("ix_members_trip_revision", "trip_id", "revision"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
     user_id: Mapped[Optional[str]] = mapped_column(ForeignKey("users.id"), nullable=True)
@@ -102,9 +150,12 @@ class Member(db.Model):
     email: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     avatar: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     is_admin: Mapped[Optional[str]] = mapped_column(String, default="false")
+    # Trip revision of the last write to this row (see services.changes)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     trip: Mapped["Trip"] = relationship(back_populates="members")
     user: Mapped["User"] = relationship("User")
+    ledger: Mapped[Optional["MemberBalance"]] = relationship(back_populates="member", cascade="all, delete-orphan")
 
     def to_dict(self):
         return {
@@ -121,14 +172,23 @@ class Member(db.Model):
 
 class Expense(db.Model):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_trip_date", "trip_id", "date", "id"),
+        Index("ix_expenses_paid_by", "paid_by_id"),
+        # Covers the analytics GROUP BYs (category, date, payer) and SUM(amount)
+        # per trip index-only
+        Index("ix_expenses_trip_analytics", "trip_id", "category", "date", "paid_by_id", "amount"),
+        Index("ix_expenses_trip_revision", "trip_id", "revision"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=False)
-    amount: Mapped[str] = mapped_column(String, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
     category: Mapped[str] = mapped_column(String, nullable=False)
     paid_by_id: Mapped[str] = mapped_column(ForeignKey("members.id"), nullable=False)
     date: Mapped[str] = mapped_column(String, nullable=False)
     split_method: Mapped[Optional[str]] = mapped_column(String, default="equal")
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     trip: Mapped["Trip"] = relationship(back_populates="expenses")
     splits: Mapped[List["ExpenseSplit"]] = relationship(back_populates="expense", cascade="all, delete-orphan")
@@ -150,6 +210,10 @@ class Expense(db.Model):
 
 class Activity(db.Model):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_trip_date", "trip_id", "date", "id"),
+        Index("ix_activities_trip_revision", "trip_id", "revision"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -157,7 +221,8 @@ class Activity(db.Model):
     date: Mapped[str] = mapped_column(String, nullable=False)
     time: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    cost: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    cost: Mapped[Optional[Decimal]] = mapped_column(Money, nullable=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     trip: Mapped["Trip"] = relationship(back_populates="activities")
 
@@ -175,11 +240,15 @@ class Activity(db.Model):
 
 class ExpenseSplit(db.Model):
     __tablename__ = "expense_splits"
+    __table_args__ = (
+        Index("ix_expense_splits_expense", "expense_id"),
+        Index("ix_expense_splits_member", "member_id"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     expense_id: Mapped[str] = mapped_column(ForeignKey("expenses.id"), nullable=False)
     member_id: Mapped[str] = mapped_column(String, nullable=False) # We store ID directly to avoid circular dependency issues if not strictly needed, or we can use ForeignKey. Let's use ID for simplicity as Member is in same file but defined before? No defined after? Member is defined BEFORE Expense.
     # Actually Member is defined at line 73. Expense is at 98. So we can use ForeignKey("members.id").
-    amount: Mapped[str] = mapped_column(String, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
 
     expense: Mapped["Expense"] = relationship(back_populates="splits")
 
@@ -188,11 +257,28 @@ class ExpenseSplit(db.Model):
             "id": self.id,
             "expenseId": self.expense_id,
             "memberId": self.member_id,
-            "amount": float(self.amount)
+            "amount": float(self.amount) if self.amount else 0
         }
 
+# Running balance per member, updated as deltas by ExpenseService
+# Positive = member is owed money, negative = member owes money
+class MemberBalance(db.Model):
+    __tablename__ = "member_balances"
+    __table_args__ = (
+        Index("ix_member_balances_trip", "trip_id"),
+    )
+    member_id: Mapped[str] = mapped_column(ForeignKey("members.id"), primary_key=True)
+    trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
+    balance: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal(0))
+
+    member: Mapped["Member"] = relationship(back_populates="ledger")
+
 class Driver(db.Model):
     __tablename__ = "drivers"
+    __table_args__ = (
+        Index("ix_drivers_trip_date", "trip_id", "date", "id"),
+        Index("ix_drivers_trip_revision", "trip_id", "revision"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -202,8 +288,9 @@ class Driver(db.Model):
     dropoff_location: Mapped[str] = mapped_column(String, nullable=False)
     date: Mapped[str] = mapped_column(String, nullable=False)
     time: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    cost: Mapped[str] = mapped_column(String, nullable=False)
+    cost: Mapped[Decimal] = mapped_column(Money, nullable=False)
     status: Mapped[str] = mapped_column(String, default="pending")  # pending, confirmed, cancelled
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     trip: Mapped["Trip"] = relationship(back_populates="drivers")
 
@@ -224,6 +311,10 @@ class Driver(db.Model):
 
 class Hotel(db.Model):
     __tablename__ = "hotels"
+    __table_args__ = (
+        Index("ix_hotels_trip_check_in", "trip_id", "check_in_date", "id"),
+        Index("ix_hotels_trip_revision", "trip_id", "revision"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
     hotel_name: Mapped[str] = mapped_column(String, nullable=False)
@@ -232,8 +323,9 @@ class Hotel(db.Model):
     check_out_date: Mapped[str] = mapped_column(String, nullable=False)
     room_type: Mapped[str] = mapped_column(String, nullable=False)
     guests: Mapped[str] = mapped_column(String, nullable=False)
-    cost: Mapped[str] = mapped_column(String, nullable=False)
+    cost: Mapped[Decimal] = mapped_column(Money, nullable=False)
     status: Mapped[str] = mapped_column(String, default="pending")  # pending, confirmed, cancelled
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     trip: Mapped["Trip"] = relationship(back_populates="hotels")
 
@@ -250,3 +342,22 @@ class Hotel(db.Model):
             "cost": float(self.cost) if self.cost else 0,
             "status": self.status,
         }
+
+# Record of a deleted trip-scoped row, so delta sync can report deletions
+class Tombstone(db.Model):
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_trip_revision", "trip_id", "revision"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    trip_id: Mapped[str] = mapped_column(ForeignKey("trips.id"), nullable=False)
+    entity: Mapped[str] = mapped_column(String, nullable=False)  # member, expense, activity, driver, hotel
+    entity_id: Mapped[str] = mapped_column(String, nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def to_dict(self):
+        return {
+            "entity": self.entity,
+            "id": self.entity_id,
+            "revision": self.revision,
+        }
@@ -0,0 +1,233 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from typing import Callable, Deque, Dict, NamedTuple, Optional, TypeVar
+
+# ============================================
+# Password hashing and login throttling
+# ============================================
+#
+# Hashes are made with PASSWORD_HASH_METHOD, any werkzeug method string
+# ("scrypt:32768:8:1", "pbkdf2:sha256:600000", ...). A hash stored with
+# another method still verifies and is replaced on the next successful
+# login, so changing the method upgrades accounts as their users sign in.
+#
+# Hashing runs on a small worker pool (PASSWORD_HASH_WORKERS). scrypt and
+# PBKDF2 release the GIL, so a login burst keeps at most that many cores busy
+# per process (WEB_CONCURRENCY x PASSWORD_HASH_WORKERS in all). The pool
+# bounds CPU, not threads: the request thread blocks until its hash is done,
+# so up to PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE of a process's
+# GUNICORN_THREADS can be tied up in logins. Once PASSWORD_HASH_QUEUE hashes
+# are already waiting, HashPoolBusy is raised instead of queuing more, which
+# keeps the remaining threads free for other routes.
+#
+# The LoginThrottle counts failed logins per username and per client address
+# over a sliding window; an attempt over either limit is rejected before its
+# password is hashed. Each attempt reserves its slot under the lock before
+# the password is checked and gives it back only if it succeeds, so a burst
+# of concurrent attempts cannot all pass the check before any is counted.
+# The address is request.remote_addr: behind a reverse proxy, PROXY_HOPS must
+# be set or every client shares the proxy's address and its limit.
+
+T = TypeVar("T")
+
+# werkzeug 3's default; hashes made before the method was configurable use it
+DEFAULT_METHOD = "scrypt:32768:8:1"
+# Most usernames/addresses tracked by the throttle; the least recent go first
+MAX_TRACKED_KEYS = 100_000
+
+
+class HashPoolBusy(Exception):
+    """Too many password hashes waiting; the request should be retried later"""
+
+
+class Hasher:
+    """Bounded worker pool hashing and checking passwords with one method"""
+    
+    def __init__(self, method: str, workers: int, queue: int):
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Running plus waiting hashes
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._prefix: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats = {"hashes": 0, "busy": 0}
+    
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn on the pool and wait for it (the calling thread blocks)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["busy"] += 1
+            raise HashPoolBusy("Too many sign-ins in progress, try again shortly")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._stats["hashes"] += 1
+        return future.result()
+    
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+    
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+    
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether the hash was made with another method or parameters"""
+        if self._prefix is None:
+            # werkzeug fills in defaults ("scrypt" -> "scrypt:32768:8:1"), so
+            # take the prefix from a real hash once
+            self._prefix = self.hash("").split("$", 1)[0]
+        return password_hash.split("$", 1)[0] != self._prefix
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+class SlidingWindow:
+    """Recent event times per key; a key is full at `limit` events in `window` seconds"""
+    
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._events: "OrderedDict[str, Deque[float]]" = OrderedDict()
+    
+    def retry_after(self, key: str, now: float) -> float:
+        """Seconds until the key is below its limit again (0 if it is now)"""
+        events = self._events.get(key)
+        if not self.limit or events is None or len(events) < self.limit:
+            return 0.0
+        return max(0.0, events[0] + self.window - now)
+    
+    def add(self, key: str, now: float) -> None:
+        if not self.limit:
+            return
+        events = self._events.get(key)
+        if events is None:
+            # Only the last `limit` events matter for the check
+            events = self._events[key] = deque(maxlen=self.limit)
+            if len(self._events) > MAX_TRACKED_KEYS:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(key)
+        events.append(now)
+    
+    def discard(self, key: str, at: float) -> None:
+        """Remove one event recorded at `at` (no-op once it has aged out)"""
+        events = self._events.get(key)
+        if events and at in events:
+            events.remove(at)
+    
+    def clear(self, key: str) -> None:
+        self._events.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+class Reservation(NamedTuple):
+    """A login attempt counted by LoginThrottle.reserve()"""
+    username: str
+    address: str
+    at: float
+    # Whole seconds to wait when the attempt was refused (nothing counted)
+    retry_after: int = 0
+
+
+class LoginThrottle:
+    """Failed-login limits per username and per client address"""
+    
+    def __init__(self, per_user: int, per_address: int, window: float):
+        self._users = SlidingWindow(per_user, window)
+        self._addresses = SlidingWindow(per_address, window)
+        self._lock = threading.Lock()
+        self._rejected = 0
+    
+    def reserve(self, username: str, address: str) -> Reservation:
+        """Count an attempt as failed before its password is checked.
+        
+        When either limit is reached nothing is counted and the result's
+        retry_after says how long to wait. Otherwise the attempt stays
+        counted unless succeeded() or release() is called with the result.
+        """
+        now = time.monotonic()
+        with self._lock:
+            wait = max(self._users.retry_after(username, now), self._addresses.retry_after(address, now))
+            if wait:
+                self._rejected += 1
+            else:
+                self._users.add(username, now)
+                self._addresses.add(address, now)
+        return Reservation(username, address, now, math.ceil(wait))
+    
+    def release(self, reservation: Reservation) -> None:
+        """Give back a reserved attempt whose password was never checked"""
+        with self._lock:
+            self._users.discard(reservation.username, reservation.at)
+            self._addresses.discard(reservation.address, reservation.at)
+    
+    def succeeded(self, reservation: Reservation) -> None:
+        """The reserved attempt logged in: forget the username's failures"""
+        with self._lock:
+            self._users.clear(reservation.username)
+            self._addresses.discard(reservation.address, reservation.at)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "rejected": self._rejected,
+                "trackedUsers": len(self._users),
+                "trackedAddresses": len(self._addresses),
+            }
+
+
+hasher: Optional[Hasher] = None
+throttle: Optional[LoginThrottle] = None
+
+
+def hash_password(password: str) -> str:
+    """Hash with the configured method (inline with the default outside an app)"""
+    if hasher is None:
+        return generate_password_hash(password, DEFAULT_METHOD)
+    return hasher.hash(password)
+
+def verify_password(password_hash: str, password: str) -> bool:
+    if hasher is None:
+        return check_password_hash(password_hash, password)
+    return hasher.verify(password_hash, password)
+
+def needs_rehash(password_hash: str) -> bool:
+    return hasher is not None and hasher.needs_rehash(password_hash)
+
+def stats() -> Dict[str, int]:
+    """Hasher and throttle counters for /api/metrics"""
+    return {
+        **(hasher.stats() if hasher is not None else {}),
+        **(throttle.stats() if throttle is not None else {}),
+    }
+
+def init_app(app) -> None:
+    """Set up the hashing pool and login throttle from the app config"""
+    global hasher, throttle
+    if hasher is not None:
+        hasher.shutdown()
+    hasher = Hasher(
+        app.config["PASSWORD_HASH_METHOD"],
+        app.config["PASSWORD_HASH_WORKERS"],
+        app.config["PASSWORD_HASH_QUEUE"],
+    )
+    throttle = LoginThrottle(
+        app.config["LOGIN_LIMIT_PER_USER"],
+        app.config["LOGIN_LIMIT_PER_ADDRESS"],
+        app.config["LOGIN_WINDOW_SECONDS"],
+    )
@@ -0,0 +1,188 @@
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from flask import g, request
+from typing import Dict, List, Optional
+
+# ============================================
+# Per-request sampling profiler
+# ============================================
+#
+# A request is profiled when it carries the PROFILE_TOKEN (X-Profile header
+# or ?profile= flag) or is picked by PROFILE_SAMPLE_RATE. One background
+# thread samples the stacks of every thread currently serving a profiled
+# request; stacks are stored collapsed ("a;b;c <count>", the flamegraph.pl
+# input format) so serialization frames (to_dict) and lazy-load/SQL frames
+# show up as separate branches.
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Site-packages prefix stripped from library frames
+_LIB_MARKERS = ("site-packages" + os.sep, "dist-packages" + os.sep)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+class Profile:
+    """Collapsed stacks sampled while one request ran"""
+    
+    def __init__(self, profile_id: int, method: str, path: str, reason: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.created_at = time.time()
+        self.duration = 0.0
+        self.status: Optional[int] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+    
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "durationMs": round(self.duration * 1000, 2),
+            "samples": self.samples,
+        }
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    for marker in _LIB_MARKERS:
+        index = filename.rfind(marker)
+        if index != -1:
+            filename = filename[index + len(marker):]
+            break
+    else:
+        if filename.startswith(_ROOT):
+            filename = filename[len(_ROOT):]
+    return f"{filename}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class Sampler:
+    """One daemon thread sampling all threads registered with start()"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, Profile] = {}
+        self._names: Dict[object, str] = {}
+        self._lock = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, profile: Profile) -> None:
+        with self._lock:
+            self._active[threading.get_ident()] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+    
+    def stop(self) -> None:
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+    
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._lock.wait()
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for thread_id, profile in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.stacks[self._collapse(frame)] += 1
+                    profile.samples += 1
+            del frames
+            time.sleep(self.interval)
+    
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = _frame_name(code)
+            names.append(name)
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class ProfileStore:
+    """The most recent profiles of this process"""
+    
+    def __init__(self, keep: int):
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def new(self, method: str, path: str, reason: str) -> Profile:
+        return Profile(next(self._ids), method, path, reason)
+    
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+    
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+    
+    def get(self, profile_id: int) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+
+sampler: Optional[Sampler] = None
+store: Optional[ProfileStore] = None
+
+
+def _requested(token: Optional[str]) -> bool:
+    offered = request.headers.get(PROFILE_HEADER) or request.args.get("profile")
+    return bool(token and offered and hmac.compare_digest(offered, token))
+
+def init_app(app) -> None:
+    """Install the profiling hooks on an app"""
+    global sampler, store
+    sampler = Sampler(app.config["PROFILE_INTERVAL_MS"] / 1000)
+    store = ProfileStore(app.config["PROFILE_KEEP"])
+    
+    @app.before_request
+    def _start_profile():
+        if _requested(app.config.get("PROFILE_TOKEN")):
+            reason = "requested"
+        elif random.random() < app.config["PROFILE_SAMPLE_RATE"]:
+            reason = "sampled"
+        else:
+            return
+        # Path only: the query string may carry the profile token
+        g.profile = store.new(request.method, request.path, reason)
+        sampler.start(g.profile)
+    
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+        sampler.stop()
+        profile.duration = time.time() - profile.created_at
+        profile.status = response.status_code
+        store.add(profile)
+        response.headers[PROFILE_ID_HEADER] = str(profile.id)
+        return response
+    
+    @app.teardown_request
+    def _abandon_profile(exc):
+        # after_request is skipped on unhandled errors
+        if g.pop("profile", None) is not None:
+            sampler.stop()
@@ -0,0 +1,54 @@
+import time
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more SQL statements than its budget"""
+
+
+class QueryCounter:
+    """Context manager that records every SQL statement run on any Engine.
+
+    Usage:
+        with QueryCounter() as counter:
+            client.get("/api/trips")
+        counter.count  # number of statements executed
+    """
+
+    def __init__(self, budget: Optional[int] = None, label: str = "block"):
+        self.budget = budget
+        self.label = label
+        self.statements: List[Tuple[str, float]] = []
+        self._started_at: List[float] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_time(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started_at.append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = self._started_at.pop() if self._started_at else time.perf_counter()
+        self.statements.append((statement, time.perf_counter() - started))
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(Engine, "before_cursor_execute", self._before)
+        event.remove(Engine, "after_cursor_execute", self._after)
+        if exc_type is None and self.budget is not None and self.count > self.budget:
+            raise QueryBudgetExceeded(
+                f"{self.label} ran {self.count} queries (budget {self.budget}):\n"
+                + "\n".join(statement for statement, _ in self.statements)
+            )
+        return False
@@ -1,8 +1,25 @@
-from flask import Blueprint, request, jsonify
+import hashlib
+import hmac
+import json
+import threading
+import time
+from functools import wraps
+from flask import Blueprint, Response, current_app, request, jsonify, make_response, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
+from backend import metrics, passwords, profiling
 from backend.models import db, User
 from backend.services.trip_service import TripService
 from backend.services.expense_service import ExpenseService
+from backend.services.settlement_service import SettlementService
+from backend.services.projections import SUMMARY_FIELDS, validate_fields
+from backend.services.pagination import DEFAULT_PAGE_SIZE
+from backend.services.importers import reader_for
+from backend.services.export_service import ExportService, EXPORT_TABLES
+from backend.services.cache import trip_cache, trip_revision, user_cache
+from backend.services.events import event_bus
+from backend.services.sync_service import SyncService
+from backend.services.analytics_service import AnalyticsService
+from backend.services.batch_service import BatchService, BatchError
 from backend.services.member_service import MemberService
 from backend.services.activity_service import ActivityService
 from backend.services.driver_service import DriverService
@@ -10,6 +27,93 @@ from backend.services.hotel_service import HotelService
 
 api = Blueprint('api', __name__)
 
+# Reconnect delay suggested to EventSource clients
+SSE_RETRY_MS = 3000
+# Reconnect delay when SSE_MAX_STREAMS streams are already open
+SSE_BUSY_RETRY_MS = 15000
+
+# Query parameters that do not change a response body (left out of ETags)
+NON_REPRESENTATION_ARGS = frozenset({"profile"})
+
+# SSE streams open in this process
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+# ============================================
+# Request Helpers
+# ============================================
+
+def requested_fields():
+    """Field selection from ?view=summary or ?fields=a,b,c (None = full trip)"""
+    if request.args.get('view') == 'summary':
+        return SUMMARY_FIELDS
+    if 'fields' in request.args:
+        return [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+    return None
+
+def requested_page():
+    """(limit, cursor) when the client asked for a page, None for the full list"""
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    return request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), request.args.get('cursor')
+
+def page_response(page):
+    return jsonify({
+        "items": [item.to_dict() for item in page.items],
+        "nextCursor": page.next_cursor,
+    })
+
+def paid_by_ref():
+    """?paidBy=ref: expenses reference their payer by paidById instead of embedding it"""
+    return request.args.get('paidBy') == 'ref'
+
+def representation_key():
+    """Short digest of the route and its query parameters (?fields=, ?view=,
+    ?limit=, ?format=, ...), so each variant of a response gets its own ETag"""
+    args = sorted(
+        (key, values) for key, values in request.args.lists()
+        if key not in NON_REPRESENTATION_ARGS
+    )
+    return hashlib.blake2b(json.dumps([request.endpoint, args]).encode(), digest_size=6).hexdigest()
+
+def conditional_on_trip(view):
+    """Strong ETag from the trip's revision on a trip-scoped GET.
+
+    The ETag is the trip id, its revision and the representation_key() of
+    the request. A matching If-None-Match is answered with 304 after a
+    single indexed lookup, before the view (and any ORM loading or to_dict)
+    runs.
+    """
+    @wraps(view)
+    def wrapper(id, *args, **kwargs):
+        revision = trip_revision(id)
+        if revision is None:
+            return view(id, *args, **kwargs)  # let the view answer 404
+        etag = f"{id}.{revision}.{representation_key()}"
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(id, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # Clients may keep the body but must revalidate before reusing it
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return wrapper
+
+@api.errorhandler(ValueError)
+def handle_value_error(e):
+    # Malformed input the services reject (bad cursor, invalid amount)
+    return jsonify({"message": str(e)}), 400
+
+@api.errorhandler(passwords.HashPoolBusy)
+def handle_hash_pool_busy(e):
+    # Password hashing is saturated; shed the request instead of queuing it
+    response = jsonify({"message": str(e)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # ============================================
 # Authentication Routes
 # ============================================
@@ -43,10 +147,28 @@ def login():
         username = data['username']
         password = data['password']
         
+        # Throttled before any hashing, so repeated failures cost next to
+        # nothing; the attempt counts as failed until the password checks out
+        address = request.remote_addr or ""
+        attempt = passwords.throttle.reserve(username, address)
+        if attempt.retry_after:
+            response = jsonify({"message": "Too many failed login attempts, try again later"})
+            response.headers['Retry-After'] = str(attempt.retry_after)
+            return response, 429
+        
         user = db.session.execute(db.select(User).filter_by(username=username)).scalar()
-        if not user or not user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except passwords.HashPoolBusy:
+            passwords.throttle.release(attempt)
+            raise
+        if not valid:
             return jsonify({"message": "Invalid username or password"}), 401
+        passwords.throttle.succeeded(attempt)
         
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
         login_user(user)
         return jsonify(user.to_dict()), 200
     except KeyError as e:
@@ -79,7 +201,10 @@ def update_user():
             user.set_password(data['password'])
             
         db.session.commit()
+        user_cache.forget(user.id)
         return jsonify(user.to_dict()), 200
+    except passwords.HashPoolBusy:
+        raise
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -88,8 +213,10 @@ def update_user():
 def delete_user():
     try:
         user = current_user
+        user_id = user.id
         db.session.delete(user)
         db.session.commit()
+        user_cache.forget(user_id)
         logout_user()
         return jsonify({"message": "Account deleted"}), 200
     except Exception as e:
@@ -103,38 +230,48 @@ def delete_user():
 @api.route('/trips', methods=['GET'])
 @login_required # Ensure login
 def get_trips():
+    fields = requested_fields()
+    if fields is not None:
+        unknown = validate_fields(fields)
+        if unknown:
+            return jsonify({"message": f"Unknown fields: {', '.join(unknown)}"}), 400
+        return jsonify(TripService.get_user_trip_views(current_user.id, fields))
+    
+    page = requested_page()
+    if page is not None:
+        return page_response(TripService.get_user_trips_page(current_user.id, *page))
+    
     # Only get trips for current user
-    trips = TripService.get_user_trips(current_user.id)
-    return jsonify([trip.to_dict() for trip in trips])
+    return jsonify(TripService.get_user_trip_details(current_user.id, paid_by_ref()))
 
 @api.route('/trips/<id>', methods=['GET'])
 @login_required 
+@conditional_on_trip
 def get_trip(id):
-    trip = TripService.get_trip_by_id(id)
+    fields = requested_fields()
+    if fields is not None:
+        unknown = validate_fields(fields)
+        if unknown:
+            return jsonify({"message": f"Unknown fields: {', '.join(unknown)}"}), 400
+        view = TripService.get_trip_view(id, fields)
+        if not view:
+            return jsonify({"message": "Trip not found"}), 404
+        return jsonify(view)
+    
+    ref = paid_by_ref()
+    trip = trip_cache.get_or_load(id, "trip:ref" if ref else "trip", lambda: TripService.get_trip_detail(id, ref))
     if not trip:
         return jsonify({"message": "Trip not found"}), 404
     # Optional: Check if trip belongs to user
     # if trip.user_id != current_user.id: return 403
-    return jsonify(trip.to_dict())
+    return jsonify(trip)
 
 @api.route('/trips', methods=['POST'])
 @login_required
 def create_trip():
     try:
-        # Pass current_user.id
-        trip = TripService.create_trip(request.json, current_user.id)
-        
-        # Also create a Member for the creator (Owner)
-        from backend.services.member_service import MemberService
-        MemberService.add_member({
-            "tripId": trip.id,
-            "name": current_user.username, # Or from request
-            "email": current_user.email,
-            "userId": current_user.id,
-            "avatar": current_user.avatar,
-            "isAdmin": "true" 
-        })
-        
+        # The creator is added as the owner member in the same transaction
+        trip = TripService.create_trip_with_owner(request.json, current_user)
         return jsonify(trip.to_dict()), 201
     except KeyError as e:
         return jsonify({"message": f"Missing field: {str(e)}"}), 400
@@ -159,9 +296,12 @@ def delete_trip(id):
 # ============================================
 
 @api.route('/trips/<id>/members', methods=['GET'])
+@conditional_on_trip
 def get_members(id):
-    members = MemberService.get_members_by_trip(id)
-    return jsonify([member.to_dict() for member in members])
+    page = requested_page()
+    if page is not None:
+        return page_response(MemberService.get_members_page(id, *page))
+    return jsonify(trip_cache.get_or_load(id, "members", lambda: MemberService.get_member_views(id)))
 
 @api.route('/trips/<id>/members', methods=['POST'])
 def add_member(id):
@@ -193,9 +333,14 @@ def delete_member(trip_id, member_id):
 # ============================================
 
 @api.route('/trips/<id>/expenses', methods=['GET'])
+@conditional_on_trip
 def get_expenses(id):
-    expenses = ExpenseService.get_expenses_by_trip(id)
-    return jsonify([expense.to_dict() for expense in expenses])
+    page = requested_page()
+    if page is not None:
+        return page_response(ExpenseService.get_expenses_page(id, *page))
+    if paid_by_ref():
+        return jsonify(trip_cache.get_or_load(id, "expenses:ref", lambda: ExpenseService.get_expense_views_by_ref(id)))
+    return jsonify(trip_cache.get_or_load(id, "expenses", lambda: ExpenseService.get_expense_views(id)))
 
 @api.route('/trips/<id>/expenses', methods=['POST'])
 def create_expense(id):
@@ -207,6 +352,21 @@ def create_expense(id):
     except KeyError as e:
         return jsonify({"message": f"Missing field: {str(e)}"}), 400
 
+@api.route('/trips/<id>/expenses:bulk', methods=['POST'])
+def bulk_create_expenses(id):
+    # Accepts a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv)
+    if not TripService.trip_exists(id):
+        return jsonify({"message": "Trip not found"}), 404
+    reader = reader_for(request.mimetype)
+    if reader is None:
+        return jsonify({"message": f"Unsupported content type: {request.mimetype}"}), 415
+    
+    partial = request.args.get('partial') == 'true'
+    results, created = ExpenseService.bulk_create_expenses(id, reader(request.stream), partial=partial)
+    failed = any(result["status"] == "error" for result in results)
+    status = 201 if created else (400 if failed else 200)
+    return jsonify({"created": created, "results": results}), status
+
 @api.route('/trips/<trip_id>/expenses/<expense_id>', methods=['PUT'])
 def update_expense(trip_id, expense_id):
     expense = ExpenseService.update_expense(expense_id, request.json)
@@ -221,15 +381,136 @@ def delete_expense(trip_id, expense_id):
         return jsonify({"message": "Expense not found"}), 404
     return jsonify({"message": "Expense deleted"}), 200
 
+@api.route('/trips/<id>/export', methods=['GET'])
+@conditional_on_trip
+def export_trip(id):
+    # ?format=ndjson (default, all tables or ?table=) or ?format=csv&table=<table>
+    if not TripService.trip_exists(id):
+        return jsonify({"message": "Trip not found"}), 404
+    export_format = request.args.get('format', 'ndjson')
+    table = request.args.get('table')
+    if table is not None and table not in EXPORT_TABLES:
+        return jsonify({"message": f"Unknown table: {table}"}), 400
+    
+    if export_format == 'ndjson':
+        body = ExportService.stream_ndjson(id, [table] if table else None)
+        mimetype, extension = 'application/x-ndjson', 'ndjson'
+    elif export_format == 'csv':
+        table = table or 'expenses'
+        body = ExportService.stream_csv(id, table)
+        mimetype, extension = 'text/csv', 'csv'
+    else:
+        return jsonify({"message": f"Unknown format: {export_format}"}), 400
+    
+    filename = f"trip-{id}-{table or 'ledger'}.{extension}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api.route('/trips/<id>/changes', methods=['GET'])
+@conditional_on_trip
+def get_trip_changes(id):
+    # Delta sync: rows written and deleted after ?since=<revision>
+    since = request.args.get('since', '0')
+    if not since.isdigit():
+        return jsonify({"message": "since must be a non-negative revision number"}), 400
+    changes = SyncService.get_changes(id, int(since))
+    if changes is None:
+        return jsonify({"message": "Trip not found"}), 404
+    return jsonify(changes)
+
+@api.route('/trips/<id>/analytics', methods=['GET'])
+@conditional_on_trip
+def get_trip_analytics(id):
+    analytics = AnalyticsService.get_analytics(id)
+    if analytics is None:
+        return jsonify({"message": "Trip not found"}), 404
+    return jsonify(analytics)
+
+def _open_stream(limit: int) -> bool:
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+def _close_stream() -> None:
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+@api.route('/trips/<id>/events', methods=['GET'])
+def trip_events(id):
+    # Server-sent events; reconnects resume from the Last-Event-ID header
+    if not TripService.trip_exists(id):
+        return jsonify({"message": "Trip not found"}), 404
+    last_id = request.headers.get('Last-Event-ID', request.args.get('lastEventId'))
+    try:
+        # None: an id from another process or before a restart
+        last_id = event_bus.parse_id(last_id) if last_id is not None else event_bus.latest_id()
+    except ValueError:
+        return jsonify({"message": "Invalid Last-Event-ID"}), 400
+    
+    keepalive = current_app.config["SSE_KEEPALIVE_SECONDS"]
+    max_seconds = current_app.config["SSE_MAX_SECONDS"]
+    if not _open_stream(current_app.config["SSE_MAX_STREAMS"]):
+        # Every stream slot is taken: end at once and let the browser
+        # reconnect later, instead of holding another server thread
+        return Response(f"retry: {SSE_BUSY_RETRY_MS}\n\n", mimetype='text/event-stream',
+                        headers={"Cache-Control": "no-cache"})
+    
+    def stream(after):
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        # Streams end after max_seconds so workers are recycled; the browser
+        # reconnects on its own and resumes from the last id it saw
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            events = None if after is None else event_bus.wait(
+                id, after, timeout=min(keepalive, max(deadline - time.monotonic(), 0))
+            )
+            if events is None:
+                # Missed events are gone from the replay log (or were never
+                # in it): reload everything
+                after = event_bus.latest_id()
+                yield f"id: {event_bus.format_id(after)}\nevent: reset\ndata: {{}}\n\n"
+            elif events:
+                for event_id, payload in events:
+                    yield f"id: {event_bus.format_id(event_id)}\nevent: change\ndata: {json.dumps(payload)}\n\n"
+                after = events[-1][0]
+            else:
+                yield ": keepalive\n\n"
+    
+    response = Response(
+        stream(last_id),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs when the server closes the response, even if it was never iterated
+    response.call_on_close(_close_stream)
+    return response
+
+@api.route('/trips/<id>/settlements', methods=['GET'])
+@conditional_on_trip
+def get_settlements(id):
+    if not TripService.trip_exists(id):
+        return jsonify({"message": "Trip not found"}), 404
+    return jsonify(SettlementService.get_settlements(id))
+
 
 # ============================================
 # Activity Routes (Using Service Layer - OOP)
 # ============================================
 
 @api.route('/trips/<id>/activities', methods=['GET'])
+@conditional_on_trip
 def get_activities(id):
-    activities = ActivityService.get_activities_by_trip(id)
-    return jsonify([activity.to_dict() for activity in activities])
+    page = requested_page()
+    if page is not None:
+        return page_response(ActivityService.get_activities_page(id, *page))
+    return jsonify(trip_cache.get_or_load(id, "activities", lambda: ActivityService.get_activity_views(id)))
 
 @api.route('/trips/<id>/activities', methods=['POST'])
 def create_activity(id):
@@ -264,9 +545,12 @@ def delete_activity(trip_id, activity_id):
 # ============================================
 
 @api.route('/trips/<id>/drivers', methods=['GET'])
+@conditional_on_trip
 def get_drivers(id):
-    drivers = DriverService.get_drivers_by_trip(id)
-    return jsonify([driver.to_dict() for driver in drivers])
+    page = requested_page()
+    if page is not None:
+        return page_response(DriverService.get_drivers_page(id, *page))
+    return jsonify(trip_cache.get_or_load(id, "drivers", lambda: DriverService.get_driver_views(id)))
 
 @api.route('/trips/<id>/drivers', methods=['POST'])
 def hire_driver(id):
@@ -298,9 +582,12 @@ def cancel_driver(trip_id, driver_id):
 # ============================================
 
 @api.route('/trips/<id>/hotels', methods=['GET'])
+@conditional_on_trip
 def get_hotels(id):
-    hotels = HotelService.get_hotels_by_trip(id)
-    return jsonify([hotel.to_dict() for hotel in hotels])
+    page = requested_page()
+    if page is not None:
+        return page_response(HotelService.get_hotels_page(id, *page))
+    return jsonify(trip_cache.get_or_load(id, "hotels", lambda: HotelService.get_hotel_views(id)))
 
 @api.route('/trips/<id>/hotels', methods=['POST'])
 def book_hotel(id):
@@ -325,3 +612,79 @@ def cancel_hotel(trip_id, hotel_id):
     if not success:
         return jsonify({"message": "Hotel not found"}), 404
     return jsonify({"message": "Hotel booking cancelled"}), 200
+
+# ============================================
+# Batch Route
+# ============================================
+
+@api.route('/batch', methods=['POST'])
+@login_required
+def batch():
+    # Ordered create/update/delete operations applied in one transaction;
+    # ?partial=true commits the operations that succeed and reports the rest
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    partial = request.args.get('partial') == 'true'
+    try:
+        results = BatchService.apply(operations, current_user, partial=partial)
+    except BatchError as e:
+        # Nothing was written; point at the operation that failed
+        return jsonify({"message": e.message, "index": e.index}), e.status
+    return jsonify({"results": results}), 200
+
+# ============================================
+# Diagnostics
+# ============================================
+
+def diagnostics_denied(token_setting):
+    # Error response unless the request has "Authorization: Bearer <token>";
+    # without a configured token the endpoint is off
+    token = current_app.config.get(token_setting)
+    if not token:
+        return jsonify({"message": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({"message": "Unauthorized"}), 401
+    return None
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus scrape endpoint (per process), only with METRICS_TOKEN set
+    denied = diagnostics_denied("METRICS_TOKEN")
+    if denied:
+        return denied
+    body = metrics.registry.render() + metrics.gauge_lines(
+        "tripmate_trip_cache", "Trip cache counters", trip_cache.stats()
+    ) + metrics.gauge_lines(
+        "tripmate_user_cache", "user_loader cache counters", user_cache.stats()
+    ) + metrics.gauge_lines(
+        "tripmate_auth", "Password hashing and login throttle counters", passwords.stats()
+    )
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@api.route('/profiles', methods=['GET'])
+def list_profiles():
+    # Profiles cover every user's requests, so they need PROFILE_TOKEN
+    denied = diagnostics_denied("PROFILE_TOKEN")
+    if denied:
+        return denied
+    return jsonify([profile.to_dict() for profile in profiling.store.list()])
+
+@api.route('/profiles/<int:profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    # Collapsed stacks, ready for flamegraph.pl or speedscope
+    denied = diagnostics_denied("PROFILE_TOKEN")
+    if denied:
+        return denied
+    profile = profiling.store.get(profile_id)
+    if not profile:
+        return jsonify({"message": "Profile not found"}), 404
+    return Response(
+        profile.collapsed(),
+        mimetype='text/plain',
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
+
+@api.route('/cache/stats', methods=['GET'])
+@login_required
+def cache_stats():
+    return jsonify(trip_cache.stats())
@@ -1,10 +1,18 @@
-from backend.models import db, Activity
+from backend.models import db, Activity, to_money
+from backend.services.changes import record_change
+from backend.services.transaction import commit, write_retry
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import ACTIVITY
 from typing import Optional, List, Dict, Any
 
+# Stable sort key for listing and keyset pagination
+ACTIVITY_ORDER = (Activity.date, Activity.id)
+
 class ActivityService:
     """Service class for Activity business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def create_activity(activity_data: Dict[str, Any]) -> Activity:
         """Create a new activity"""
         activity = Activity(
@@ -14,25 +22,41 @@ class ActivityService:
             date=activity_data['date'],
             time=activity_data.get('time'),
             description=activity_data.get('description'),
-            cost=activity_data.get('cost')
+            cost=to_money(activity_data.get('cost'))
         )
         db.session.add(activity)
-        db.session.commit()
+        db.session.flush()
+        record_change(activity.trip_id, "activity", "create", activity.id)
+        commit()
         return activity
     
     @staticmethod
     def get_activities_by_trip(trip_id: str) -> List[Activity]:
         """Get all activities for a trip"""
         return db.session.execute(
-            db.select(Activity).filter_by(trip_id=trip_id)
+            db.select(Activity).filter_by(trip_id=trip_id).order_by(*ACTIVITY_ORDER)
         ).scalars().all()
     
+    @staticmethod
+    def get_activity_views(trip_id: str) -> List[Dict[str, Any]]:
+        """Activity.to_dict() of every activity in a trip, built from row tuples"""
+        return ACTIVITY.all(ACTIVITY.select().where(Activity.trip_id == trip_id).order_by(*ACTIVITY_ORDER))
+    
+    @staticmethod
+    def get_activities_page(trip_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of activities for a trip (keyset pagination)"""
+        return paginate(
+            db.select(Activity).filter_by(trip_id=trip_id),
+            ACTIVITY_ORDER, limit, cursor
+        )
+    
     @staticmethod
     def get_activity_by_id(activity_id: str) -> Optional[Activity]:
         """Get activity by ID"""
         return db.session.get(Activity, activity_id)
     
     @staticmethod
+    @write_retry
     def update_activity(activity_id: str, activity_data: Dict[str, Any]) -> Optional[Activity]:
         """Update an existing activity"""
         activity = db.session.get(Activity, activity_id)
@@ -51,18 +75,21 @@ class ActivityService:
         if 'description' in activity_data:
             activity.description = activity_data['description']
         if 'cost' in activity_data:
-            activity.cost = activity_data['cost']
+            activity.cost = to_money(activity_data['cost'])
         
-        db.session.commit()
+        record_change(activity.trip_id, "activity", "update", activity.id)
+        commit()
         return activity
     
     @staticmethod
+    @write_retry
     def delete_activity(activity_id: str) -> bool:
         """Delete an activity"""
         activity = db.session.get(Activity, activity_id)
         if not activity:
             return False
         
+        record_change(activity.trip_id, "activity", "delete", activity.id)
         db.session.delete(activity)
-        db.session.commit()
+        commit()
         return True
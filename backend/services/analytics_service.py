@@ -0,0 +1,98 @@
+from backend.models import db, Trip, Member, Expense, Activity, Driver, Hotel
+from backend.services.balance_service import BalanceService
+from backend.services.cache import trip_cache
+from decimal import Decimal
+from typing import Optional, Dict, Any
+
+ZERO = Decimal(0)
+
+def _money(value) -> float:
+    return float(value) if value else 0.0
+
+class AnalyticsService:
+    """Service class for trip spending analytics (OOP)
+
+    Expense figures are aggregated by the database (SUM / GROUP BY over a
+    covering index); the response size depends on the number of categories,
+    days and members, not on the number of expenses. The work does not: a
+    cold compute() reads every index entry of the trip's expenses, so it is
+    linear in them. Latency is independent of the expense count only while
+    the trip cache is warm, i.e. from the second read after each write.
+    """
+    
+    @staticmethod
+    def get_analytics(trip_id: str) -> Optional[Dict[str, Any]]:
+        """Analytics for a trip, cached until the next write to the trip"""
+        return trip_cache.get_or_load(trip_id, "analytics", lambda: AnalyticsService.compute(trip_id))
+    
+    @staticmethod
+    def compute(trip_id: str) -> Optional[Dict[str, Any]]:
+        """Budget vs spend, spend by category, by day and by member (None if no trip).
+        
+        O(expenses in the trip): one index-only pass, no table reads.
+        """
+        budget = db.session.execute(db.select(Trip.budget).filter_by(id=trip_id)).scalar()
+        if budget is None:
+            return None
+        
+        # One index-only pass over ix_expenses_trip_analytics, grouped in
+        # index order (no temp b-tree); the groups are bounded by
+        # categories x days x payers and rolled up below
+        groups = db.session.execute(
+            db.select(Expense.category, Expense.date, Expense.paid_by_id, db.func.sum(Expense.amount), db.func.count())
+            .where(Expense.trip_id == trip_id)
+            .group_by(Expense.category, Expense.date, Expense.paid_by_id)
+        ).all()
+        by_category: Dict[str, list] = {}
+        by_day: Dict[str, list] = {}
+        paid: Dict[str, Decimal] = {}
+        for category, date, paid_by_id, total, count in groups:
+            for rollup, key in ((by_category, category), (by_day, date)):
+                entry = rollup.setdefault(key, [ZERO, 0])
+                entry[0] += total
+                entry[1] += count
+            paid[paid_by_id] = paid.get(paid_by_id, ZERO) + total
+        members = db.session.execute(
+            db.select(Member.id, Member.name).filter_by(trip_id=trip_id).order_by(Member.id)
+        ).all()
+        # balance = paid - share, so each member's share comes from the ledger
+        balances = BalanceService.get_balances(trip_id)
+        
+        planned = {
+            "activities": db.session.execute(
+                db.select(db.func.sum(Activity.cost)).where(Activity.trip_id == trip_id)
+            ).scalar(),
+            "drivers": db.session.execute(
+                db.select(db.func.sum(Driver.cost))
+                .where(Driver.trip_id == trip_id, Driver.status != "cancelled")
+            ).scalar(),
+            "hotels": db.session.execute(
+                db.select(db.func.sum(Hotel.cost))
+                .where(Hotel.trip_id == trip_id, Hotel.status != "cancelled")
+            ).scalar(),
+        }
+        
+        spent = sum(paid.values(), ZERO)
+        planned_total = sum((value or ZERO for value in planned.values()), ZERO)
+        return {
+            "tripId": trip_id,
+            "budget": _money(budget),
+            "totalSpent": _money(spent),
+            "plannedCosts": {name: _money(value) for name, value in planned.items()},
+            "remaining": _money(budget - spent - planned_total),
+            "budgetUsed": round(float(spent / budget), 4) if budget else None,
+            "byCategory": sorted(
+                [{"category": category, "total": _money(total), "count": count} for category, (total, count) in by_category.items()],
+                key=lambda row: row["total"], reverse=True,
+            ),
+            "byDay": [{"date": date, "total": _money(total), "count": count} for date, (total, count) in sorted(by_day.items())],
+            "byMember": [
+                {
+                    "memberId": member_id,
+                    "name": name,
+                    "paid": _money(paid.get(member_id)),
+                    "share": _money((paid.get(member_id) or ZERO) - balances.get(member_id, ZERO)),
+                }
+                for member_id, name in members
+            ],
+        }
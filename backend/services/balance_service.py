@@ -0,0 +1,135 @@
+from sqlalchemy import bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from backend.models import db, Trip, Member, Expense, MemberBalance
+from backend.services.changes import record_change
+from backend.services.loading import EXPENSE_PLAN
+from decimal import Decimal
+from typing import Optional, List, Dict, Any
+
+ZERO = Decimal(0)
+
+class BalanceService:
+    """Service class for the member balance ledger (OOP)
+
+    Balances are kept in member_balances and updated as deltas inside the
+    same transaction as the expense write, so reading them is O(members).
+    None of these methods commit; the calling service owns the transaction.
+    """
+    
+    @staticmethod
+    def expense_deltas(expense: Expense) -> Dict[str, Decimal]:
+        """Balance change caused by one expense: payer +amount, each split -share"""
+        # Payer is owed the full amount, everyone in the split owes their share
+        deltas: Dict[str, Decimal] = {}
+        deltas[expense.paid_by_id] = expense.amount or ZERO
+        for split in expense.splits:
+            deltas[split.member_id] = deltas.get(split.member_id, ZERO) - (split.amount or ZERO)
+        return deltas
+    
+    @staticmethod
+    def apply_deltas(trip_id: str, deltas: Dict[str, Decimal], sign: int = 1) -> None:
+        """Add (or with sign=-1, subtract) deltas to the trip's ledger rows.
+        
+        The addition happens in SQL (balance = balance + delta), never as a
+        read-modify-write in Python, so concurrent writers cannot overwrite
+        each other's updates. Members without a ledger row get one; ids that
+        are not members of this trip are ignored, as they always were when
+        balances were recomputed.
+        """
+        params = [
+            {"member_id": member_id, "trip_id": trip_id, "delta": sign * delta}
+            for member_id, delta in deltas.items() if delta
+        ]
+        if not params:
+            return
+        
+        # Core statement on the table: INSERT ... SELECT FROM members (which
+        # skips non-members) ... ON CONFLICT DO UPDATE SET balance = balance + delta
+        ledger = MemberBalance.__table__
+        insert = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(ledger).from_select(
+            ["member_id", "trip_id", "balance"],
+            db.select(Member.id, Member.trip_id, bindparam("delta", type_=ledger.c.balance.type))
+            .where(Member.id == bindparam("member_id"), Member.trip_id == bindparam("trip_id")),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ledger.c.member_id],
+            set_={"balance": ledger.c.balance + stmt.excluded.balance},
+        )
+        db.session.execute(stmt, params)
+    
+    @staticmethod
+    def get_balances(trip_id: str) -> Dict[str, Decimal]:
+        """Current balance of every member of a trip (O(members))"""
+        rows = db.session.execute(
+            db.select(Member.id, MemberBalance.balance)
+            .outerjoin(MemberBalance, MemberBalance.member_id == Member.id)
+            .where(Member.trip_id == trip_id)
+        ).all()
+        return {member_id: balance or ZERO for member_id, balance in rows}
+    
+    @staticmethod
+    def recompute_balances(trip_id: str) -> Dict[str, Decimal]:
+        """Rebuild balances from the raw expenses and splits (O(expenses x splits))"""
+        balances = {
+            member_id: ZERO
+            for member_id in db.session.execute(
+                db.select(Member.id).filter_by(trip_id=trip_id)
+            ).scalars()
+        }
+        expenses = db.session.execute(
+            db.select(Expense).filter_by(trip_id=trip_id).options(*EXPENSE_PLAN)
+        ).scalars()
+        for expense in expenses:
+            for member_id, delta in BalanceService.expense_deltas(expense).items():
+                if member_id in balances:
+                    balances[member_id] += delta
+        return balances
+    
+    @staticmethod
+    def check_trip(trip_id: str, repair: bool = False) -> List[Dict[str, Any]]:
+        """Compare the ledger against a full recompute and report any drift.
+
+        With repair=True the ledger rows are overwritten with the recomputed
+        values (the caller commits).
+        """
+        stored = BalanceService.get_balances(trip_id)
+        expected = BalanceService.recompute_balances(trip_id)
+        drift = []
+        for member_id, balance in expected.items():
+            if stored.get(member_id, ZERO) != balance:
+                drift.append({
+                    "tripId": trip_id,
+                    "memberId": member_id,
+                    "stored": stored.get(member_id, ZERO),
+                    "expected": balance,
+                })
+        
+        if repair and drift:
+            record_change(trip_id, "ledger", "update")
+        if repair:
+            entries = {
+                entry.member_id: entry
+                for entry in db.session.execute(
+                    db.select(MemberBalance).filter_by(trip_id=trip_id)
+                ).scalars()
+            }
+            for member_id, balance in expected.items():
+                if member_id in entries:
+                    entries[member_id].balance = balance
+                else:
+                    db.session.add(MemberBalance(member_id=member_id, trip_id=trip_id, balance=balance))
+        return drift
+    
+    @staticmethod
+    def check_all(repair: bool = False) -> List[Dict[str, Any]]:
+        """Run check_trip over every trip and collect the drift"""
+        drift = []
+        for trip_id in db.session.execute(db.select(Trip.id)).scalars().all():
+            drift.extend(BalanceService.check_trip(trip_id, repair=repair))
+        return drift
+    
+    @staticmethod
+    def ledger_is_empty() -> bool:
+        """True when no ledger rows exist yet (e.g. a database created before the ledger)"""
+        return db.session.execute(db.select(MemberBalance.member_id).limit(1)).first() is None
@@ -0,0 +1,199 @@
+from sqlalchemy.exc import IntegrityError
+from backend.services.transaction import atomic, run_with_retry
+from backend.services.trip_service import TripService
+from backend.services.member_service import MemberService
+from backend.services.expense_service import ExpenseService
+from backend.services.activity_service import ActivityService
+from backend.services.driver_service import DriverService
+from backend.services.hotel_service import HotelService
+from typing import List, Dict, Any, Callable, Tuple
+
+# Largest number of operations accepted in one batch
+MAX_BATCH_OPERATIONS = 200
+
+# ============================================
+# Batch operations (POST /api/batch)
+# ============================================
+#
+# Each operation is {"op": "create" | "update" | "delete", "entity": ...,
+# "id": ..., "tripId": ..., "data": {...}, "ref": ...} and maps onto the
+# same service method as its single-item route. All operations run in one
+# atomic() scope: one commit for the batch, or no change at all. In partial
+# mode each operation also gets its own SAVEPOINT, so a failing one is undone
+# and reported in its result while the others still commit together.
+#
+# An operation with a "ref" can be pointed at by later operations: a
+# "$<ref>" string as their id or tripId, or as the value of an id field in
+# their data (paidById, splitAmongIds, ...), is replaced with the id of the
+# row that operation wrote.
+
+# entity -> (create(data, user), update(id, data), delete(id))
+OPERATIONS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "trip": (
+        TripService.create_trip_with_owner,
+        TripService.update_trip,
+        TripService.delete_trip,
+    ),
+    "member": (
+        lambda data, user: MemberService.add_member(data),
+        MemberService.update_member,
+        MemberService.delete_member,
+    ),
+    "expense": (
+        lambda data, user: ExpenseService.create_expense(data),
+        ExpenseService.update_expense,
+        ExpenseService.delete_expense,
+    ),
+    "activity": (
+        lambda data, user: ActivityService.create_activity(data),
+        ActivityService.update_activity,
+        ActivityService.delete_activity,
+    ),
+    "driver": (
+        lambda data, user: DriverService.hire_driver(data),
+        DriverService.update_driver,
+        DriverService.cancel_driver,
+    ),
+    "hotel": (
+        lambda data, user: HotelService.book_hotel(data),
+        HotelService.update_hotel,
+        HotelService.cancel_hotel,
+    ),
+}
+
+
+class BatchError(Exception):
+    """An operation that failed; the whole batch was rolled back"""
+    
+    def __init__(self, index: int, status: int, message: str):
+        super().__init__(message)
+        self.index = index
+        self.status = status
+        self.message = message
+
+
+class _OperationError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BatchService:
+    """Service class for multi-operation requests (OOP)"""
+    
+    @staticmethod
+    def apply(operations: List[Dict[str, Any]], user, partial: bool = False) -> List[Dict[str, Any]]:
+        """Run the operations in order in a single transaction.
+        
+        Returns one result per operation ({"index", "status", "data"}).
+        Raises BatchError for the first operation that fails; nothing is
+        written in that case. With partial set, a failed operation gets a
+        {"index", "status", "message"} result instead and the rest commit.
+        """
+        if not isinstance(operations, list) or not operations:
+            raise BatchError(0, 400, "operations must be a non-empty list")
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise BatchError(0, 400, f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+        # The whole batch is retried on lock contention, from a fresh start
+        return run_with_retry(lambda: BatchService._apply(operations, user, partial))
+    
+    @staticmethod
+    def _apply(operations: List[Dict[str, Any]], user, partial: bool) -> List[Dict[str, Any]]:
+        refs: Dict[str, str] = {}
+        results = []
+        with atomic():
+            for index, operation in enumerate(operations):
+                try:
+                    with atomic(savepoint=partial):
+                        result = BatchService._run(operation, user, refs)
+                except (_OperationError, KeyError, ValueError, IntegrityError) as e:
+                    status, message = _error(e)
+                    if not partial:
+                        raise BatchError(index, status, message)
+                    result = {"status": status, "message": message}
+                results.append({"index": index, **result})
+        return results
+    
+    @staticmethod
+    def _run(operation: Dict[str, Any], user, refs: Dict[str, str]) -> Dict[str, Any]:
+        if not isinstance(operation, dict):
+            raise _OperationError(400, "Each operation must be an object")
+        op, entity = operation.get("op"), operation.get("entity")
+        if entity not in OPERATIONS:
+            raise _OperationError(400, f"Unknown entity: {entity}")
+        create, update, delete = OPERATIONS[entity]
+        data = operation.get("data") or {}
+        if not isinstance(data, dict):
+            raise _OperationError(400, "data must be an object")
+        if op not in ("create", "update", "delete"):
+            raise _OperationError(400, f"Unknown op: {op}")
+        # Ids reach session.get() and IN lists as they are, so check their
+        # types here rather than let the database layer fail with a 500
+        if op != "create":
+            _check_id(operation.get("id"), "id")
+        elif entity != "trip":
+            _check_id(operation.get("tripId"), "tripId")
+        if operation.get("ref") is not None and not isinstance(operation["ref"], str):
+            raise _OperationError(400, "ref must be a string")
+        for key, value in data.items():
+            if key.endswith("Ids"):
+                if not isinstance(value, list):
+                    raise _OperationError(400, f"{key} must be a list of ids")
+                for item in value:
+                    _check_id(item, key)
+            elif key.endswith("Id") and value is not None:
+                _check_id(value, key)
+            elif isinstance(value, (dict, list)):
+                raise _OperationError(400, f"{key} must be a string, number or boolean")
+        data = {
+            key: resolve(value, refs) if key.endswith(("Id", "Ids")) else value
+            for key, value in data.items()
+        }
+        
+        if op == "create":
+            if entity != "trip":
+                data["tripId"] = resolve(operation["tripId"], refs)
+            row = create(data, user)
+            status = 201
+        elif op == "update":
+            row = update(resolve(operation["id"], refs), data)
+            status = 200
+        else:
+            row_id = resolve(operation["id"], refs)
+            if not delete(row_id):
+                raise _OperationError(404, f"{entity.capitalize()} not found")
+            return {"status": 200, "data": {"id": row_id}}
+        
+        if row is None:
+            raise _OperationError(404, f"{entity.capitalize()} not found")
+        if operation.get("ref"):
+            refs[operation["ref"]] = row.id
+        return {"status": status, "data": row.to_dict()}
+
+
+def _error(error: Exception) -> Tuple[int, str]:
+    """HTTP status and message for an operation that raised"""
+    if isinstance(error, _OperationError):
+        return error.status, error.message
+    if isinstance(error, KeyError):
+        return 400, f"Missing field: {error}"
+    if isinstance(error, IntegrityError):
+        return 409, f"Conflicts with existing data: {error.orig}"
+    return 400, str(error)
+
+
+def _check_id(value, field: str) -> None:
+    if not isinstance(value, str) or not value:
+        raise _OperationError(400, f"{field} must be an id or a $ref string")
+
+
+def resolve(value, refs: Dict[str, str]):
+    """Replace a "$<ref>" id (or list of ids) with the ids it names"""
+    if isinstance(value, list):
+        return [resolve(item, refs) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in refs:
+            raise _OperationError(400, f"Unknown reference: {value}")
+        return refs[value[1:]]
+    return value
@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import g, has_app_context
+from sqlalchemy.orm import make_transient_to_detached
+from backend import metrics
+from backend.models import db, Trip, User
+from backend.services.changes import subscribe
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# ============================================
+# Per-trip versioned read cache
+# ============================================
+#
+# Cached reads are stored under "trip:<id>:<revision>:<name>". trips.revision
+# is bumped in the same transaction as every write to the trip, so stale
+# entries are never looked up again and simply age out, and every worker
+# process agrees on what is current. A small in-process LRU sits in front of
+# the shared backend.
+
+def trip_revision(trip_id: str) -> Optional[int]:
+    """trips.revision (None if the trip does not exist), looked up once per request"""
+    memo = g.setdefault("trip_revisions", {}) if has_app_context() else {}
+    if trip_id not in memo:
+        memo[trip_id] = db.session.execute(
+            db.select(Trip.revision).filter_by(id=trip_id)
+        ).scalar()
+    return memo[trip_id]
+
+class LocalBackend:
+    """In-process stand-in for a shared cache (Redis, memcached).
+
+    A real backend needs the same two operations; values are plain
+    JSON-serialisable dicts/lists so they can be stored anywhere.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._data.get(key)
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class TripCache:
+    """Versioned cache of per-trip read results"""
+    
+    def __init__(self, backend=None, max_entries: int = 1024):
+        self.backend = backend or LocalBackend()
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"localHits": 0, "sharedHits": 0, "misses": 0}
+    
+    def configure(self, backend=None, max_entries: Optional[int] = None) -> None:
+        """Swap the shared backend and/or resize the local LRU (drops local entries)"""
+        with self._lock:
+            if backend is not None:
+                self.backend = backend
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._local.clear()
+    
+    def get_or_load(self, trip_id: str, name: str, load: Callable[[], Any]) -> Any:
+        """Cached value of `name` for a trip, calling load() on a miss.
+
+        None results (trip not found) are not cached.
+        """
+        revision = trip_revision(trip_id)
+        if revision is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return load()
+        key = f"trip:{trip_id}:{revision}:{name}"
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                self._stats["localHits"] += 1
+                return self._local[key]
+        
+        value = self.backend.get(key)
+        if value is not None:
+            self._remember(key, value, "sharedHits")
+            return value
+        
+        value = load()
+        if value is not None:
+            self.backend.set(key, value)
+            self._remember(key, value, "misses")
+        else:
+            with self._lock:
+                self._stats["misses"] += 1
+        return value
+    
+    def _remember(self, key: str, value: Any, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+            self._local[key] = value
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters plus the current local LRU size"""
+        with self._lock:
+            return {**self._stats, "localEntries": len(self._local)}
+
+
+trip_cache = TripCache()
+
+@subscribe
+def _forget_revisions(changes):
+    # A write committed during this request: look the revision up again
+    if has_app_context():
+        memo = g.get("trip_revisions", {})
+        for change in changes:
+            memo.pop(change.trip_id, None)
+
+
+# ============================================
+# user_loader cache
+# ============================================
+#
+# Flask-Login loads the session's user on every authenticated request. Users
+# seen in the last USER_CACHE_TTL_SECONDS are kept as their column values and
+# attached to the request's session with merge(load=False), which makes a
+# persistent User without a SELECT. The password hash is never cached: it is
+# left unloaded and fetched from the database if a request touches it.
+# update_user and delete_user forget their entry here; other worker processes
+# may still serve the old profile (or a just-deleted user) until the TTL runs
+# out, which is why it is short.
+
+# User columns kept out of the cache
+UNCACHED_USER_COLUMNS = frozenset({"password_hash"})
+
+class UserCache:
+    """TTL-bounded LRU of users by id, for the user_loader"""
+    
+    def __init__(self, ttl: float = 30, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+    
+    def configure(self, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        """Change the TTL (0 turns the cache off) and/or size; drops all entries"""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._entries.clear()
+    
+    def load(self, user_id: str) -> Optional[User]:
+        """The user, attached to the current session, or None if there is none"""
+        if not self.ttl:
+            return db.session.get(User, user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self._stats["hits"] += 1
+            else:
+                entry = None
+                self._stats["misses"] += 1
+        if entry is not None:
+            metrics.count_saved_statement()
+            # Columns missing from the copy (the password hash) stay unloaded
+            copy = User(**entry[1])
+            make_transient_to_detached(copy)
+            return db.session.merge(copy, load=False)
+        
+        user = db.session.get(User, user_id)
+        if user is not None:
+            # Plain values: the session's instance is expired by commits and
+            # detached when the request ends
+            columns = {
+                attr.key: getattr(user, attr.key) for attr in db.inspect(User).column_attrs
+                if attr.key not in UNCACHED_USER_COLUMNS
+            }
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, columns)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return user
+    
+    def forget(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters (a hit is one SELECT saved) plus the current size"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+user_cache = UserCache()
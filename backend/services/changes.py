@@ -0,0 +1,105 @@
+from backend.models import db, Trip, Member, Expense, Activity, Driver, Hotel, Tombstone
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# ============================================
+# Trip change notifications
+# ============================================
+#
+# Services call record_change() next to each write. The records are held on
+# the session and handed to subscribers only after the transaction commits
+# (and dropped on rollback), so caches never see a write that did not land.
+#
+# The first change to a trip in a transaction also bumps trips.revision in
+# that same transaction, so the persisted revision moves exactly when the
+# data does. The changed row is stamped with that revision and a deleted row
+# leaves a tombstone, which is what delta sync (GET /trips/<id>/changes) reads.
+
+class Change(NamedTuple):
+    trip_id: str
+    entity: str      # "trip", "member", "expense", ...
+    op: str          # "create", "update" or "delete"
+    entity_id: Optional[str] = None
+
+_PENDING_KEY = "pending_trip_changes"
+_REVISED_KEY = "revised_trips"
+_subscribers: List[Callable[[List[Change]], None]] = []
+
+# Entities whose rows carry a revision column
+REVISIONED_MODELS = {
+    "member": Member,
+    "expense": Expense,
+    "activity": Activity,
+    "driver": Driver,
+    "hotel": Hotel,
+}
+
+def bump_revision(trip_id: str) -> Optional[int]:
+    """The trip revision written by the current transaction.
+
+    The first call per trip increments trips.revision; later calls in the
+    same transaction return the same number. None if the trip is gone.
+    """
+    revised = db.session.info.setdefault(_REVISED_KEY, {})
+    if trip_id not in revised:
+        revised[trip_id] = db.session.execute(
+            db.update(Trip)
+            .where(Trip.id == trip_id)
+            .values(revision=Trip.revision + 1)
+            .returning(Trip.revision)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    return revised[trip_id]
+
+def record_change(trip_id: str, entity: str, op: str, entity_id: Optional[str] = None) -> None:
+    """Queue a change record for delivery when the current transaction commits.
+
+    Also stamps the row (if it is loaded in the session) with the new trip
+    revision, or writes a tombstone for a delete. Rows written with Core
+    inserts must set their revision themselves from bump_revision().
+    """
+    revision = bump_revision(trip_id)
+    model = REVISIONED_MODELS.get(entity)
+    if model is not None and entity_id is not None and revision is not None:
+        if op == "delete":
+            db.session.add(Tombstone(trip_id=trip_id, entity=entity, entity_id=entity_id, revision=revision))
+        else:
+            key = db.inspect(model).identity_key_from_primary_key((entity_id,))
+            row = db.session.identity_map.get(key)
+            if row is not None:
+                row.revision = revision
+    db.session.info.setdefault(_PENDING_KEY, []).append(Change(trip_id, entity, op, entity_id))
+
+def snapshot_changes() -> Tuple[List[Change], Dict[str, Optional[int]]]:
+    """The changes queued so far in this transaction, for restore_changes()"""
+    return (list(db.session.info.get(_PENDING_KEY, ())), dict(db.session.info.get(_REVISED_KEY, {})))
+
+def restore_changes(snapshot: Tuple[List[Change], Dict[str, Optional[int]]]) -> None:
+    """Forget the changes queued after snapshot_changes() (their SAVEPOINT was rolled back)"""
+    db.session.info[_PENDING_KEY], db.session.info[_REVISED_KEY] = snapshot
+
+def subscribe(callback: Callable[[List[Change]], None]) -> Callable[[List[Change]], None]:
+    """Register a callback receiving the list of changes of each committed transaction"""
+    _subscribers.append(callback)
+    return callback
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session):
+    if session.in_nested_transaction():
+        # A released SAVEPOINT; the changes wait for the outer commit
+        return
+    session.info.pop(_REVISED_KEY, None)
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for callback in list(_subscribers):
+        callback(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    if session.in_nested_transaction():
+        # A rolled-back SAVEPOINT; atomic() restores its snapshot
+        return
+    session.info.pop(_REVISED_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
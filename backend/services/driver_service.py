@@ -1,10 +1,19 @@
-from backend.models import db, Driver
+from backend.models import db, Driver, to_money
+from backend.services.changes import record_change
+from backend.services.transaction import commit, write_retry
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import DRIVER
+from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
+# Stable sort key for listing and keyset pagination
+DRIVER_ORDER = (Driver.date, Driver.id)
+
 class DriverService:
     """Service class for Driver business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def hire_driver(driver_data: Dict[str, Any]) -> Driver:
         """Hire a new driver"""
         driver = Driver(
@@ -16,26 +25,42 @@ class DriverService:
             dropoff_location=driver_data['dropoffLocation'],
             date=driver_data['date'],
             time=driver_data.get('time'),
-            cost=str(driver_data['cost']),
+            cost=to_money(driver_data['cost'], blank=Decimal(0)),
             status=driver_data.get('status', 'pending')
         )
         db.session.add(driver)
-        db.session.commit()
+        db.session.flush()
+        record_change(driver.trip_id, "driver", "create", driver.id)
+        commit()
         return driver
     
     @staticmethod
     def get_drivers_by_trip(trip_id: str) -> List[Driver]:
         """Get all drivers for a trip"""
         return db.session.execute(
-            db.select(Driver).filter_by(trip_id=trip_id)
+            db.select(Driver).filter_by(trip_id=trip_id).order_by(*DRIVER_ORDER)
         ).scalars().all()
     
+    @staticmethod
+    def get_driver_views(trip_id: str) -> List[Dict[str, Any]]:
+        """Driver.to_dict() of every driver in a trip, built from row tuples"""
+        return DRIVER.all(DRIVER.select().where(Driver.trip_id == trip_id).order_by(*DRIVER_ORDER))
+    
+    @staticmethod
+    def get_drivers_page(trip_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of drivers for a trip (keyset pagination)"""
+        return paginate(
+            db.select(Driver).filter_by(trip_id=trip_id),
+            DRIVER_ORDER, limit, cursor
+        )
+    
     @staticmethod
     def get_driver_by_id(driver_id: str) -> Optional[Driver]:
         """Get driver by ID"""
         return db.session.get(Driver, driver_id)
     
     @staticmethod
+    @write_retry
     def update_driver(driver_id: str, driver_data: Dict[str, Any]) -> Optional[Driver]:
         """Update driver information"""
         driver = db.session.get(Driver, driver_id)
@@ -58,20 +83,23 @@ class DriverService:
         if 'time' in driver_data:
             driver.time = driver_data['time']
         if 'cost' in driver_data:
-            driver.cost = str(driver_data['cost'])
+            driver.cost = to_money(driver_data['cost'], blank=Decimal(0))
         if 'status' in driver_data:
             driver.status = driver_data['status']
         
-        db.session.commit()
+        record_change(driver.trip_id, "driver", "update", driver.id)
+        commit()
         return driver
     
     @staticmethod
+    @write_retry
     def cancel_driver(driver_id: str) -> bool:
         """Cancel/delete a driver booking"""
         driver = db.session.get(Driver, driver_id)
         if not driver:
             return False
         
+        record_change(driver.trip_id, "driver", "delete", driver.id)
         db.session.delete(driver)
-        db.session.commit()
+        commit()
         return True
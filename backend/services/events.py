@@ -0,0 +1,150 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from backend.services.changes import subscribe
+from typing import Any, Dict, List, Optional, Tuple
+
+# ============================================
+# Per-trip change feed (served as SSE by GET /trips/<id>/events)
+# ============================================
+#
+# Committed changes are published to an EventBus as compact records. Event ids
+# increase across all trips; each trip keeps a bounded replay log so a client
+# reconnecting with Last-Event-ID receives what it missed. If the events it
+# missed have already been dropped from the log, it is told to reload.
+#
+# Ids are counters local to one backend instance (one process for the local
+# backend), so they are sent as "<epoch>-<n>" with an epoch drawn when the
+# backend starts. An id from another epoch (a restart, another worker) or
+# ahead of the counter cannot be resumed from and also gets a reload.
+
+# Events kept per trip for Last-Event-ID replay
+REPLAY_SIZE = 256
+# Trips whose replay logs are kept (least recently published dropped first)
+MAX_TRIPS = 10000
+# More changes than this of one kind in one transaction (a bulk import) are
+# published as a single record with a count instead of one per row
+BULK_THRESHOLD = 50
+
+Event = Tuple[int, Dict[str, Any]]
+
+class LocalEventBackend:
+    """In-process event storage and wake-up.
+
+    A shared backend (e.g. Redis streams) provides the same publish / read /
+    wait operations so that every worker sees every trip's events.
+    """
+    
+    def __init__(self, replay_size: int = REPLAY_SIZE, max_trips: int = MAX_TRIPS):
+        self.replay_size = replay_size
+        self.max_trips = max_trips
+        self._logs: "OrderedDict[str, deque]" = OrderedDict()
+        # Highest event id dropped from each trip's log / with an evicted log
+        self._dropped: Dict[str, int] = {}
+        self._evicted_upto = 0
+        self._last_id = 0
+        self._changed = threading.Condition()
+        self.epoch = secrets.token_hex(4)
+    
+    def latest_id(self) -> int:
+        with self._changed:
+            return self._last_id
+    
+    def publish(self, trip_id: str, payloads: List[Dict[str, Any]]) -> None:
+        with self._changed:
+            log = self._logs.get(trip_id)
+            if log is None:
+                log = self._logs[trip_id] = deque()
+            self._logs.move_to_end(trip_id)
+            for payload in payloads:
+                self._last_id += 1
+                log.append((self._last_id, payload))
+                if len(log) > self.replay_size:
+                    self._dropped[trip_id] = log.popleft()[0]
+            while len(self._logs) > self.max_trips:
+                evicted, evicted_log = self._logs.popitem(last=False)
+                self._evicted_upto = max(self._evicted_upto, evicted_log[-1][0])
+                self._dropped.pop(evicted, None)
+            self._changed.notify_all()
+    
+    def read(self, trip_id: str, after: int) -> Optional[List[Event]]:
+        """Events of a trip with id > after; None if some were already dropped"""
+        with self._changed:
+            return self._read(trip_id, after)
+    
+    def wait(self, trip_id: str, after: int, timeout: float) -> Optional[List[Event]]:
+        """Like read() but blocks up to timeout seconds for a new event"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                events = self._read(trip_id, after)
+                remaining = deadline - time.monotonic()
+                if events is None or events or remaining <= 0:
+                    return events
+                self._changed.wait(remaining)
+    
+    def _read(self, trip_id: str, after: int) -> Optional[List[Event]]:
+        if after > self._last_id:
+            # Not an id this backend handed out
+            return None
+        log = self._logs.get(trip_id)
+        if log is None:
+            return None if after < self._evicted_upto else []
+        if after < self._dropped.get(trip_id, 0):
+            return None
+        return [event for event in log if event[0] > after]
+
+
+class EventBus:
+    """Publishes trip change records to a pluggable backend"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend or LocalEventBackend()
+    
+    def configure(self, backend) -> None:
+        self.backend = backend
+    
+    def publish(self, trip_id: str, payloads: List[Dict[str, Any]]) -> None:
+        self.backend.publish(trip_id, payloads)
+    
+    def latest_id(self) -> int:
+        return self.backend.latest_id()
+    
+    def format_id(self, event_id: int) -> str:
+        """SSE id of an event (<epoch>-<n>)"""
+        return f"{self.backend.epoch}-{event_id}"
+    
+    def parse_id(self, value: str) -> Optional[int]:
+        """Event number of an SSE id; None if it is from another epoch.
+        
+        Raises ValueError if the value is not an event id at all.
+        """
+        epoch, _, number = value.rpartition("-")
+        event_id = int(number)
+        if epoch != self.backend.epoch or event_id < 0:
+            return None
+        return event_id
+    
+    def read(self, trip_id: str, after: int) -> Optional[List[Event]]:
+        return self.backend.read(trip_id, after)
+    
+    def wait(self, trip_id: str, after: int, timeout: float) -> Optional[List[Event]]:
+        return self.backend.wait(trip_id, after, timeout)
+
+
+event_bus = EventBus()
+
+@subscribe
+def _publish_changes(changes):
+    grouped: Dict[str, Dict[Tuple[str, str], List[Optional[str]]]] = {}
+    for change in changes:
+        grouped.setdefault(change.trip_id, {}).setdefault((change.entity, change.op), []).append(change.entity_id)
+    for trip_id, groups in grouped.items():
+        payloads = []
+        for (entity, op), ids in groups.items():
+            if len(ids) > BULK_THRESHOLD:
+                payloads.append({"entity": entity, "op": op, "id": None, "count": len(ids)})
+            else:
+                payloads.extend({"entity": entity, "op": op, "id": entity_id} for entity_id in ids)
+        event_bus.publish(trip_id, payloads)
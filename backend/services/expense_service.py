@@ -1,16 +1,34 @@
-from backend.models import db, Expense, ExpenseSplit
-from typing import Optional, List, Dict, Any
+from backend.models import db, Member, Expense, ExpenseSplit, generate_uuid, to_money, required_money, split_evenly
+from backend.services.loading import EXPENSE_PLAN
+from backend.services.balance_service import BalanceService
+from backend.services.changes import bump_revision, record_change
+from backend.services.importers import InvalidRow
+from backend.services.transaction import commit, run_with_retry, write_retry
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import MEMBER, expense_views
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+# Required keys of an expense in a create request
+REQUIRED_FIELDS = ('description', 'amount', 'category', 'paidById', 'date')
+
+# Largest batch bulk_create_expenses accepts in one transaction
+MAX_BULK_ROWS = 10000
+
+# Stable sort key for listing and keyset pagination
+EXPENSE_ORDER = (Expense.date, Expense.id)
 
 class ExpenseService:
     """Service class for Expense business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def create_expense(expense_data: Dict[str, Any]) -> Expense:
         """Create a new expense"""
         expense = Expense(
             trip_id=expense_data['tripId'],
             description=expense_data['description'],
-            amount=str(expense_data['amount']),
+            amount=required_money(expense_data['amount'], 'amount'),
             category=expense_data['category'],
             paid_by_id=expense_data['paidById'],
             date=expense_data['date'],
@@ -20,41 +38,176 @@ class ExpenseService:
         
         # Handle splits
         split_among_ids = expense_data.get('splitAmongIds', [])
-        amount_float = float(expense.amount)
         
         if split_among_ids:
-            split_amount = amount_float / len(split_among_ids)
-            for member_id in split_among_ids:
+            shares = split_evenly(expense.amount, len(split_among_ids))
+            for member_id, split_amount in zip(split_among_ids, shares):
                 split = ExpenseSplit(
                     expense=expense, # Relationship handles ID
                     member_id=member_id,
-                    amount=str(split_amount)
+                    amount=split_amount
                 )
                 db.session.add(split)
         
-        db.session.commit()
+        BalanceService.apply_deltas(expense.trip_id, BalanceService.expense_deltas(expense))
+        db.session.flush()
+        record_change(expense.trip_id, "expense", "create", expense.id)
+        commit()
         return expense
     
+    @staticmethod
+    def bulk_create_expenses(trip_id: str, rows: Iterable[Dict[str, Any]], partial: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """Validate and insert many expenses in one transaction.
+
+        Expenses and splits go in with one multi-row INSERT each and the
+        ledger is updated once for the whole batch. Returns a result per
+        input row and the number of expenses created. Unless partial is set,
+        any invalid row means nothing is inserted.
+        """
+        member_ids = set(db.session.execute(
+            db.select(Member.id).filter_by(trip_id=trip_id)
+        ).scalars())
+        
+        results: List[Dict[str, Any]] = []
+        expense_rows: List[Dict[str, Any]] = []
+        split_rows: List[Dict[str, Any]] = []
+        deltas: Dict[str, Decimal] = {}
+        for index, data in enumerate(rows):
+            if index >= MAX_BULK_ROWS:
+                raise ValueError(f"At most {MAX_BULK_ROWS} expenses per import")
+            try:
+                if isinstance(data, InvalidRow):
+                    raise data
+                expense_row, splits = ExpenseService._validate_row(data, trip_id, member_ids)
+            except (KeyError, ValueError, TypeError) as e:
+                message = f"Missing field: {e}" if isinstance(e, KeyError) else str(e)
+                results.append({"row": index, "status": "error", "message": message})
+                continue
+            
+            expense_rows.append(expense_row)
+            split_rows.extend(splits)
+            deltas[expense_row['paid_by_id']] = deltas.get(expense_row['paid_by_id'], Decimal(0)) + expense_row['amount']
+            for split in splits:
+                deltas[split['member_id']] = deltas.get(split['member_id'], Decimal(0)) - split['amount']
+            results.append({"row": index, "status": "created", "id": expense_row['id']})
+        
+        failed = any(result["status"] == "error" for result in results)
+        if failed and not partial:
+            for result in results:
+                if result["status"] == "created":
+                    result.update(status="skipped", id=None)
+            return results, 0
+        
+        if expense_rows:
+            # The input stream is consumed by now, so only the write is retried
+            run_with_retry(lambda: ExpenseService._insert_rows(trip_id, expense_rows, split_rows, deltas))
+        return results, len(expense_rows)
+    
+    @staticmethod
+    def _insert_rows(trip_id: str, expense_rows, split_rows, deltas: Dict[str, Decimal]) -> None:
+        revision = bump_revision(trip_id)
+        for expense_row in expense_rows:
+            expense_row['revision'] = revision
+        db.session.execute(db.insert(Expense), expense_rows)
+        if split_rows:
+            db.session.execute(db.insert(ExpenseSplit), split_rows)
+        BalanceService.apply_deltas(trip_id, deltas)
+        for expense_row in expense_rows:
+            record_change(trip_id, "expense", "create", expense_row['id'])
+        commit()
+    
+    @staticmethod
+    def _validate_row(data: Dict[str, Any], trip_id: str, member_ids) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Turn one import row into insert parameters for an expense and its splits"""
+        if not isinstance(data, dict):
+            raise ValueError("Expected an object")
+        for field in REQUIRED_FIELDS:
+            if data.get(field) in (None, ""):
+                raise KeyError(field)
+        amount = to_money(data['amount'])
+        if data['paidById'] not in member_ids:
+            raise ValueError(f"paidById {data['paidById']} is not a member of this trip")
+        split_among_ids = data.get('splitAmongIds') or []
+        unknown = [member_id for member_id in split_among_ids if member_id not in member_ids]
+        if unknown:
+            raise ValueError(f"splitAmongIds not members of this trip: {', '.join(unknown)}")
+        
+        expense_id = generate_uuid()
+        expense_row = {
+            'id': expense_id,
+            'trip_id': trip_id,
+            'description': data['description'],
+            'amount': amount,
+            'category': data['category'],
+            'paid_by_id': data['paidById'],
+            'date': data['date'],
+            'split_method': data.get('splitMethod', 'equal'),
+        }
+        splits = []
+        if split_among_ids:
+            shares = split_evenly(amount, len(split_among_ids))
+            splits = [
+                {'id': generate_uuid(), 'expense_id': expense_id, 'member_id': member_id, 'amount': share}
+                for member_id, share in zip(split_among_ids, shares)
+            ]
+        return expense_row, splits
+    
     @staticmethod
     def get_expenses_by_trip(trip_id: str) -> List[Expense]:
         """Get all expenses for a trip"""
         return db.session.execute(
-            db.select(Expense).filter_by(trip_id=trip_id)
+            db.select(Expense).filter_by(trip_id=trip_id).options(*EXPENSE_PLAN).order_by(*EXPENSE_ORDER)
         ).scalars().all()
     
+    @staticmethod
+    def get_expense_views(trip_id: str) -> List[Dict[str, Any]]:
+        """Expense.to_dict() of every expense in a trip, built from row tuples"""
+        return expense_views(Expense.trip_id == trip_id, EXPENSE_ORDER)
+    
+    @staticmethod
+    def get_expense_views_by_ref(trip_id: str) -> Dict[str, Any]:
+        """Expenses without the embedded paidBy member, plus each payer once.
+
+        Returns {"expenses": [...], "members": {member id: member}}; an
+        expense's payer is members[expense["paidById"]].
+        """
+        expenses = expense_views(Expense.trip_id == trip_id, EXPENSE_ORDER, embed_payer=False)
+        payer_ids = {expense["paidById"] for expense in expenses}
+        members = MEMBER.all(MEMBER.select().where(Member.trip_id == trip_id, Member.id.in_(payer_ids)))
+        return {"expenses": expenses, "members": {member["id"]: member for member in members}}
+    
+    @staticmethod
+    def get_expenses_page(trip_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of expenses for a trip (keyset pagination)"""
+        return paginate(
+            db.select(Expense).filter_by(trip_id=trip_id).options(*EXPENSE_PLAN),
+            EXPENSE_ORDER, limit, cursor
+        )
+    
+    @staticmethod
+    def get_total_spent(trip_id: str) -> Decimal:
+        """Sum of all expense amounts for a trip, computed in SQL"""
+        total = db.session.execute(
+            db.select(db.func.sum(Expense.amount)).filter_by(trip_id=trip_id)
+        ).scalar()
+        return total or Decimal(0)
+    
     @staticmethod
     def get_expense_by_id(expense_id: str) -> Optional[Expense]:
         """Get expense by ID"""
         return db.session.get(Expense, expense_id)
     
     @staticmethod
+    @write_retry
     def update_expense(expense_id: str, expense_data: Dict[str, Any]) -> Optional[Expense]:
         """Update an existing expense"""
         expense = db.session.get(Expense, expense_id)
         if not expense:
             return None
         
-        # Update fields
+        # Snapshot the old contribution so the ledger can be moved by the difference
+        old_deltas = BalanceService.expense_deltas(expense)
+        
         # Update fields
         if 'description' in expense_data:
             expense.description = expense_data['description']
@@ -69,7 +222,7 @@ class ExpenseService:
         
         # Handle Amount Change and Split Recalculation
         if 'amount' in expense_data:
-            expense.amount = str(expense_data['amount'])
+            expense.amount = required_money(expense_data['amount'], 'amount')
             
             # Recalculate splits if method is equal (simplest case for now)
             # We assume equal split among existing split members if 'splitAmongIds' isn't provided in update
@@ -86,14 +239,13 @@ class ExpenseService:
                 expense.splits = [] # Clear relationship
                 
                 # Create new splits
-                amount_float = float(expense.amount)
                 if len(split_among_ids) > 0:
-                    split_amount = amount_float / len(split_among_ids)
-                    for member_id in split_among_ids:
+                    shares = split_evenly(expense.amount, len(split_among_ids))
+                    for member_id, split_amount in zip(split_among_ids, shares):
                         split = ExpenseSplit(
                             expense=expense,
                             member_id=member_id,
-                            amount=str(split_amount)
+                            amount=split_amount
                         )
                         db.session.add(split)
             
@@ -102,44 +254,36 @@ class ExpenseService:
                 # For 'equal', just re-divide new amount by number of splits
                 count = len(expense.splits)
                 if count > 0:
-                    new_split_amount = float(expense.amount) / count
-                    for split in expense.splits:
-                        split.amount = str(new_split_amount)
+                    shares = split_evenly(expense.amount, count)
+                    for split, split_amount in zip(expense.splits, shares):
+                        split.amount = split_amount
 
-        db.session.commit()
+        changes = BalanceService.expense_deltas(expense)
+        for member_id, delta in old_deltas.items():
+            changes[member_id] = changes.get(member_id, 0) - delta
+        BalanceService.apply_deltas(expense.trip_id, changes)
+        record_change(expense.trip_id, "expense", "update", expense.id)
+        commit()
         return expense
     
     @staticmethod
+    @write_retry
     def delete_expense(expense_id: str) -> bool:
         """Delete an expense"""
         expense = db.session.get(Expense, expense_id)
         if not expense:
             return False
         
+        BalanceService.apply_deltas(expense.trip_id, BalanceService.expense_deltas(expense), sign=-1)
+        record_change(expense.trip_id, "expense", "delete", expense.id)
         db.session.delete(expense)
-        db.session.commit()
+        commit()
         return True
     
     @staticmethod
     def calculate_balances(trip_id: str) -> Dict[str, float]:
-        """Calculate balances for all members (Business logic - OOP benefit)"""
-        expenses = ExpenseService.get_expenses_by_trip(trip_id)
-        balances = {}
-        
-        for expense in expenses:
-            paid_by = expense.paid_by_id
-            amount = float(expense.amount) if expense.amount else 0
-            
-            # Payer gets positive balance (they paid, so they are owed money initially)
-            # Wait, if I pay 100, I am +100.
-            # If I am in the split, I owe 50. So -50.
-            # Net +50.
-            balances[paid_by] = balances.get(paid_by, 0) + amount
-            
-            # Deduct from those who owe
-            for split in expense.splits:
-                member_id = split.member_id
-                split_amount = float(split.amount)
-                balances[member_id] = balances.get(member_id, 0) - split_amount
-            
-        return balances
+        """Get balances for all members from the incrementally maintained ledger"""
+        return {
+            member_id: float(balance)
+            for member_id, balance in BalanceService.get_balances(trip_id).items()
+        }
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from backend.models import db, Member, Expense, ExpenseSplit, Activity, Driver, Hotel
+from typing import Iterator, List, Optional, Tuple
+
+# Rows fetched per round trip; the export never holds more than this in memory
+EXPORT_BATCH_SIZE = 1000
+
+# Export layout per table: (JSON/CSV key, column), keys match to_dict()
+EXPORT_TABLES = {
+    "members": (Member, [
+        ("id", Member.id), ("tripId", Member.trip_id), ("userId", Member.user_id),
+        ("name", Member.name), ("email", Member.email), ("isAdmin", (Member.is_admin == "true").label("is_admin")),
+    ]),
+    "expenses": (Expense, [
+        ("id", Expense.id), ("tripId", Expense.trip_id), ("description", Expense.description),
+        ("amount", Expense.amount), ("category", Expense.category), ("paidById", Expense.paid_by_id),
+        ("date", Expense.date), ("splitMethod", Expense.split_method),
+    ]),
+    "splits": (ExpenseSplit, [
+        ("id", ExpenseSplit.id), ("expenseId", ExpenseSplit.expense_id),
+        ("memberId", ExpenseSplit.member_id), ("amount", ExpenseSplit.amount),
+    ]),
+    "activities": (Activity, [
+        ("id", Activity.id), ("tripId", Activity.trip_id), ("title", Activity.title),
+        ("location", Activity.location), ("date", Activity.date), ("time", Activity.time),
+        ("description", Activity.description), ("cost", Activity.cost),
+    ]),
+    "drivers": (Driver, [
+        ("id", Driver.id), ("tripId", Driver.trip_id), ("name", Driver.name),
+        ("contact", Driver.contact), ("vehicleType", Driver.vehicle_type),
+        ("pickupLocation", Driver.pickup_location), ("dropoffLocation", Driver.dropoff_location),
+        ("date", Driver.date), ("time", Driver.time), ("cost", Driver.cost), ("status", Driver.status),
+    ]),
+    "hotels": (Hotel, [
+        ("id", Hotel.id), ("tripId", Hotel.trip_id), ("hotelName", Hotel.hotel_name),
+        ("location", Hotel.location), ("checkInDate", Hotel.check_in_date),
+        ("checkOutDate", Hotel.check_out_date), ("roomType", Hotel.room_type),
+        ("guests", Hotel.guests), ("cost", Hotel.cost), ("status", Hotel.status),
+    ]),
+}
+
+class ExportService:
+    """Service class for streaming a trip's ledger out (OOP)
+
+    Rows are read as plain tuples (no ORM objects) in batches of
+    EXPORT_BATCH_SIZE and encoded as they arrive, so memory use does not
+    depend on the size of the trip.
+    """
+    
+    @staticmethod
+    def iter_rows(trip_id: str, table: str) -> Tuple[List[str], Iterator[tuple]]:
+        """Column keys and a lazy row iterator for one table of a trip"""
+        model, columns = EXPORT_TABLES[table]
+        stmt = db.select(*[column for _, column in columns])
+        if model is ExpenseSplit:
+            stmt = stmt.join(Expense, Expense.id == ExpenseSplit.expense_id).where(Expense.trip_id == trip_id)
+        else:
+            stmt = stmt.where(model.trip_id == trip_id)
+        result = db.session.execute(stmt.order_by(columns[0][1]), execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        return [key for key, _ in columns], iter(result)
+    
+    @staticmethod
+    def stream_ndjson(trip_id: str, tables: Optional[List[str]] = None) -> Iterator[str]:
+        """One JSON object per line, tagged with its table in "type" """
+        for table in tables or list(EXPORT_TABLES):
+            keys, rows = ExportService.iter_rows(trip_id, table)
+            for row in rows:
+                record = {"type": table}
+                for key, value in zip(keys, row):
+                    record[key] = float(value) if isinstance(value, Decimal) else value
+                yield json.dumps(record) + "\n"
+    
+    @staticmethod
+    def stream_csv(trip_id: str, table: str) -> Iterator[str]:
+        """CSV of a single table, header first"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        keys, rows = ExportService.iter_rows(trip_id, table)
+        writer.writerow(keys)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            # Flush in chunks rather than one tiny write per row
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
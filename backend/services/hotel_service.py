@@ -1,10 +1,19 @@
-from backend.models import db, Hotel
+from backend.models import db, Hotel, to_money
+from backend.services.changes import record_change
+from backend.services.transaction import commit, write_retry
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import HOTEL
+from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
+# Stable sort key for listing and keyset pagination
+HOTEL_ORDER = (Hotel.check_in_date, Hotel.id)
+
 class HotelService:
     """Service class for Hotel business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def book_hotel(hotel_data: Dict[str, Any]) -> Hotel:
         """Book a new hotel"""
         hotel = Hotel(
@@ -15,26 +24,42 @@ class HotelService:
             check_out_date=hotel_data['checkOutDate'],
             room_type=hotel_data['roomType'],
             guests=str(hotel_data['guests']),
-            cost=str(hotel_data['cost']),
+            cost=to_money(hotel_data['cost'], blank=Decimal(0)),
             status=hotel_data.get('status', 'pending')
         )
         db.session.add(hotel)
-        db.session.commit()
+        db.session.flush()
+        record_change(hotel.trip_id, "hotel", "create", hotel.id)
+        commit()
         return hotel
     
     @staticmethod
     def get_hotels_by_trip(trip_id: str) -> List[Hotel]:
         """Get all hotels for a trip"""
         return db.session.execute(
-            db.select(Hotel).filter_by(trip_id=trip_id)
+            db.select(Hotel).filter_by(trip_id=trip_id).order_by(*HOTEL_ORDER)
         ).scalars().all()
     
+    @staticmethod
+    def get_hotel_views(trip_id: str) -> List[Dict[str, Any]]:
+        """Hotel.to_dict() of every hotel in a trip, built from row tuples"""
+        return HOTEL.all(HOTEL.select().where(Hotel.trip_id == trip_id).order_by(*HOTEL_ORDER))
+    
+    @staticmethod
+    def get_hotels_page(trip_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of hotels for a trip (keyset pagination)"""
+        return paginate(
+            db.select(Hotel).filter_by(trip_id=trip_id),
+            HOTEL_ORDER, limit, cursor
+        )
+    
     @staticmethod
     def get_hotel_by_id(hotel_id: str) -> Optional[Hotel]:
         """Get hotel by ID"""
         return db.session.get(Hotel, hotel_id)
     
     @staticmethod
+    @write_retry
     def update_hotel(hotel_id: str, hotel_data: Dict[str, Any]) -> Optional[Hotel]:
         """Update hotel booking"""
         hotel = db.session.get(Hotel, hotel_id)
@@ -55,20 +80,23 @@ class HotelService:
         if 'guests' in hotel_data:
             hotel.guests = str(hotel_data['guests'])
         if 'cost' in hotel_data:
-            hotel.cost = str(hotel_data['cost'])
+            hotel.cost = to_money(hotel_data['cost'], blank=Decimal(0))
         if 'status' in hotel_data:
             hotel.status = hotel_data['status']
         
-        db.session.commit()
+        record_change(hotel.trip_id, "hotel", "update", hotel.id)
+        commit()
         return hotel
     
     @staticmethod
+    @write_retry
     def cancel_hotel(hotel_id: str) -> bool:
         """Cancel/delete a hotel booking"""
         hotel = db.session.get(Hotel, hotel_id)
         if not hotel:
             return False
         
+        record_change(hotel.trip_id, "hotel", "delete", hotel.id)
         db.session.delete(hotel)
-        db.session.commit()
+        commit()
         return True
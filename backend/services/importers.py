@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator
+
+# ============================================
+# Row readers for bulk expense import
+# ============================================
+#
+# Each reader yields one expense dict per input row, in the same shape the
+# single-expense endpoint accepts. NDJSON and CSV are read line by line from
+# the request stream rather than buffering the whole body. A row that cannot
+# be parsed is yielded as an InvalidRow, so it is reported with the other row
+# errors instead of failing the whole import.
+
+# CSV has no lists; splitAmongIds is a ';'-separated cell
+CSV_LIST_SEPARATOR = ";"
+
+
+class InvalidRow(ValueError):
+    """An input row that could not be parsed"""
+
+
+def iter_json_rows(stream) -> Iterator[Dict[str, Any]]:
+    rows = json.load(stream)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of expenses")
+    yield from rows
+
+def iter_ndjson_rows(stream) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRow(f"Line {number}: invalid JSON ({e.msg} at column {e.colno})")
+
+def iter_csv_rows(stream) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline="")):
+        split_ids = row.get("splitAmongIds") or ""
+        row["splitAmongIds"] = [member_id.strip() for member_id in split_ids.split(CSV_LIST_SEPARATOR) if member_id.strip()]
+        yield {key: value for key, value in row.items() if value not in (None, "")}
+
+READERS = {
+    "application/json": iter_json_rows,
+    "application/x-ndjson": iter_ndjson_rows,
+    "application/ndjson": iter_ndjson_rows,
+    "text/csv": iter_csv_rows,
+}
+
+def reader_for(content_type: str):
+    """Row reader for a request mimetype, or None if unsupported"""
+    return READERS.get(content_type)
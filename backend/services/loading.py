@@ -0,0 +1,34 @@
+from sqlalchemy.orm import selectinload, joinedload, subqueryload
+from backend.models import Trip, Expense
+
+# ============================================
+# Loader plans (eager-loading strategies per endpoint)
+# ============================================
+#
+# Each plan is a tuple of loader options passed to ``.options(...)``. A plan
+# pulls in everything the matching ``to_dict`` touches with one extra SELECT
+# per relationship, so the number of queries an endpoint runs does not grow
+# with the number of rows it returns.
+#
+# Splits use subqueryload rather than selectinload: selectin batches parent
+# keys 500 at a time, so a trip list with thousands of expenses would still
+# add one SELECT per 500 expenses.
+
+# Expense.to_dict reads paid_by (many-to-one, joined) and splits (collection)
+EXPENSE_PLAN = (
+    joinedload(Expense.paid_by),
+    subqueryload(Expense.splits),
+)
+
+# Trip.to_dict reads members, ledger balances, expenses (with the expense
+# plan) and activities
+TRIP_DETAIL_PLAN = (
+    selectinload(Trip.members),
+    selectinload(Trip.balances),
+    selectinload(Trip.expenses).joinedload(Expense.paid_by),
+    selectinload(Trip.expenses).subqueryload(Expense.splits),
+    selectinload(Trip.activities),
+)
+
+# GET /trips serializes every trip in full, so it shares the detail plan
+TRIP_LIST_PLAN = TRIP_DETAIL_PLAN
@@ -1,10 +1,18 @@
 from backend.models import db, Member
+from backend.services.changes import record_change
+from backend.services.transaction import commit, write_retry
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import MEMBER
 from typing import Optional, List, Dict, Any
 
+# Stable sort key for listing and keyset pagination
+MEMBER_ORDER = (Member.id,)
+
 class MemberService:
     """Service class for Member business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def add_member(member_data: Dict[str, Any]) -> Member:
         """Add a new member to a trip"""
         member = Member(
@@ -15,22 +23,38 @@ class MemberService:
             is_admin=member_data.get('isAdmin', 'false')
         )
         db.session.add(member)
-        db.session.commit()
+        db.session.flush()
+        record_change(member.trip_id, "member", "create", member.id)
+        commit()
         return member
     
     @staticmethod
     def get_members_by_trip(trip_id: str) -> List[Member]:
         """Get all members for a trip"""
         return db.session.execute(
-            db.select(Member).filter_by(trip_id=trip_id)
+            db.select(Member).filter_by(trip_id=trip_id).order_by(*MEMBER_ORDER)
         ).scalars().all()
     
+    @staticmethod
+    def get_member_views(trip_id: str) -> List[Dict[str, Any]]:
+        """Member.to_dict() of every member in a trip, built from row tuples"""
+        return MEMBER.all(MEMBER.select().where(Member.trip_id == trip_id).order_by(*MEMBER_ORDER))
+    
+    @staticmethod
+    def get_members_page(trip_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of members for a trip (keyset pagination)"""
+        return paginate(
+            db.select(Member).filter_by(trip_id=trip_id),
+            MEMBER_ORDER, limit, cursor
+        )
+    
     @staticmethod
     def get_member_by_id(member_id: str) -> Optional[Member]:
         """Get member by ID"""
         return db.session.get(Member, member_id)
     
     @staticmethod
+    @write_retry
     def update_member(member_id: str, member_data: Dict[str, Any]) -> Optional[Member]:
         """Update an existing member"""
         member = db.session.get(Member, member_id)
@@ -47,16 +71,19 @@ class MemberService:
         if 'isAdmin' in member_data:
             member.is_admin = member_data['isAdmin']
         
-        db.session.commit()
+        record_change(member.trip_id, "member", "update", member.id)
+        commit()
         return member
     
     @staticmethod
+    @write_retry
     def delete_member(member_id: str) -> bool:
         """Remove a member from a trip"""
         member = db.session.get(Member, member_id)
         if not member:
             return False
         
+        record_change(member.trip_id, "member", "delete", member.id)
         db.session.delete(member)
-        db.session.commit()
+        commit()
         return True
@@ -0,0 +1,54 @@
+import base64
+import json
+from backend.models import db
+from sqlalchemy import tuple_
+from typing import Any, List, NamedTuple, Optional
+
+# ============================================
+# Keyset (cursor) pagination
+# ============================================
+#
+# Pages are ordered by a unique sort key such as (date, id). The cursor is
+# the sort key of the last row of the previous page, so fetching the next
+# page is a range scan on the matching index instead of an OFFSET.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+def paginate(stmt, sort_columns, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+    """Run an ORM select one page at a time, ordered by sort_columns.
+
+    sort_columns must end in a unique column (the primary key) so the order
+    is total and no row is skipped or repeated between pages.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    stmt = stmt.order_by(*sort_columns)
+    if cursor:
+        values = decode_cursor(cursor, len(sort_columns))
+        stmt = stmt.where(tuple_(*sort_columns) > tuple_(*values))
+    
+    # Fetch one extra row to know whether another page exists
+    items = db.session.execute(stmt.limit(limit + 1)).scalars().all()
+    if len(items) <= limit:
+        return Page(items, None)
+    items = items[:limit]
+    last = items[-1]
+    return Page(items, encode_cursor([getattr(last, column.key) for column in sort_columns]))
@@ -0,0 +1,69 @@
+from backend.models import db, Trip, Member, Expense, Activity
+from typing import List, Dict, Any
+
+# ============================================
+# Trip projections (?fields= / ?view=summary)
+# ============================================
+#
+# Every scalar field a client can ask for maps to one SQL column expression,
+# so a field-selected read only selects those columns. Counts and totals are
+# correlated subqueries aggregated by the database.
+
+def _count(model):
+    return (
+        db.select(db.func.count(model.id))
+        .where(model.trip_id == Trip.id)
+        .correlate(Trip)
+        .scalar_subquery()
+    )
+
+TRIP_FIELDS = {
+    "id": Trip.id,
+    "userId": Trip.user_id,
+    "name": Trip.name,
+    "destination": Trip.destination,
+    "startDate": Trip.start_date,
+    "endDate": Trip.end_date,
+    "budget": Trip.budget,
+    "coverImage": Trip.cover_image,
+    "description": Trip.description,
+    "memberCount": _count(Member),
+    "expenseCount": _count(Expense),
+    "activityCount": _count(Activity),
+    "totalSpent": (
+        db.select(db.func.coalesce(db.func.sum(Expense.amount), 0))
+        .where(Expense.trip_id == Trip.id)
+        .correlate(Trip)
+        .scalar_subquery()
+    ),
+}
+
+# Collections only available from the full Trip.to_dict()
+TRIP_COLLECTIONS = ("members", "expenses", "activities")
+
+# Fields returned by ?view=summary (what the dashboard list needs)
+SUMMARY_FIELDS = [
+    "id", "name", "destination", "startDate", "endDate", "budget",
+    "coverImage", "memberCount", "totalSpent",
+]
+
+MONEY_FIELDS = ("budget", "totalSpent")
+
+def validate_fields(fields: List[str]) -> List[str]:
+    """Return the unknown names in a field selection"""
+    return [field for field in fields if field not in TRIP_FIELDS and field not in TRIP_COLLECTIONS]
+
+def projection_query(fields: List[str]):
+    """SELECT of only the requested columns/aggregates (id is always included).
+
+    Returns the selected names alongside the statement.
+    """
+    names = ["id"] + [field for field in fields if field in TRIP_FIELDS and field != "id"]
+    return names, db.select(*[TRIP_FIELDS[name].label(name) for name in names])
+
+def row_to_dict(names: List[str], row) -> Dict[str, Any]:
+    data = dict(zip(names, row))
+    for name in MONEY_FIELDS:
+        if name in data:
+            data[name] = float(data[name]) if data[name] else 0
+    return data
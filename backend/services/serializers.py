@@ -0,0 +1,187 @@
+import operator
+from collections import defaultdict
+from sqlalchemy import Integer, type_coerce
+from backend.models import db, Money, Member, Expense, ExpenseSplit, Activity, Driver, Hotel
+from typing import Any, Callable, Dict, List, Optional
+
+# ============================================
+# Row serializers (read path without ORM instances)
+# ============================================
+#
+# A RowSerializer maps the columns a model's to_dict() reads to their JSON
+# keys once, at import time: one itemgetter pulls the values out of a result
+# row (a plain tuple), they are zipped with the keys, and only the fields that
+# need it go through a converter, giving the dict to_dict() would build. Reads
+# then select just those columns: no identity map, no instance state, no
+# attribute instrumentation per field. Money columns are selected as raw
+# cents, so no Decimal is built only to become a float.
+
+def money(cents: Optional[int]):
+    # Same values as to_dict()'s float(amount) if amount else 0
+    return cents / 100 if cents else 0
+
+def flag(value: Optional[str]) -> bool:
+    return value == "true"
+
+def guests(value: Optional[str]) -> int:
+    return int(value) if value else 1
+
+
+class RowSerializer:
+    """Precomputed (key, column[, convert]) map for one model's to_dict()"""
+    
+    def __init__(self, fields, constants: Optional[Dict[str, Any]] = None):
+        self.columns: List[Any] = []
+        self.constants: Dict[str, Any] = dict(constants or {})
+        self.keys = tuple(field[0] for field in fields) + tuple(self.constants)
+        self._fields = self.keys[:len(fields)]
+        self._converters: List[Callable[[Dict[str, Any]], None]] = []
+        indexes = []
+        for field in fields:
+            key, column = field[0], field[1]
+            convert: Optional[Callable] = field[2] if len(field) > 2 else None
+            if isinstance(column.type, Money):
+                column, convert = type_coerce(column, Integer).label(column.key), convert or money
+            index = next((i for i, known in enumerate(self.columns) if known is column), None)
+            if index is None:
+                index = len(self.columns)
+                self.columns.append(column)
+            indexes.append(index)
+            if convert is not None:
+                self._converters.append(self._converter(key, convert))
+        if len(indexes) == 1:
+            # itemgetter with one index returns the bare value, not a tuple
+            index = indexes[0]
+            self._values: Callable[[Any], Any] = lambda row: (row[index],)
+        else:
+            self._values = operator.itemgetter(*indexes)
+    
+    @staticmethod
+    def _converter(key: str, convert: Callable) -> Callable[[Dict[str, Any]], None]:
+        def apply(values: Dict[str, Any]) -> None:
+            values[key] = convert(values[key])
+        return apply
+    
+    def to_dict(self, row) -> Dict[str, Any]:
+        values = dict(zip(self._fields, self._values(row)))
+        for apply in self._converters:
+            apply(values)
+        if self.constants:
+            values.update(self.constants)
+        return values
+    
+    def select(self):
+        return db.select(*self.columns)
+    
+    def all(self, stmt) -> List[Dict[str, Any]]:
+        return list(map(self.to_dict, db.session.execute(stmt)))
+
+
+MEMBER = RowSerializer([
+    ("id", Member.id),
+    ("tripId", Member.trip_id),
+    ("userId", Member.user_id),
+    ("name", Member.name),
+    ("email", Member.email),
+    ("avatar", Member.avatar),
+    ("isAdmin", Member.is_admin, flag),
+    ("isOwner", Member.is_admin, flag),
+], constants={"balance": 0})
+
+# paidBy and splitAmong are attached by expense_views()
+EXPENSE = RowSerializer([
+    ("id", Expense.id),
+    ("tripId", Expense.trip_id),
+    ("description", Expense.description),
+    ("amount", Expense.amount),
+    ("category", Expense.category),
+    ("paidById", Expense.paid_by_id),
+    ("date", Expense.date),
+    ("splitMethod", Expense.split_method),
+])
+
+SPLIT = RowSerializer([
+    ("id", ExpenseSplit.id),
+    ("expenseId", ExpenseSplit.expense_id),
+    ("memberId", ExpenseSplit.member_id),
+    ("amount", ExpenseSplit.amount),
+])
+
+ACTIVITY = RowSerializer([
+    ("id", Activity.id),
+    ("tripId", Activity.trip_id),
+    ("title", Activity.title),
+    ("location", Activity.location),
+    ("date", Activity.date),
+    ("time", Activity.time),
+    ("description", Activity.description),
+    ("cost", Activity.cost),
+])
+
+DRIVER = RowSerializer([
+    ("id", Driver.id),
+    ("tripId", Driver.trip_id),
+    ("name", Driver.name),
+    ("contact", Driver.contact),
+    ("vehicleType", Driver.vehicle_type),
+    ("pickupLocation", Driver.pickup_location),
+    ("dropoffLocation", Driver.dropoff_location),
+    ("date", Driver.date),
+    ("time", Driver.time),
+    ("cost", Driver.cost),
+    ("status", Driver.status),
+])
+
+HOTEL = RowSerializer([
+    ("id", Hotel.id),
+    ("tripId", Hotel.trip_id),
+    ("hotelName", Hotel.hotel_name),
+    ("location", Hotel.location),
+    ("checkInDate", Hotel.check_in_date),
+    ("checkOutDate", Hotel.check_out_date),
+    ("roomType", Hotel.room_type),
+    ("guests", Hotel.guests, guests),
+    ("cost", Hotel.cost),
+    ("status", Hotel.status),
+])
+
+# Expense.to_dict's paidBy for a payer that no longer exists
+UNKNOWN_PAYER = {"id": "unknown", "name": "Unknown"}
+
+
+def expense_views(condition, order_by=(), members: Optional[Dict[str, Dict[str, Any]]] = None,
+                  embed_payer: bool = True) -> List[Dict[str, Any]]:
+    """Expense dicts for the expenses matching `condition`, with their splits.
+    
+    paidBy is filled in as Expense.to_dict does, from `members` (id -> member
+    dict) when the caller already has them, otherwise by joining the payer
+    into the expense SELECT. embed_payer=False leaves paidBy out so payers
+    can be referenced by paidById. Two queries: expenses and their splits.
+    """
+    stmt = EXPENSE.select()
+    join_payer = embed_payer and members is None
+    if join_payer:
+        stmt = stmt.add_columns(*MEMBER.columns).outerjoin(Member, Member.id == Expense.paid_by_id)
+    rows = db.session.execute(stmt.where(condition).order_by(*order_by)).all()
+    
+    expenses = list(map(EXPENSE.to_dict, rows))
+    if join_payer:
+        # One dict per payer, shared by all their expenses
+        width, members = len(EXPENSE.columns), {}
+        for row in rows:
+            payer_id = row[width]
+            if payer_id is not None and payer_id not in members:
+                members[payer_id] = MEMBER.to_dict(row[width:])
+    
+    splits = defaultdict(list)
+    split_rows = db.session.execute(
+        SPLIT.select().join(Expense, Expense.id == ExpenseSplit.expense_id).where(condition)
+    )
+    for split in map(SPLIT.to_dict, split_rows):
+        splits[split["expenseId"]].append(split)
+    
+    for expense in expenses:
+        expense["splitAmong"] = splits.get(expense["id"], [])
+        if embed_payer:
+            expense["paidBy"] = members.get(expense["paidById"], UNKNOWN_PAYER)
+    return expenses
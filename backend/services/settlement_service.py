@@ -0,0 +1,125 @@
+import heapq
+from backend.services.balance_service import BalanceService
+from backend.services.cache import trip_cache
+from decimal import Decimal
+from typing import List, Dict, Any, Tuple
+
+# Up to this many non-zero balances the exact (minimum transfers) solver is
+# used; it is O(2^n * n), beyond that the greedy heap solver takes over
+EXACT_LIMIT = 8
+
+class SettlementService:
+    """Service class for settling up a trip: who pays whom (OOP)"""
+    
+    @staticmethod
+    def greedy_transfers(balances: Dict[str, int]) -> List[Tuple[str, str, int]]:
+        """Match the largest debtor with the largest creditor until all are settled.
+
+        Balances are integer cents summing to zero. Produces at most n - 1
+        transfers in O(n log n).
+        """
+        creditors = [(-amount, member_id) for member_id, amount in balances.items() if amount > 0]
+        debtors = [(amount, member_id) for member_id, amount in balances.items() if amount < 0]
+        heapq.heapify(creditors)
+        heapq.heapify(debtors)
+        
+        transfers = []
+        while creditors and debtors:
+            credit, creditor = creditors[0]
+            debt, debtor = debtors[0]
+            amount = min(-credit, -debt)
+            transfers.append((debtor, creditor, amount))
+            # Whoever still has something left goes back on the heap in place
+            if -credit > amount:
+                heapq.heapreplace(creditors, (credit + amount, creditor))
+            else:
+                heapq.heappop(creditors)
+            if -debt > amount:
+                heapq.heapreplace(debtors, (debt + amount, debtor))
+            else:
+                heapq.heappop(debtors)
+        return transfers
+    
+    @staticmethod
+    def exact_transfers(balances: Dict[str, int]) -> List[Tuple[str, str, int]]:
+        """Minimum number of transfers.
+
+        The minimum is n - k where k is the largest number of disjoint groups
+        whose balances sum to zero; each group then settles internally with
+        (size - 1) transfers. Found with a DP over subsets.
+        """
+        members = [member_id for member_id, amount in balances.items() if amount]
+        amounts = [balances[member_id] for member_id in members]
+        n = len(members)
+        full = (1 << n) - 1
+        
+        sums = [0] * (full + 1)
+        groups = [0] * (full + 1)
+        for mask in range(1, full + 1):
+            low = mask & -mask
+            sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+            best = 0
+            rest = mask
+            while rest:
+                bit = rest & -rest
+                best = max(best, groups[mask ^ bit])
+                rest ^= bit
+            groups[mask] = best + (1 if sums[mask] == 0 else 0)
+        
+        # Walk back through the DP to get an order in which prefix sums hit
+        # zero exactly groups[full] times; the zero points split the groups
+        order = []
+        mask = full
+        while mask:
+            rest = mask
+            while rest:
+                bit = rest & -rest
+                if groups[mask ^ bit] + (1 if sums[mask] == 0 else 0) == groups[mask]:
+                    break
+                rest ^= bit
+            order.append(bit.bit_length() - 1)
+            mask ^= bit
+        order.reverse()
+        
+        transfers = []
+        group: Dict[str, int] = {}
+        running = 0
+        for index in order:
+            group[members[index]] = amounts[index]
+            running += amounts[index]
+            if running == 0:
+                transfers.extend(SettlementService.greedy_transfers(group))
+                group = {}
+        return transfers
+    
+    @staticmethod
+    def settle(balances: Dict[str, Decimal], exact_limit: int = EXACT_LIMIT) -> Dict[str, Any]:
+        """Turn member balances into a list of transfers"""
+        cents = {member_id: int(balance.scaleb(2)) for member_id, balance in balances.items()}
+        # Absorb any rounding residue into the largest creditor so the books close
+        residue = sum(cents.values())
+        if residue and cents:
+            top = max(cents, key=lambda member_id: cents[member_id])
+            cents[top] -= residue
+        
+        non_zero = sum(1 for amount in cents.values() if amount)
+        if non_zero <= exact_limit:
+            mode, transfers = "exact", SettlementService.exact_transfers(cents)
+        else:
+            mode, transfers = "greedy", SettlementService.greedy_transfers(cents)
+        
+        return {
+            "mode": mode,
+            "transfers": [
+                {"fromMemberId": debtor, "toMemberId": creditor, "amount": amount / 100}
+                for debtor, creditor, amount in transfers
+            ],
+        }
+    
+    @staticmethod
+    def get_settlements(trip_id: str) -> Dict[str, Any]:
+        """Settlement plan for a trip, cached until the next write to the trip"""
+        return trip_cache.get_or_load(
+            trip_id, "settlements",
+            lambda: {"tripId": trip_id, **SettlementService.settle(BalanceService.get_balances(trip_id))}
+        )
@@ -0,0 +1,67 @@
+from backend.models import db, Trip, Member, Expense, Activity, Driver, Hotel, Tombstone
+from backend.services.balance_service import BalanceService
+from backend.services.loading import EXPENSE_PLAN
+from backend.services.projections import projection_query, row_to_dict
+from typing import Optional, Dict, Any
+
+# Collections returned by delta sync, with the options their to_dict() needs
+SYNC_COLLECTIONS = {
+    "members": (Member, ()),
+    "expenses": (Expense, EXPENSE_PLAN),
+    "activities": (Activity, ()),
+    "drivers": (Driver, ()),
+    "hotels": (Hotel, ()),
+}
+
+SYNC_TRIP_FIELDS = [
+    "id", "userId", "name", "destination", "startDate", "endDate",
+    "budget", "coverImage", "description",
+]
+
+class SyncService:
+    """Service class for delta sync: what changed in a trip since a revision (OOP)"""
+    
+    @staticmethod
+    def get_changes(trip_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+        """Rows written and deleted after revision `since` (0 = everything).
+
+        Each collection is one range scan on (trip_id, revision), so the cost
+        follows the size of the change rather than the size of the trip.
+        Returns None if the trip does not exist.
+        """
+        # Read the revision first: a write committing while we read the rows
+        # is then returned again next time rather than skipped
+        revision = db.session.execute(
+            db.select(Trip.revision).filter_by(id=trip_id)
+        ).scalar()
+        if revision is None:
+            return None
+        
+        changes: Dict[str, Any] = {"tripId": trip_id, "since": since, "revision": revision}
+        if since and revision <= since:
+            # Nothing written since: skip every other query
+            changes.update({"trip": None, "deleted": [], "balances": None})
+            changes.update({name: [] for name in SYNC_COLLECTIONS})
+            return changes
+        
+        names, stmt = projection_query(SYNC_TRIP_FIELDS)
+        changes["trip"] = row_to_dict(names, db.session.execute(stmt.where(Trip.id == trip_id)).one())
+        for name, (model, options) in SYNC_COLLECTIONS.items():
+            stmt = db.select(model).where(model.trip_id == trip_id).options(*options)
+            if since:
+                stmt = stmt.where(model.revision > since)
+            changes[name] = [row.to_dict() for row in db.session.execute(stmt).scalars()]
+        
+        changes["deleted"] = []
+        if since:
+            changes["deleted"] = [
+                tombstone.to_dict()
+                for tombstone in db.session.execute(
+                    db.select(Tombstone).where(Tombstone.trip_id == trip_id, Tombstone.revision > since)
+                ).scalars()
+            ]
+        # Any write may move balances; they are O(members) so always sent whole
+        changes["balances"] = {
+            member_id: float(balance) for member_id, balance in BalanceService.get_balances(trip_id).items()
+        }
+        return changes
@@ -0,0 +1,122 @@
+import functools
+import random
+import time
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+from sqlalchemy.exc import OperationalError, DBAPIError
+from backend.models import db
+from backend.services.changes import snapshot_changes, restore_changes
+from typing import Callable, Iterator, TypeVar
+
+# ============================================
+# Commits and write retries
+# ============================================
+#
+# Service methods commit through commit(), which rolls the session back when
+# the commit fails so the session is usable again. @write_retry re-runs a
+# whole service method when the database reports lock contention; the methods
+# start from a fresh read, so running them again is safe.
+#
+# atomic() groups several service calls into one transaction: inside it
+# commit() only flushes, and the outermost scope commits once (or rolls
+# everything back). Retries then apply to the whole scope, not to the
+# individual calls, since retrying one call after a rollback would silently
+# drop the ones before it.
+#
+# atomic() is the unit of work for callers that need one: open a scope, call
+# any number of service methods, commit once. Routes that do not open one
+# keep committing per call. A nested atomic(savepoint=True) runs inside a
+# SAVEPOINT, so a failing step can be undone without losing the rest.
+
+T = TypeVar("T")
+
+# Defaults when there is no app config (WRITE_RETRY_ATTEMPTS / WRITE_RETRY_DELAY)
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.02
+
+# PostgreSQL serialization failure / deadlock
+_RETRYABLE_PGCODES = {"40001", "40P01"}
+
+# Session.info key holding the atomic() nesting depth
+_ATOMIC_KEY = "atomic_depth"
+
+def in_atomic() -> bool:
+    """Whether the current session is inside an atomic() scope"""
+    return db.session.info.get(_ATOMIC_KEY, 0) > 0
+
+def commit() -> None:
+    """Commit the session (only flush inside atomic()); roll back and re-raise if that fails"""
+    if in_atomic():
+        db.session.flush()
+        return
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+@contextmanager
+def atomic(savepoint: bool = False) -> Iterator[None]:
+    """Run the service calls in the block as a single transaction.
+
+    Nested scopes join the outermost one. If the block raises, the whole
+    transaction is rolled back and the exception propagates; with
+    savepoint=True a nested scope rolls back only its own writes.
+    """
+    depth = db.session.info.get(_ATOMIC_KEY, 0)
+    nested = snapshot = None
+    if savepoint and depth > 0:
+        snapshot = snapshot_changes()
+        nested = db.session.begin_nested()
+    db.session.info[_ATOMIC_KEY] = depth + 1
+    try:
+        yield
+    except BaseException:
+        if depth == 0:
+            db.session.rollback()
+        elif nested is not None:
+            nested.rollback()
+            restore_changes(snapshot)
+        raise
+    finally:
+        db.session.info[_ATOMIC_KEY] = depth
+    if depth == 0:
+        commit()
+    elif nested is not None:
+        nested.commit()
+
+def is_retryable(error: Exception) -> bool:
+    """Lock contention that may succeed on a second try"""
+    if not isinstance(error, DBAPIError):
+        return False
+    if isinstance(error, OperationalError) and "locked" in str(error.orig).lower():
+        return True
+    return getattr(error.orig, "pgcode", None) in _RETRYABLE_PGCODES
+
+def run_with_retry(fn: Callable[[], T]) -> T:
+    """Call fn(), retrying with jittered exponential backoff on lock contention.
+
+    Inside atomic() fn() runs once; the caller retries the whole scope.
+    """
+    if in_atomic():
+        return fn()
+    attempts, delay = RETRY_ATTEMPTS, RETRY_BASE_DELAY
+    if has_app_context():
+        attempts = current_app.config.get("WRITE_RETRY_ATTEMPTS", attempts)
+        delay = current_app.config.get("WRITE_RETRY_DELAY", delay)
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except DBAPIError as e:
+            db.session.rollback()
+            if attempt >= attempts or not is_retryable(e):
+                raise
+            time.sleep(delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+    raise AssertionError("unreachable")
+
+def write_retry(fn: Callable[..., T]) -> Callable[..., T]:
+    """Decorator form of run_with_retry() for service write methods"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run_with_retry(lambda: fn(*args, **kwargs))
+    return wrapper
@@ -1,10 +1,31 @@
-from backend.models import db, Trip
+from sqlalchemy import Integer, type_coerce
+from backend.models import db, Trip, Member, Expense, Activity, MemberBalance, to_money
+from backend.services.changes import record_change
+from backend.services.transaction import atomic, commit, run_with_retry, write_retry
+from backend.services.loading import TRIP_DETAIL_PLAN, TRIP_LIST_PLAN
+from backend.services.projections import TRIP_COLLECTIONS, projection_query, row_to_dict
+from backend.services.pagination import Page, paginate
+from backend.services.serializers import MEMBER, ACTIVITY, expense_views
+from backend.services.member_service import MemberService, MEMBER_ORDER
+from backend.services.expense_service import EXPENSE_ORDER
+from backend.services.activity_service import ACTIVITY_ORDER
+from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
+# Stable sort key for listing and keyset pagination
+TRIP_ORDER = (Trip.start_date, Trip.id)
+
+# Scalar fields of the full trip payload (Trip.to_dict)
+DETAIL_FIELDS = [
+    "id", "userId", "name", "destination", "startDate", "endDate",
+    "budget", "coverImage", "description",
+] + list(TRIP_COLLECTIONS)
+
 class TripService:
     """Service class for Trip business logic (OOP)"""
     
     @staticmethod
+    @write_retry
     def create_trip(trip_data: Dict[str, Any], user_id: str) -> Trip:
         """Create a new trip"""
         trip = Trip(
@@ -13,19 +34,110 @@ class TripService:
             destination=trip_data['destination'],
             start_date=trip_data['startDate'],
             end_date=trip_data['endDate'],
-            budget=str(trip_data['budget']),
+            budget=to_money(trip_data['budget'], blank=Decimal(0)),
             cover_image=trip_data.get('coverImage'),
             description=trip_data.get('description')
         )
         db.session.add(trip)
-        db.session.commit()
+        db.session.flush()
+        record_change(trip.id, "trip", "create", trip.id)
+        commit()
         return trip
     
+    @staticmethod
+    def create_trip_with_owner(trip_data: Dict[str, Any], user) -> Trip:
+        """Create a trip and its owner member in one transaction"""
+        def create():
+            with atomic():
+                trip = TripService.create_trip(trip_data, user.id)
+                MemberService.add_member({
+                    "tripId": trip.id,
+                    "name": user.username,
+                    "email": user.email,
+                    "userId": user.id,
+                    "avatar": user.avatar,
+                    "isAdmin": "true",
+                })
+            return trip
+        return run_with_retry(create)
+    
     @staticmethod
     def get_user_trips(user_id: str) -> List[Trip]:
         """Get trips for a specific user"""
-        return db.session.execute(db.select(Trip).filter_by(user_id=user_id)).scalars().all()
+        return db.session.execute(
+            db.select(Trip).filter_by(user_id=user_id).options(*TRIP_LIST_PLAN).order_by(*TRIP_ORDER)
+        ).scalars().all()
+    
+    @staticmethod
+    def get_user_trips_page(user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a user's trips (keyset pagination)"""
+        return paginate(
+            db.select(Trip).filter_by(user_id=user_id).options(*TRIP_LIST_PLAN),
+            TRIP_ORDER, limit, cursor
+        )
 
+    @staticmethod
+    def get_user_trip_views(user_id: str, fields: List[str]) -> List[Dict[str, Any]]:
+        """Get trips for a user with only the requested fields"""
+        return TripService._trip_views(Trip.user_id == user_id, fields)
+    
+    @staticmethod
+    def get_trip_view(trip_id: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """Get one trip with only the requested fields"""
+        views = TripService._trip_views(Trip.id == trip_id, fields)
+        return views[0] if views else None
+    
+    @staticmethod
+    def get_user_trip_details(user_id: str, paid_by_ref: bool = False) -> List[Dict[str, Any]]:
+        """Trip.to_dict() of a user's trips, built from row tuples"""
+        return TripService._trip_views(Trip.user_id == user_id, DETAIL_FIELDS, paid_by_ref)
+    
+    @staticmethod
+    def get_trip_detail(trip_id: str, paid_by_ref: bool = False) -> Optional[Dict[str, Any]]:
+        """Trip.to_dict() of one trip, built from row tuples.
+
+        With paid_by_ref the expenses leave out paidBy; clients find the payer
+        by paidById in the trip's members.
+        """
+        views = TripService._trip_views(Trip.id == trip_id, DETAIL_FIELDS, paid_by_ref)
+        return views[0] if views else None
+    
+    @staticmethod
+    def _trip_views(condition, fields: List[str], paid_by_ref: bool = False) -> List[Dict[str, Any]]:
+        # Scalar fields and aggregates come from one projected SELECT
+        names, stmt = projection_query(fields)
+        views = [row_to_dict(names, row) for row in db.session.execute(stmt.where(condition).order_by(*TRIP_ORDER))]
+        
+        # Each collection is one SELECT across all the trips
+        collections = [field for field in fields if field in TRIP_COLLECTIONS]
+        if not collections or not views:
+            return views
+        by_id = {view["id"]: view for view in views}
+        for view in views:
+            view.update({field: [] for field in collections})
+        
+        members = None
+        if "members" in collections:
+            stmt = MEMBER.select().where(Member.trip_id.in_(by_id)).order_by(*MEMBER_ORDER)
+            members = {member["id"]: member for member in MEMBER.all(stmt)}
+            balances = dict(db.session.execute(
+                db.select(MemberBalance.member_id, type_coerce(MemberBalance.balance, Integer))
+                .where(MemberBalance.trip_id.in_(by_id))
+            ).all())
+            for member in members.values():
+                by_id[member["tripId"]]["members"].append(
+                    {**member, "balance": balances.get(member["id"], 0) / 100}
+                )
+        if "expenses" in collections:
+            condition = Expense.trip_id.in_(by_id)
+            for expense in expense_views(condition, EXPENSE_ORDER, members, embed_payer=not paid_by_ref):
+                by_id[expense["tripId"]]["expenses"].append(expense)
+        if "activities" in collections:
+            stmt = ACTIVITY.select().where(Activity.trip_id.in_(by_id)).order_by(*ACTIVITY_ORDER)
+            for activity in ACTIVITY.all(stmt):
+                by_id[activity["tripId"]]["activities"].append(activity)
+        return views
+    
     @staticmethod
     def get_all_trips() -> List[Trip]:
         """Get all trips (Admin override or fallback)"""
@@ -33,10 +145,23 @@ class TripService:
     
     @staticmethod
     def get_trip_by_id(trip_id: str) -> Optional[Trip]:
-        """Get trip by ID"""
-        return db.session.get(Trip, trip_id)
+        """Get trip by ID (eager-loads everything Trip.to_dict needs)"""
+        return db.session.execute(
+            db.select(Trip)
+            .filter_by(id=trip_id)
+            .options(*TRIP_DETAIL_PLAN)
+            .execution_options(populate_existing=True)
+        ).scalar()
     
     @staticmethod
+    def trip_exists(trip_id: str) -> bool:
+        """Check a trip exists without loading it"""
+        return db.session.execute(
+            db.select(Trip.id).filter_by(id=trip_id)
+        ).first() is not None
+    
+    @staticmethod
+    @write_retry
     def update_trip(trip_id: str, trip_data: Dict[str, Any]) -> Optional[Trip]:
         """Update an existing trip"""
         trip = db.session.get(Trip, trip_id)
@@ -53,22 +178,26 @@ class TripService:
         if 'endDate' in trip_data:
             trip.end_date = trip_data['endDate']
         if 'budget' in trip_data:
-            trip.budget = str(trip_data['budget'])
+            trip.budget = to_money(trip_data['budget'], blank=Decimal(0))
         if 'coverImage' in trip_data:
             trip.cover_image = trip_data['coverImage']
         if 'description' in trip_data:
             trip.description = trip_data['description']
         
-        db.session.commit()
-        return trip
+        record_change(trip.id, "trip", "update", trip.id)
+        commit()
+        # Reload with the detail plan so the caller's to_dict() does not lazy-load
+        return TripService.get_trip_by_id(trip_id)
     
     @staticmethod
+    @write_retry
     def delete_trip(trip_id: str) -> bool:
         """Delete a trip"""
         trip = db.session.get(Trip, trip_id)
         if not trip:
             return False
         
+        record_change(trip.id, "trip", "delete", trip.id)
         db.session.delete(trip)
-        db.session.commit()
+        commit()
         return True
@@ -0,0 +1,51 @@
+import os
+from sqlalchemy import event
+
+# ============================================
+# SQLite connection profile
+# ============================================
+#
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer, synchronous=NORMAL is durable under WAL except for the last
+# transactions on power loss, and busy_timeout makes a writer wait for the
+# lock instead of failing at once with "database is locked".
+#
+# The sqlite3 driver starts transactions on its own, just before the first
+# INSERT/UPDATE/DELETE, so reads ahead of a write do not pin a snapshot. A
+# SAVEPOINT issued before that point would open a transaction of its own
+# that its RELEASE commits; install() issues the BEGIN first so nested
+# atomic() scopes stay inside the outer transaction.
+
+def default_pragmas() -> dict:
+    """Pragmas from the environment (SQLITE_*), in the order they are applied"""
+    return {
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        # Negative cache_size is in KiB: 64 MiB page cache per connection
+        "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-65536")),
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+    }
+
+def install(engine, pragmas: dict) -> None:
+    """Run the pragmas on each connection the engine opens (SQLite only)"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    
+    @event.listens_for(engine, "savepoint")
+    def _begin_before_savepoint(conn, name):
+        # On the raw connection, like the driver's own implicit BEGIN, so it
+        # is not counted as a statement by the query counters
+        driver_connection = conn.connection.driver_connection
+        if not driver_connection.in_transaction:
+            driver_connection.execute("BEGIN")
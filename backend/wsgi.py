@@ -0,0 +1,12 @@
+"""Production WSGI entry point.
+
+    gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+Run `flask --app backend.app db upgrade` before starting; workers only
+check the schema version. Behind a reverse proxy set PROXY_HOPS to the
+number of proxies in front of gunicorn, so client addresses (used by the
+login throttle) come from X-Forwarded-For instead of being the proxy's.
+"""
+from backend.app import create_app
+
+app = create_app()
@@ -0,0 +1,62 @@
+"""Trip analytics latency and response size as the expense count grows.
+
+Loads N expenses into one trip of a file-backed SQLite database (through the
+bulk import endpoint, in MAX_BULK_ROWS batches) and times
+GET /trips/<id>/analytics cold (after a write, so the cache is invalidated)
+and warm (served from the trip cache). The response size should stay flat;
+cold latency grows with the index-only scan, warm latency does not.
+
+    python -m benchmarks.bench_analytics [rows ...]    (default 1000 10000 100000)
+"""
+import statistics
+import sys
+import tempfile
+import time
+from backend.services.expense_service import MAX_BULK_ROWS
+from benchmarks.bench_bulk_import import make_app, rows_for
+
+RUNS = 5
+
+
+def load(client, trip_id, member_ids, count):
+    loaded = 0
+    while loaded < count:
+        batch = rows_for(min(MAX_BULK_ROWS, count - loaded), member_ids)
+        response = client.post(f"/api/trips/{trip_id}/expenses:bulk", json=batch)
+        assert response.status_code == 201, response.get_json()
+        loaded += len(batch)
+
+
+def timed_get(client, url):
+    started = time.perf_counter()
+    response = client.get(url)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    return elapsed, len(response.get_data())
+
+
+def measure(directory, count):
+    client, trip_id, member_ids = make_app(directory, f"analytics{count}")
+    load(client, trip_id, member_ids, count)
+    url = f"/api/trips/{trip_id}/analytics"
+
+    cold, warm = [], []
+    for run in range(RUNS):
+        # Any write bumps the trip version, so the next read recomputes
+        client.put(f"/api/trips/{trip_id}", json={"description": f"run {run}"})
+        elapsed, size = timed_get(client, url)
+        cold.append(elapsed)
+        warm.append(timed_get(client, url)[0])
+    return statistics.median(cold), statistics.median(warm), size
+
+
+def main(counts):
+    print(f"{'expenses':>10} {'cold ms':>10} {'warm ms':>10} {'bytes':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            cold, warm, size = measure(directory, count)
+            print(f"{count:>10} {cold * 1000:>10.2f} {warm * 1000:>10.2f} {size:>8}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
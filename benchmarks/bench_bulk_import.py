@@ -0,0 +1,68 @@
+"""Bulk expense import vs the single-row endpoint.
+
+Imports the same N expenses into a file-backed SQLite database once with N
+POST /trips/<id>/expenses calls and once with a single
+POST /trips/<id>/expenses:bulk call, and reports rows per second.
+
+    python -m benchmarks.bench_bulk_import [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+from backend.app import create_app
+
+CATEGORIES = ["food", "transportation", "accommodation", "activities", "shopping", "other"]
+
+
+def make_app(directory, name):
+    path = os.path.join(directory, f"{name}.db")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+    client = app.test_client()
+    client.post("/api/auth/register", json={"username": name, "password": name})
+    trip = client.post("/api/trips", json={
+        "name": "Import", "destination": "Anywhere", "startDate": "2026-01-01",
+        "endDate": "2026-01-31", "budget": 100000,
+    }).get_json()
+    member_ids = [trip["members"][0]["id"]] + [
+        client.post(f"/api/trips/{trip['id']}/members", json={"name": f"Member {i}"}).get_json()["id"]
+        for i in range(5)
+    ]
+    return client, trip["id"], member_ids
+
+
+def rows_for(count, member_ids):
+    return [{
+        "description": f"Row {i}",
+        "amount": f"{10 + i % 90}.{i % 100:02d}",
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "paidById": member_ids[i % len(member_ids)],
+        "date": f"2026-01-{1 + i % 28:02d}",
+        "splitAmongIds": member_ids,
+    } for i in range(count)]
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as directory:
+        client, trip_id, member_ids = make_app(directory, "single")
+        rows = rows_for(count, member_ids)
+        started = time.perf_counter()
+        for row in rows:
+            assert client.post(f"/api/trips/{trip_id}/expenses", json=row).status_code == 201
+        single = time.perf_counter() - started
+
+        client, trip_id, member_ids = make_app(directory, "bulk")
+        rows = rows_for(count, member_ids)
+        started = time.perf_counter()
+        response = client.post(f"/api/trips/{trip_id}/expenses:bulk", json=rows)
+        bulk = time.perf_counter() - started
+        assert response.status_code == 201 and response.get_json()["created"] == count
+
+    print(f"{count} expenses x {len(member_ids)} splits")
+    print(f"single-row endpoint: {single:8.3f}s  {count / single:10.0f} rows/s")
+    print(f"bulk endpoint:       {bulk:8.3f}s  {count / bulk:10.0f} rows/s")
+    print(f"speedup:             {single / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
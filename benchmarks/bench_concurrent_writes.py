@@ -0,0 +1,136 @@
+"""Concurrent expense writers against a file-backed SQLite database.
+
+THREADS threads each make WRITES expense writes on the same trip (creates,
+updates and deletes of their own earlier expenses, in a fixed mix) while as
+many reader threads load the trip detail, once with the previous
+configuration (rollback journal, no pragmas, no write retries) and once with
+the SQLite profile and @write_retry. Reports write throughput, write
+latency, failed writes and the reads completed meanwhile.
+
+Afterwards the balance ledger is checked against a full recompute
+(BalanceService.check_all); any drift means a lost update and fails the run.
+
+    python -m benchmarks.bench_concurrent_writes [threads] [writes]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from backend.app import create_app
+from backend.models import db, User, Member
+from backend.services.expense_service import ExpenseService
+from backend.services.balance_service import BalanceService
+from backend.services.trip_service import TripService
+from benchmarks.fixtures import seed_trips
+
+PROFILES = {
+    "baseline": {"SQLITE_PRAGMAS": {}, "WRITE_RETRY_ATTEMPTS": 1},
+    "wal + retry": {},
+}
+
+
+def setup(path, threads, overrides):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        # One pooled connection per writer and reader thread
+        "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": threads * 2, "max_overflow": 0},
+        **overrides,
+    })
+    app.test_client().post("/api/auth/register", json={"username": "writer", "password": "writer"})
+    with app.app_context():
+        user = db.session.execute(db.select(User).filter_by(username="writer")).scalar()
+        trip_id = seed_trips(user.id, trips=1, members=4, expenses=0, activities=0)[0]
+        member_ids = db.session.execute(db.select(Member.id).filter_by(trip_id=trip_id)).scalars().all()
+    return app, trip_id, member_ids
+
+
+# Repeating write mix: create twice, then update and delete own expenses
+MIX = ("create", "create", "update", "delete")
+
+
+def write(op, trip_id, member_ids, i, own):
+    if op == "update" and own:
+        ExpenseService.update_expense(own[-1], {
+            "amount": 20 + i % 7, "paidById": member_ids[(i + 1) % len(member_ids)],
+            "splitAmongIds": member_ids[:2 + i % (len(member_ids) - 1)],
+        })
+    elif op == "delete" and own:
+        ExpenseService.delete_expense(own.pop(0))
+    else:
+        own.append(ExpenseService.create_expense({
+            "tripId": trip_id, "description": f"Write {i}", "amount": 12.5,
+            "category": "food", "paidById": member_ids[i % len(member_ids)],
+            "date": "2026-01-01", "splitAmongIds": member_ids,
+        }).id)
+
+
+def writer(app, trip_id, member_ids, writes, latencies, errors):
+    own = []
+    with app.app_context():
+        for i in range(writes):
+            started = time.perf_counter()
+            try:
+                write(MIX[i % len(MIX)], trip_id, member_ids, i, own)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                db.session.rollback()
+                errors.append(type(e).__name__)
+        db.session.remove()
+
+
+def reader(app, trip_id, done, reads):
+    with app.app_context():
+        while not done.is_set():
+            TripService.get_trip_by_id(trip_id).to_dict()
+            db.session.rollback()
+            reads.append(1)
+        db.session.remove()
+
+
+def run(directory, name, overrides, threads, writes):
+    app, trip_id, member_ids = setup(os.path.join(directory, f"{len(os.listdir(directory))}.db"), threads, overrides)
+    latencies, errors, reads = [], [], []
+    done = threading.Event()
+    readers = [threading.Thread(target=reader, args=(app, trip_id, done, reads)) for _ in range(threads)]
+    workers = [
+        threading.Thread(target=writer, args=(app, trip_id, member_ids, writes, latencies, errors))
+        for _ in range(threads)
+    ]
+    started = time.perf_counter()
+    for thread in readers + workers:
+        thread.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in readers:
+        thread.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+    with app.app_context():
+        drift = BalanceService.check_all()
+        db.engine.dispose()
+    print(f"{name:<12} {len(latencies) / elapsed:>9.0f} {p50:>8.2f} {p99:>8.2f} {len(errors):>7} {len(reads):>7} {len(drift):>6}")
+    return drift
+
+
+def main(threads, writes):
+    print(f"{threads} threads x {writes} expense writes ({'/'.join(MIX)})")
+    print(f"{'profile':<12} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7} {'reads':>7} {'drift':>6}")
+    drift = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, overrides in PROFILES.items():
+            drift += run(directory, name, overrides, threads, writes)
+    for entry in drift:
+        print(f"ledger drift: member {entry['memberId']} stored {entry['stored']} expected {entry['expected']}")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    ))
@@ -0,0 +1,94 @@
+"""Login bursts: hashing pool size and failed-login throttling.
+
+THREADS threads each post LOGINS logins while as many reader threads load
+the trip list, under three profiles:
+
+    unbounded    a hashing thread per request thread, no throttle (the old
+                 behaviour: every login hashes in its own request thread)
+    pool         PASSWORD_HASH_WORKERS=2, no throttle
+    throttled    pool, plus the failed-login limits
+
+Half of the logins use a wrong password. Reports logins per second, 429s,
+and the reader latency while the burst runs.
+
+    python -m benchmarks.bench_login [threads] [logins]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from backend.app import create_app
+
+PROFILES = {
+    "unbounded": {"LOGIN_LIMIT_PER_USER": 0, "LOGIN_LIMIT_PER_ADDRESS": 0},
+    "pool": {"PASSWORD_HASH_WORKERS": 2, "LOGIN_LIMIT_PER_USER": 0, "LOGIN_LIMIT_PER_ADDRESS": 0},
+    "throttled": {"PASSWORD_HASH_WORKERS": 2},
+}
+
+
+def login_worker(app, index, logins, statuses):
+    client = app.test_client()
+    for i in range(logins):
+        password = "secret" if i % 2 else "wrong"
+        response = client.post("/api/auth/login", json={"username": f"user{index}", "password": password})
+        statuses.append(response.status_code)
+
+
+def reader(app, done, latencies):
+    client = app.test_client()
+    client.post("/api/auth/login", json={"username": "reader", "password": "secret"})
+    while not done.is_set():
+        started = time.perf_counter()
+        client.get("/api/trips")
+        latencies.append(time.perf_counter() - started)
+
+
+def run(directory, name, overrides, threads, logins):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, f'{name}.db')}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": threads * 2, "max_overflow": 0},
+        "PASSWORD_HASH_WORKERS": threads,
+        "PASSWORD_HASH_QUEUE": threads * 2,
+        **overrides,
+    })
+    for username in ["reader"] + [f"user{index}" for index in range(threads)]:
+        app.test_client().post("/api/auth/register", json={"username": username, "password": "secret"})
+    
+    statuses, latencies = [], []
+    done = threading.Event()
+    readers = [threading.Thread(target=reader, args=(app, done, latencies)) for _ in range(threads)]
+    workers = [threading.Thread(target=login_worker, args=(app, index, logins, statuses)) for index in range(threads)]
+    for thread in readers:
+        thread.start()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in readers:
+        thread.join()
+    
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    print(f"{name:<11} {len(statuses) / elapsed:>9.0f} {statuses.count(429):>6} {statuses.count(503):>6} "
+          f"{len(latencies):>7} {p50:>8.2f} {p99:>8.2f}")
+
+
+def main(threads, logins):
+    print(f"{threads} threads x {logins} logins (half with a wrong password), {threads} readers")
+    print(f"{'profile':<11} {'logins/s':>9} {'429':>6} {'503':>6} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, overrides in PROFILES.items():
+            run(directory, name, overrides, threads, logins)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
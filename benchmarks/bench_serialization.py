@@ -0,0 +1,93 @@
+"""Trip payload build + encode time: ORM to_dict() vs the row serializers.
+
+Seeds one trip with EXPENSES expenses (each split across all members) in a
+file-backed SQLite database and builds the full trip payload (GET /trips/<id>)
+and the expense list (GET /trips/<id>/expenses) four ways:
+
+    orm      TRIP_DETAIL_PLAN + Trip.to_dict(), stdlib json (the old path)
+    rows     TripService.get_trip_detail() row tuples, stdlib json
+    orjson   row tuples, orjson
+    ref      row tuples with paidBy by reference, orjson
+
+Times are medians of RUNS, split into load (SQL + dict building) and encode.
+
+    python -m benchmarks.bench_serialization [expenses]    (default 10000)
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from backend.app import create_app
+from backend.models import db, User
+from backend.services.expense_service import ExpenseService
+from backend.services.trip_service import TripService
+from benchmarks.fixtures import seed_trips
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPENSES = 10000
+MEMBERS = 8
+RUNS = 5
+
+
+def stdlib_dumps(payload):
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+def orjson_dumps(payload):
+    return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+
+
+def measure(load, dumps):
+    loads, encodes = [], []
+    for _ in range(RUNS):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        payload = load()
+        loaded = time.perf_counter()
+        body = dumps(payload)
+        loads.append(loaded - started)
+        encodes.append(time.perf_counter() - loaded)
+    return statistics.median(loads), statistics.median(encodes), len(body)
+
+
+def main(expenses):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, 'bench.db')}"})
+        with app.app_context():
+            user = User(username="bench")
+            user.set_password("bench")
+            db.session.add(user)
+            db.session.flush()
+            trip_id = seed_trips(user.id, trips=1, members=MEMBERS, expenses=expenses, activities=20)[0]
+
+            variants = [
+                ("orm", lambda: TripService.get_trip_by_id(trip_id).to_dict(),
+                 lambda: [expense.to_dict() for expense in ExpenseService.get_expenses_by_trip(trip_id)], stdlib_dumps),
+                ("rows", lambda: TripService.get_trip_detail(trip_id),
+                 lambda: ExpenseService.get_expense_views(trip_id), stdlib_dumps),
+            ]
+            if orjson is not None:
+                variants += [
+                    ("orjson", lambda: TripService.get_trip_detail(trip_id),
+                     lambda: ExpenseService.get_expense_views(trip_id), orjson_dumps),
+                    ("ref", lambda: TripService.get_trip_detail(trip_id, paid_by_ref=True),
+                     lambda: ExpenseService.get_expense_views_by_ref(trip_id), orjson_dumps),
+                ]
+
+            print(f"{expenses} expenses x {MEMBERS} splits")
+            print(f"{'payload':<10} {'variant':<8} {'load ms':>10} {'encode ms':>10} {'total ms':>10} {'bytes':>10}")
+            for payload_name, index in (("trip", 1), ("expenses", 2)):
+                for variant in variants:
+                    load_time, encode_time, size = measure(variant[index], variant[3])
+                    print(f"{payload_name:<10} {variant[0]:<8} {load_time * 1000:>10.1f} {encode_time * 1000:>10.1f} "
+                          f"{(load_time + encode_time) * 1000:>10.1f} {size:>10}")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else EXPENSES)
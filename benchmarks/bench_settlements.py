@@ -0,0 +1,50 @@
+"""Settlement engine benchmark.
+
+Times SettlementService.settle on random balanced ledgers of increasing
+size and checks that every plan actually settles the books.
+
+    python -m benchmarks.bench_settlements
+"""
+import random
+import time
+from decimal import Decimal
+from backend.models import CENT
+from backend.services.settlement_service import SettlementService
+
+SIZES = [5, 10, 12, 50, 100, 250, 500, 1000]
+REPEAT = 50
+
+
+def random_balances(members, rng):
+    """Random integer-cent balances summing to zero"""
+    cents = [rng.randint(-50000, 50000) for _ in range(members - 1)]
+    cents.append(-sum(cents))
+    return {f"m{i}": Decimal(amount) * CENT for i, amount in enumerate(cents)}
+
+
+def verify(balances, plan):
+    remaining = dict(balances)
+    for transfer in plan["transfers"]:
+        amount = Decimal(str(transfer["amount"]))
+        remaining[transfer["fromMemberId"]] += amount
+        remaining[transfer["toMemberId"]] -= amount
+    assert all(value == 0 for value in remaining.values()), "plan does not settle"
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{'members':>8} {'mode':>7} {'transfers':>10} {'mean ms':>9} {'max ms':>9}")
+    for size in SIZES:
+        timings = []
+        for _ in range(REPEAT):
+            balances = random_balances(size, rng)
+            started = time.perf_counter()
+            plan = SettlementService.settle(balances)
+            timings.append((time.perf_counter() - started) * 1000)
+            verify(balances, plan)
+        print(f"{size:>8} {plan['mode']:>7} {len(plan['transfers']):>10} "
+              f"{sum(timings) / len(timings):>9.3f} {max(timings):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
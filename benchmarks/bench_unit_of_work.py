@@ -0,0 +1,111 @@
+"""Multi-step write flows: a commit per service call vs one atomic() scope.
+
+Each flow creates a trip with its owner, then adds MEMBERS members,
+ACTIVITIES activities, a hotel, a driver and an expense split across the
+members, the way the client does when a trip is planned in one go. The flow
+runs FLOWS times against a file-backed SQLite database, once with every
+service call committing on its own (the route default) and once inside a
+single atomic() scope, under synchronous=NORMAL and synchronous=FULL.
+Reports flows per second and commits per flow.
+
+    python -m benchmarks.bench_unit_of_work [flows]    (default 200)
+"""
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from backend.app import create_app
+from backend.models import db, User
+from backend.sqlite_profile import default_pragmas
+from backend.services.transaction import atomic, run_with_retry
+from backend.services.trip_service import TripService
+from backend.services.member_service import MemberService
+from backend.services.activity_service import ActivityService
+from backend.services.hotel_service import HotelService
+from backend.services.driver_service import DriverService
+from backend.services.expense_service import ExpenseService
+
+FLOWS = 200
+MEMBERS = 4
+ACTIVITIES = 5
+
+
+def plan_trip(user, i):
+    trip = TripService.create_trip_with_owner({
+        "name": f"Trip {i}", "destination": "Lisbon",
+        "startDate": "2026-05-01", "endDate": "2026-05-05", "budget": 2000,
+    }, user)
+    member_ids = [
+        MemberService.add_member({"tripId": trip.id, "name": f"Member {m}"}).id
+        for m in range(MEMBERS)
+    ]
+    for a in range(ACTIVITIES):
+        ActivityService.create_activity({
+            "tripId": trip.id, "title": f"Activity {a}", "location": "Alfama",
+            "date": "2026-05-02", "time": "10:00", "cost": 15,
+        })
+    HotelService.book_hotel({
+        "tripId": trip.id, "hotelName": "Hotel", "location": "Baixa",
+        "checkInDate": "2026-05-01", "checkOutDate": "2026-05-05",
+        "roomType": "double", "guests": MEMBERS, "cost": 600,
+    })
+    DriverService.hire_driver({
+        "tripId": trip.id, "name": "Driver", "contact": "555", "vehicleType": "van",
+        "pickupLocation": "Airport", "dropoffLocation": "Hotel",
+        "date": "2026-05-01", "time": "09:00", "cost": 40,
+    })
+    ExpenseService.create_expense({
+        "tripId": trip.id, "description": "Dinner", "amount": 80, "category": "food",
+        "paidById": member_ids[0], "date": "2026-05-01", "splitAmongIds": member_ids,
+    })
+
+
+def plan_trip_atomic(user, i):
+    def flow():
+        with atomic():
+            plan_trip(user, i)
+    run_with_retry(flow)
+
+
+def run(directory, synchronous, name, flow, flows):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, f'{len(os.listdir(directory))}.db')}",
+        "SQLITE_PRAGMAS": {**default_pragmas(), "synchronous": synchronous},
+    })
+    commits = []
+    
+    def count_commit(session):
+        if not session.in_nested_transaction():
+            commits.append(1)
+    
+    with app.app_context():
+        user = User(username="planner")
+        user.set_password("planner")
+        db.session.add(user)
+        db.session.commit()
+        
+        event.listen(Session, "after_commit", count_commit)
+        try:
+            started = time.perf_counter()
+            for i in range(flows):
+                flow(user, i)
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(Session, "after_commit", count_commit)
+        db.engine.dispose()
+    print(f"{synchronous:<8} {name:<10} {flows / elapsed:>9.1f} {elapsed / flows * 1000:>9.2f} {len(commits) / flows:>8.1f}")
+
+
+def main(flows):
+    print(f"{flows} flows: trip + owner, {MEMBERS} members, {ACTIVITIES} activities, hotel, driver, expense")
+    print(f"{'sync':<8} {'mode':<10} {'flows/s':>9} {'ms/flow':>9} {'commits':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for synchronous in ("NORMAL", "FULL"):
+            run(directory, synchronous, "per call", plan_trip, flows)
+            run(directory, synchronous, "atomic", plan_trip_atomic, flows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else FLOWS)
@@ -0,0 +1,90 @@
+"""Synthetic data for benchmarks and query-budget checks."""
+import random
+from backend.models import db, User, Trip, Member, Expense, ExpenseSplit, Activity, Driver, Hotel, split_evenly, to_money
+from backend.services.balance_service import BalanceService
+
+CATEGORIES = ["food", "transportation", "accommodation", "activities", "shopping", "other"]
+
+# Named data scales for the benchmark suite; trips/members/expenses/activities
+# are per user and per trip as in seed_trips
+SCALES = {
+    "small": {"users": 2, "trips": 2, "members": 4, "expenses": 25, "activities": 5},
+    "medium": {"users": 5, "trips": 5, "members": 8, "expenses": 250, "activities": 20},
+    "large": {"users": 10, "trips": 10, "members": 12, "expenses": 2500, "activities": 50},
+}
+
+
+def seed_trips(user_id, trips=2, members=4, expenses=10, activities=5, seed=42):
+    """Create `trips` trips for a user, each with members, split expenses,
+    activities, a driver and a hotel. Returns the list of trip ids."""
+    rng = random.Random(seed)
+    trip_ids = []
+    for t in range(trips):
+        trip = Trip(
+            user_id=user_id,
+            name=f"Trip {t}",
+            destination=f"City {t}",
+            start_date="2026-01-01",
+            end_date="2026-01-10",
+            budget=str(rng.randint(500, 5000)),
+        )
+        db.session.add(trip)
+        trip_members = [
+            Member(trip=trip, name=f"Member {m}", is_admin="true" if m == 0 else "false")
+            for m in range(members)
+        ]
+        db.session.add_all(trip_members)
+        db.session.flush()
+
+        for e in range(expenses):
+            amount = to_money(rng.randint(500, 50000) / 100)
+            expense = Expense(
+                trip=trip,
+                description=f"Expense {e}",
+                amount=amount,
+                category=rng.choice(CATEGORIES),
+                paid_by_id=rng.choice(trip_members).id,
+                date=f"2026-01-{1 + e % 10:02d}",
+            )
+            db.session.add(expense)
+            for member, share in zip(trip_members, split_evenly(amount, members)):
+                db.session.add(ExpenseSplit(expense=expense, member_id=member.id, amount=share))
+
+        for a in range(activities):
+            db.session.add(Activity(
+                trip=trip, title=f"Activity {a}", location="Somewhere",
+                date=f"2026-01-{1 + a % 10:02d}", cost=str(rng.randint(0, 100)),
+            ))
+        db.session.add(Driver(
+            trip=trip, name="Driver", contact="555-0100", vehicle_type="car",
+            pickup_location="Airport", dropoff_location="Hotel", date="2026-01-01", cost="40",
+        ))
+        db.session.add(Hotel(
+            trip=trip, hotel_name="Hotel", location="Centre", check_in_date="2026-01-01",
+            check_out_date="2026-01-10", room_type="double", guests=str(members), cost="900",
+        ))
+        trip_ids.append(trip.id)
+
+    # Expenses were inserted directly, so build their ledger rows in one pass
+    db.session.flush()
+    for trip_id in trip_ids:
+        BalanceService.check_trip(trip_id, repair=True)
+    db.session.commit()
+    return trip_ids
+
+
+def seed_dataset(scale="small", password="bench", seed=42):
+    """Create the users of a named scale (bench0, bench1, ...) and their trips.
+    Returns [(username, user_id, [trip ids])]; all users share `password`."""
+    params = dict(SCALES[scale]) if isinstance(scale, str) else dict(scale)
+    users = params.pop("users")
+    # Hashing is deliberately slow; do it once
+    template = User()
+    template.set_password(password)
+    dataset = []
+    for u in range(users):
+        user = User(username=f"bench{u}", email=f"bench{u}@example.com", password_hash=template.password_hash)
+        db.session.add(user)
+        db.session.flush()
+        dataset.append((user.username, user.id, seed_trips(user.id, seed=seed + u, **params)))
+    return dataset
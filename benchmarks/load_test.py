@@ -0,0 +1,122 @@
+"""Requests/sec on the trip endpoints against gunicorn at several worker counts.
+
+Seeds a file-backed SQLite database, then for each worker count starts
+`gunicorn -c backend/gunicorn.conf.py backend.wsgi:app` on it and drives the
+trip read endpoints from CLIENTS client processes for DURATION seconds,
+reporting throughput and latency percentiles.
+
+    python -m benchmarks.load_test [workers ...]    (default 1 2 4)
+"""
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from backend.app import create_app
+from backend.models import db, User
+from benchmarks.fixtures import seed_trips
+
+CLIENTS = 16
+DURATION = 10.0
+THREADS_PER_WORKER = 1
+SCALE = {"trips": 5, "members": 6, "expenses": 200, "activities": 20}
+
+
+def seed(path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+    app.test_client().post("/api/auth/register", json={"username": "load", "password": "load"})
+    with app.app_context():
+        user = db.session.execute(db.select(User).filter_by(username="load")).scalar()
+        trip_id = seed_trips(user.id, **SCALE)[0]
+        db.engine.dispose()
+    return trip_id
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(path, port, workers):
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite:///{path}", PORT=str(port), HOST="127.0.0.1",
+        WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(THREADS_PER_WORKER), LOG_LEVEL="warning", ACCESS_LOG="",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py", "backend.wsgi:app"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def client(port, trip_id, duration):
+    """One keep-alive connection looping over the endpoints; returns latencies"""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", "/api/auth/login", json.dumps({"username": "load", "password": "load"}),
+                 {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader("Set-Cookie").split(";")[0]
+    urls = [f"/api/trips/{trip_id}", f"/api/trips/{trip_id}/expenses",
+            f"/api/trips/{trip_id}/members", "/api/trips?view=summary"]
+
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        for url in urls:
+            started = time.perf_counter()
+            conn.request("GET", url, headers={"Cookie": cookie})
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200:
+                raise RuntimeError(f"GET {url} returned {response.status}")
+    return latencies
+
+
+def run(path, trip_id, workers):
+    port = free_port()
+    server = start_server(path, port, workers)
+    try:
+        with ProcessPoolExecutor(CLIENTS) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(client, [port] * CLIENTS, [trip_id] * CLIENTS, [DURATION] * CLIENTS))
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = sorted(latency for result in results for latency in result)
+    return (
+        len(latencies) / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+    )
+
+
+def main(worker_counts):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "load.db")
+        trip_id = seed(path)
+        print(f"{CLIENTS} clients, {THREADS_PER_WORKER} thread(s) per worker, {DURATION:.0f}s per run")
+        print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for workers in worker_counts:
+            throughput, p50, p99 = run(path, trip_id, workers)
+            print(f"{workers:>8} {throughput:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 2, 4])
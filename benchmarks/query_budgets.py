@@ -0,0 +1,95 @@
+"""Query-count regression check for the read endpoints.
+
+Seeds a scratch in-memory database at two data scales, calls every list and
+detail endpoint and fails if an endpoint runs more SQL statements than its
+budget, or if its query count grows with the amount of data (an N+1).
+Trip-scoped endpoints are then re-requested with their ETag and must answer
+304 within NOT_MODIFIED_BUDGET.
+
+    python -m benchmarks.query_budgets
+"""
+import sys
+from backend.app import create_app
+from backend.models import db, User
+from backend.query_counter import QueryCounter, QueryBudgetExceeded
+from benchmarks.fixtures import seed_trips
+
+# Maximum statements per request (login-protected routes include the
+# user_loader lookup, trip-scoped routes the revision lookup for the ETag)
+ENDPOINT_BUDGETS = {
+    "/api/trips": 7,
+    "/api/trips?view=summary": 2,
+    "/api/trips/{trip}": 8,
+    "/api/trips/{trip}/members": 2,
+    "/api/trips/{trip}/expenses": 3,
+    "/api/trips/{trip}/activities": 2,
+    "/api/trips/{trip}/drivers": 2,
+    "/api/trips/{trip}/hotels": 2,
+    "/api/trips/{trip}/analytics": 8,
+}
+
+# A 304 only costs the revision lookup (plus the user_loader)
+NOT_MODIFIED_BUDGET = 2
+
+SCALES = [
+    {"trips": 2, "members": 3, "expenses": 5, "activities": 2},
+    {"trips": 10, "members": 8, "expenses": 120, "activities": 20},
+]
+
+
+def measure(scale):
+    """Return {endpoint: query count} for one data scale"""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    client = app.test_client()
+    client.post("/api/auth/register", json={"username": "budget", "password": "budget"})
+
+    with app.app_context():
+        user = db.session.execute(db.select(User).filter_by(username="budget")).scalar()
+        trip_id = seed_trips(user.id, **scale)[0]
+
+    counts = {}
+    for endpoint in ENDPOINT_BUDGETS:
+        url = endpoint.format(trip=trip_id)
+        with QueryCounter() as counter:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        counts[endpoint] = counter.count
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            with QueryCounter() as counter:
+                response = client.get(url, headers={"If-None-Match": etag})
+            if response.status_code != 304:
+                raise RuntimeError(f"GET {url} with If-None-Match returned {response.status_code}")
+            counts[endpoint + " (304)"] = counter.count
+    return counts
+
+
+def check():
+    results = [measure(scale) for scale in SCALES]
+    failures = []
+    for endpoint, budget in ENDPOINT_BUDGETS.items():
+        counts = [result[endpoint] for result in results]
+        print(f"{endpoint:<36} queries={counts} budget={budget}")
+        if max(counts) > budget:
+            failures.append(f"{endpoint} ran {max(counts)} queries (budget {budget})")
+        elif len(set(counts)) > 1:
+            failures.append(f"{endpoint} query count grows with data: {counts}")
+        
+        revalidated = [result[endpoint + " (304)"] for result in results if endpoint + " (304)" in result]
+        if revalidated:
+            print(f"{endpoint + ' (304)':<36} queries={revalidated} budget={NOT_MODIFIED_BUDGET}")
+            if max(revalidated) > NOT_MODIFIED_BUDGET:
+                failures.append(f"{endpoint} 304 ran {max(revalidated)} queries (budget {NOT_MODIFIED_BUDGET})")
+    if failures:
+        raise QueryBudgetExceeded("\n".join(failures))
+
+
+if __name__ == "__main__":
+    try:
+        check()
+    except QueryBudgetExceeded as e:
+        print(f"FAILED\n{e}")
+        sys.exit(1)
+    print("OK")
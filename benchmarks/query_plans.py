@@ -0,0 +1,112 @@
+"""Index coverage check: no service query may full-scan a table.
+
+Drives every route against a seeded scratch database, captures each SELECT,
+INSERT, UPDATE and DELETE the services issue, runs EXPLAIN QUERY PLAN on it
+and fails if SQLite reports a full table scan.
+
+    python -m benchmarks.query_plans
+"""
+import re
+import sys
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.app import create_app
+from backend.models import db, User, Member
+from backend.services.export_service import EXPORT_TABLES
+from benchmarks.fixtures import seed_trips
+
+# "SCAN expenses", "SCAN members_1 USING INDEX ..." -> full scan of a table
+# (as opposed to SEARCH, or a SCAN of a subquery / constant row)
+SCAN = re.compile(r"^SCAN (\w+?)(?:_\d+)?(?: |$)")
+
+# Statements whose plans are checked
+CHECKED_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def exercise(client, trip_id, member_ids):
+    """Hit every read route plus the write paths that run lookups"""
+    trip = f"/api/trips/{trip_id}"
+    for url in [
+        "/api/trips", "/api/trips?view=summary", "/api/trips?limit=5",
+        trip, f"{trip}?view=summary", f"{trip}/settlements",
+        f"{trip}/members", f"{trip}/expenses", f"{trip}/activities",
+        f"{trip}/drivers", f"{trip}/hotels",
+        f"{trip}/members?limit=2", f"{trip}/expenses?limit=2", f"{trip}/activities?limit=2",
+        f"{trip}/drivers?limit=2", f"{trip}/hotels?limit=2",
+        f"{trip}/changes", f"{trip}/changes?since=1", f"{trip}/analytics",
+        "/api/trips?fields=name,memberCount,expenseCount,activityCount,totalSpent",
+        f"{trip}?fields=name,memberCount,totalSpent", f"{trip}?paidBy=ref",
+        f"{trip}/expenses?paidBy=ref", f"{trip}/export",
+        *(f"{trip}/export?format=csv&table={table}" for table in EXPORT_TABLES),
+    ]:
+        client.get(url)
+    # The stream ends after SSE_MAX_SECONDS (set short by check())
+    client.get(f"{trip}/events").get_data()
+
+    rows = [{
+        "description": f"Bulk {i}", "amount": 10 + i, "category": "food",
+        "paidById": member_ids[i % len(member_ids)], "date": "2026-01-04", "splitAmongIds": member_ids,
+    } for i in range(3)]
+    client.post(f"{trip}/expenses:bulk", json=rows)
+
+    expense = client.post(f"{trip}/expenses", json={
+        "description": "Plan check", "amount": 30, "category": "food",
+        "paidById": member_ids[0], "date": "2026-01-05", "splitAmongIds": member_ids,
+    }).get_json()
+    client.put(f"{trip}/expenses/{expense['id']}", json={"amount": 45})
+    client.delete(f"{trip}/expenses/{expense['id']}")
+    client.delete(f"{trip}/members/{member_ids[-1]}")
+    client.get(f"{trip}/changes?since=1")
+    client.delete(trip)
+
+
+def check():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SSE_MAX_SECONDS": 0.2, "SSE_KEEPALIVE_SECONDS": 0.1})
+    client = app.test_client()
+    client.post("/api/auth/register", json={"username": "plans", "password": "plans"})
+    with app.app_context():
+        user = db.session.execute(db.select(User).filter_by(username="plans")).scalar()
+        trip_id = seed_trips(user.id, trips=3, members=4, expenses=20, activities=5)[0]
+        member_ids = db.session.execute(db.select(Member.id).filter_by(trip_id=trip_id)).scalars().all()
+        tables = set(db.metadata.tables)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(CHECKED_STATEMENTS):
+            # One parameter set stands in for an executemany(); a batched
+            # multi-row INSERT arrives as one flat tuple
+            if executemany and isinstance(parameters, list):
+                parameters = parameters[0]
+            captured.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        exercise(client, trip_id, member_ids)
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+
+    failures = []
+    with app.app_context():
+        connection = db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for statement, parameters in captured:
+                cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+                for row in cursor.fetchall():
+                    match = SCAN.match(row[-1])
+                    if match and match.group(1) in tables:
+                        failures.append(f"{row[-1]}\n    in: {' '.join(statement.split())[:200]}")
+        finally:
+            connection.close()
+
+    print(f"checked {len(captured)} statements")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check()
+    if failures:
+        print("FAILED: full table scans\n" + "\n".join(failures))
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,387 @@
+"""Benchmark suite: every API route and the main service methods.
+
+Seeds a scratch file-backed SQLite database at a named scale (see
+fixtures.SCALES), then times each case REPEAT times in-process and reports
+p50/p99 latency, throughput and SQL statements per call. Results are saved
+as JSON so two runs (e.g. two commits) can be compared with --compare.
+
+    python -m benchmarks.suite [--scale small|medium|large] [--repeat N]
+                               [--only SUBSTRING] [--output FILE]
+                               [--compare OLD.json]
+
+Route cases go through the Flask test client, so they include routing,
+login, serialization and the query counter's own overhead, but not the
+network or a WSGI server (see benchmarks.load_test for that). Write cases
+create their own rows in an untimed setup step, so deletes never run out.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+from backend.app import create_app
+from backend.models import db, Expense
+from backend.query_counter import QueryCounter
+from backend.services.analytics_service import AnalyticsService
+from backend.services.balance_service import BalanceService
+from backend.services.expense_service import ExpenseService
+from backend.services.export_service import ExportService
+from backend.services.settlement_service import SettlementService
+from backend.services.sync_service import SyncService
+from backend.services.trip_service import TripService
+from benchmarks.fixtures import SCALES, seed_dataset
+
+REPEAT = 50
+PASSWORD = "bench"
+# Routes that are not timed per request
+SKIPPED_ROUTES = {
+    ("/api/metrics", "GET"): "process-wide diagnostics",
+    ("/api/profiles", "GET"): "process-wide diagnostics",
+    ("/api/profiles/<int:profile_id>", "GET"): "process-wide diagnostics",
+    ("/api/cache/stats", "GET"): "process-wide diagnostics",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(durations: List[float], queries: List[int], errors: int) -> Dict[str, Any]:
+    total = sum(durations)
+    return {
+        "calls": len(durations),
+        "p50Ms": round(percentile(durations, 50) * 1000, 3),
+        "p99Ms": round(percentile(durations, 99) * 1000, 3),
+        "meanMs": round(total / len(durations) * 1000, 3),
+        "throughput": round(len(durations) / total, 1) if total else None,
+        "queries": sorted(queries)[len(queries) // 2],
+        "errors": errors,
+    }
+
+
+def run_case(call: Callable[[Any], Any], setup: Optional[Callable[[], Any]], repeat: int,
+             ok: Callable[[Any], bool] = lambda result: True) -> Dict[str, Any]:
+    """Time `call(setup())` repeat times; setup is not timed"""
+    durations, queries, errors = [], [], 0
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            result = call(argument)
+            durations.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        errors += 0 if ok(result) else 1
+    return summarize(durations, queries, errors)
+
+
+# ============================================
+# Route cases
+# ============================================
+
+def route_cases(app, dataset):
+    """[(name, rule, method, call, setup)] for every route under /api"""
+    username, _, trip_ids = dataset[0]
+    # Reads use the first trip; writes go to the second so the rows they add
+    # do not change what the read cases measure
+    trip_id, write_trip = trip_ids[0], trip_ids[1]
+    client = app.test_client()
+    client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+
+    with app.app_context():
+        members = [member.id for member in TripService.get_trip_by_id(write_trip).members]
+        expense_id = db.session.execute(db.select(Expense.id).filter_by(trip_id=write_trip).limit(1)).scalar()
+
+    bodies = {
+        "members": lambda: {"name": "Bench Member", "email": "bench@example.com"},
+        "expenses": lambda: {
+            "description": "Bench expense", "amount": 42.5, "category": "food",
+            "paidById": members[0], "date": "2026-01-02", "splitAmongIds": members,
+        },
+        "activities": lambda: {"title": "Bench", "location": "Here", "date": "2026-01-03", "cost": 10},
+        "drivers": lambda: {
+            "name": "Bench", "contact": "555-0199", "vehicleType": "van", "pickupLocation": "A",
+            "dropoffLocation": "B", "date": "2026-01-04", "cost": 25,
+        },
+        "hotels": lambda: {
+            "hotelName": "Bench Inn", "location": "Here", "checkInDate": "2026-01-01",
+            "checkOutDate": "2026-01-02", "roomType": "single", "guests": 1, "cost": 80,
+        },
+    }
+    updates = {
+        "members": {"name": "Renamed"},
+        "expenses": {"description": "Renamed", "amount": 43.5},
+        "activities": {"title": "Renamed"},
+        "drivers": {"status": "confirmed"},
+        "hotels": {"status": "confirmed"},
+    }
+    url_keys = {"members": "member_id", "expenses": "expense_id", "activities": "activity_id",
+                "drivers": "driver_id", "hotels": "hotel_id"}
+
+    def get(url, **kwargs):
+        return lambda _: client.get(url, **kwargs)
+
+    def create(collection):
+        response = client.post(f"/api/trips/{write_trip}/{collection}", json=bodies[collection]())
+        return response.get_json()["id"]
+
+    def new_trip():
+        return client.post("/api/trips", json={
+            "name": "Bench trip", "destination": "Nowhere", "startDate": "2026-02-01",
+            "endDate": "2026-02-05", "budget": 100,
+        })
+
+    counter = iter(range(10 ** 9))
+
+    def fresh_user():
+        # A separate signed-in client, for routes that end the session
+        other = app.test_client()
+        other.post("/api/auth/register", json={"username": f"fresh{next(counter)}", "password": PASSWORD})
+        return other
+
+    def events(_):
+        # The stream stays open, so this times the first chunk only
+        response = client.get(f"/api/trips/{trip_id}/events")
+        next(response.response)
+        response.close()
+        return response
+
+    cases = [
+        ("auth.register", "/api/auth/register", "POST",
+         lambda _: app.test_client().post("/api/auth/register", json={
+             "username": f"reg{next(counter)}", "password": PASSWORD}), None),
+        ("auth.login", "/api/auth/login", "POST",
+         lambda _: app.test_client().post("/api/auth/login", json={"username": username, "password": PASSWORD}), None),
+        ("auth.logout", "/api/auth/logout", "POST", lambda other: other.post("/api/auth/logout"), fresh_user),
+        ("auth.user", "/api/auth/user", "GET", get("/api/auth/user"), None),
+        ("auth.update_user", "/api/auth/user", "PUT",
+         lambda other: other.put("/api/auth/user", json={"email": "new@example.com"}), fresh_user),
+        ("auth.delete_user", "/api/auth/user", "DELETE", lambda other: other.delete("/api/auth/user"), fresh_user),
+
+        ("trips.list", "/api/trips", "GET", get("/api/trips"), None),
+        ("trips.list_summary", "/api/trips", "GET", get("/api/trips?view=summary"), None),
+        ("trips.list_page", "/api/trips", "GET", get("/api/trips?limit=20"), None),
+        ("trips.detail", "/api/trips/<id>", "GET", get(f"/api/trips/{trip_id}"), None),
+        ("trips.detail_summary", "/api/trips/<id>", "GET", get(f"/api/trips/{trip_id}?view=summary"), None),
+        ("trips.create", "/api/trips", "POST", lambda _: new_trip(), None),
+        ("trips.update", "/api/trips/<id>", "PUT",
+         lambda _: client.put(f"/api/trips/{write_trip}", json={"description": "Updated"}), None),
+        ("trips.delete", "/api/trips/<id>", "DELETE", lambda new_id: client.delete(f"/api/trips/{new_id}"),
+         lambda: new_trip().get_json()["id"]),
+
+        ("trips.export", "/api/trips/<id>/export", "GET", get(f"/api/trips/{trip_id}/export"), None),
+        ("trips.changes", "/api/trips/<id>/changes", "GET", get(f"/api/trips/{trip_id}/changes?since=0"), None),
+        ("trips.analytics", "/api/trips/<id>/analytics", "GET", get(f"/api/trips/{trip_id}/analytics"), None),
+        ("trips.settlements", "/api/trips/<id>/settlements", "GET", get(f"/api/trips/{trip_id}/settlements"), None),
+        ("trips.events", "/api/trips/<id>/events", "GET", events, None),
+        ("expenses.bulk", "/api/trips/<id>/expenses:bulk", "POST",
+         lambda _: client.post(f"/api/trips/{write_trip}/expenses:bulk", json=[bodies["expenses"]() for _ in range(100)]),
+         None),
+        # A planning flow: ten bookings in one request and one transaction
+        ("batch.plan", "/api/batch", "POST",
+         lambda _: client.post("/api/batch", json={"operations": [
+             {"op": "create", "entity": entity, "tripId": write_trip, "data": bodies[collection]()}
+             for entity, collection in [("activity", "activities")] * 5 + [("hotel", "hotels")] * 3
+             + [("driver", "drivers")] * 2
+         ]}), None),
+    ]
+    for collection, key in url_keys.items():
+        item_rule = f"/api/trips/<trip_id>/{collection}/<{key}>"
+        cases += [
+            (f"{collection}.list", f"/api/trips/<id>/{collection}", "GET",
+             get(f"/api/trips/{trip_id}/{collection}"), None),
+            (f"{collection}.list_page", f"/api/trips/<id>/{collection}", "GET",
+             get(f"/api/trips/{trip_id}/{collection}?limit=50"), None),
+            (f"{collection}.create", f"/api/trips/<id>/{collection}", "POST",
+             lambda _, collection=collection: client.post(
+                 f"/api/trips/{write_trip}/{collection}", json=bodies[collection]()), None),
+            (f"{collection}.update", item_rule, "PUT",
+             lambda item_id, collection=collection: client.put(
+                 f"/api/trips/{write_trip}/{collection}/{item_id}", json=updates[collection]),
+             (lambda: expense_id) if collection == "expenses" else (lambda collection=collection: create(collection))),
+            (f"{collection}.delete", item_rule, "DELETE",
+             lambda item_id, collection=collection: client.delete(f"/api/trips/{write_trip}/{collection}/{item_id}"),
+             lambda collection=collection: create(collection)),
+        ]
+    return cases
+
+
+def read_body(call):
+    """Include producing the body (streamed responses run their generator here)"""
+    def timed(argument):
+        response = call(argument)
+        response.get_data()
+        return response
+    return timed
+
+
+def check_route_coverage(app, cases) -> List[str]:
+    covered = {(rule, method) for _, rule, method, _, _ in cases} | set(SKIPPED_ROUTES)
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if not rule.rule.startswith("/api/"):
+            continue
+        for method in rule.methods - {"HEAD", "OPTIONS"}:
+            if (rule.rule, method) not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return sorted(missing)
+
+
+# ============================================
+# Service cases
+# ============================================
+
+def service_cases(app, dataset):
+    """[(name, call, setup)]; each call runs in its own app context"""
+    _, _, trip_ids = dataset[0]
+    trip_id, write_trip = trip_ids[0], trip_ids[1]
+    with app.app_context():
+        members = [member.id for member in TripService.get_trip_by_id(write_trip).members]
+    expense_data = {
+        "tripId": write_trip, "description": "Service bench", "amount": "19.99", "category": "food",
+        "paidById": members[0], "date": "2026-01-05", "splitAmongIds": members,
+    }
+
+    def in_context(fn):
+        def call(argument):
+            with app.app_context():
+                return fn(argument)
+        return call
+
+    def new_expense():
+        with app.app_context():
+            return ExpenseService.create_expense(dict(expense_data)).id
+
+    return [
+        ("ExpenseService.calculate_balances", in_context(lambda _: ExpenseService.calculate_balances(trip_id)), None),
+        ("ExpenseService.create_expense", in_context(lambda _: ExpenseService.create_expense(dict(expense_data))), None),
+        ("ExpenseService.update_expense",
+         in_context(lambda expense: ExpenseService.update_expense(expense, {"amount": "20.01"})), new_expense),
+        ("ExpenseService.delete_expense", in_context(ExpenseService.delete_expense), new_expense),
+        ("ExpenseService.bulk_create_expenses",
+         in_context(lambda _: ExpenseService.bulk_create_expenses(write_trip, [dict(expense_data) for _ in range(100)])),
+         None),
+        ("ExpenseService.get_expenses_by_trip", in_context(lambda _: ExpenseService.get_expenses_by_trip(trip_id)), None),
+        ("ExpenseService.get_expense_views", in_context(lambda _: ExpenseService.get_expense_views(trip_id)), None),
+        ("BalanceService.recompute_balances", in_context(lambda _: BalanceService.recompute_balances(trip_id)), None),
+        ("BalanceService.check_trip", in_context(lambda _: BalanceService.check_trip(trip_id)), None),
+        ("SettlementService.settle",
+         in_context(lambda _: SettlementService.settle(BalanceService.get_balances(trip_id))), None),
+        ("AnalyticsService.compute", in_context(lambda _: AnalyticsService.compute(trip_id)), None),
+        ("SyncService.get_changes", in_context(lambda _: SyncService.get_changes(trip_id, 0)), None),
+        ("TripService.get_trip_by_id+to_dict",
+         in_context(lambda _: TripService.get_trip_by_id(trip_id).to_dict()), None),
+        ("TripService.get_trip_detail", in_context(lambda _: TripService.get_trip_detail(trip_id)), None),
+        ("ExportService.stream_ndjson",
+         in_context(lambda _: sum(len(chunk) for chunk in ExportService.stream_ndjson(trip_id))), None),
+    ]
+
+
+# ============================================
+# Runner
+# ============================================
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale: str, repeat: int, only: Optional[str]) -> Dict[str, Any]:
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    try:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+        seed_started = time.perf_counter()
+        with app.app_context():
+            dataset = seed_dataset(scale, password=PASSWORD)
+        print(f"seeded {scale} ({SCALES[scale]}) in {time.perf_counter() - seed_started:.1f}s")
+
+        cases = route_cases(app, dataset)
+        missing = check_route_coverage(app, cases)
+        if missing:
+            print("routes without a benchmark case: " + ", ".join(missing))
+
+        routes = {}
+        for name, rule, method, call, setup in cases:
+            if only and only not in name:
+                continue
+            result = run_case(read_body(call), setup, repeat, ok=lambda response: response.status_code < 400)
+            routes[name] = dict(result, route=f"{method} {rule}")
+            print_row(name, routes[name])
+
+        services = {}
+        for name, call, setup in service_cases(app, dataset):
+            if only and only not in name:
+                continue
+            services[name] = run_case(call, setup, repeat)
+            print_row(name, services[name])
+
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "scale": scale,
+            "dataset": SCALES[scale],
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "routes": routes,
+        "services": services,
+    }
+
+
+def print_row(name, result):
+    print(f"{name:<38} p50 {result['p50Ms']:>9.2f} ms  p99 {result['p99Ms']:>9.2f} ms  "
+          f"{result['throughput'] or 0:>8.1f}/s  queries {result['queries']:>4}"
+          + (f"  errors {result['errors']}" if result["errors"] else ""))
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    print(f"\n{'case':<38} {'old p50':>10} {'new p50':>10} {'change':>8}  queries")
+    for section in ("routes", "services"):
+        for name, result in new[section].items():
+            before = old.get(section, {}).get(name)
+            if before is None:
+                continue
+            change = (result["p50Ms"] / before["p50Ms"] - 1) * 100 if before["p50Ms"] else 0.0
+            print(f"{name:<38} {before['p50Ms']:>10.2f} {result['p50Ms']:>10.2f} {change:>+7.1f}%  "
+                  f"{before['queries']} -> {result['queries']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--output", help="results file (default bench-<scale>-<commit>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.only)
+    output = args.output or f"bench-{args.scale}-{results['meta']['commit'] or 'local'}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+
+// Collections each kind of change can affect (besides the trip itself)
+const affectedCollections: Record<string, string[]> = {
+  trip: [],
+  member: ['members', 'expenses'],
+  expense: ['expenses'],
+  ledger: [],
+  activity: ['activities'],
+  driver: ['drivers'],
+  hotel: ['hotels'],
+};
+
+type ChangeEvent = { entity: string; op: string; id: string | null; count?: number };
+
+/**
+ * Subscribe to a trip's change feed (GET /api/trips/:id/events) and refetch
+ * only the queries a change touches, instead of polling. EventSource
+ * reconnects by itself and resumes from the last event id it received.
+ */
+export function useTripEvents(tripId: string | undefined) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!tripId) return;
+    const base = `/api/trips/${tripId}`;
+    const source = new EventSource(`${base}/events`, { withCredentials: true });
+
+    const onChange = (event: MessageEvent) => {
+      const change: ChangeEvent = JSON.parse(event.data);
+      queryClient.invalidateQueries({ queryKey: [base] });
+      queryClient.invalidateQueries({ queryKey: ['/api/trips'] });
+      for (const collection of affectedCollections[change.entity] ?? []) {
+        queryClient.invalidateQueries({ queryKey: [`${base}/${collection}`] });
+      }
+    };
+    // The server dropped events we missed: reload everything for the trip
+    const onReset = () => {
+      queryClient.invalidateQueries({
+        predicate: (query) => String(query.queryKey[0]).startsWith('/api/trips'),
+      });
+    };
+
+    source.addEventListener('change', onChange);
+    source.addEventListener('reset', onReset);
+    return () => source.close();
+  }, [tripId, queryClient]);
+}
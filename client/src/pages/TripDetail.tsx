@@ -6,6 +6,7 @@ import {
 } from 'lucide-react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { apiRequest } from '@/lib/queryClient';
+import { useTripEvents } from '@/hooks/use-trip-events';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
@@ -53,6 +54,9 @@ export default function TripDetail() {
     enabled: !!tripId
   });
 
+  // Other members' changes arrive over SSE instead of by re-fetching
+  useTripEvents(tripId);
+
 
 
   const [showAddExpense, setShowAddExpense] = useState(false);
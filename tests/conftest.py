@@ -0,0 +1,40 @@
+import pytest
+from backend.app import create_app
+
+TRIP = {"name": "Trip", "destination": "Lisbon", "startDate": "2026-01-01", "endDate": "2026-01-05", "budget": 1000}
+
+
+@pytest.fixture
+def app():
+    """App on a scratch in-memory database, with cheap password hashing"""
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+    })
+
+
+@pytest.fixture
+def client(app):
+    """Test client signed in as a freshly registered user"""
+    client = app.test_client()
+    response = client.post("/api/auth/register", json={"username": "tester", "password": "secret"})
+    assert response.status_code == 201
+    return client
+
+
+@pytest.fixture
+def trip(client):
+    """A trip with three members; "members" holds their ids, owner first"""
+    created = client.post("/api/trips", json=TRIP).get_json()
+    members = [created["members"][0]["id"]]
+    for name in ("Bea", "Cai"):
+        members.append(client.post(f"/api/trips/{created['id']}/members", json={"name": name}).get_json()["id"])
+    return {"id": created["id"], "members": members}
+
+
+def add_expense(client, trip, amount, paid_by, split_among, **fields):
+    """POST an expense and return the response"""
+    return client.post(f"/api/trips/{trip['id']}/expenses", json={
+        "description": "Dinner", "amount": amount, "category": "food",
+        "paidById": paid_by, "date": "2026-01-02", "splitAmongIds": split_among, **fields,
+    })
@@ -0,0 +1,83 @@
+from backend.models import db, Trip, Member, Expense
+from backend.services.balance_service import BalanceService
+
+
+def new_trip_operations():
+    """A trip, two members and a shared expense, tied together by refs"""
+    return [
+        {"op": "create", "entity": "trip", "ref": "t", "data": {
+            "name": "Batch", "destination": "Oslo", "startDate": "2026-03-01", "endDate": "2026-03-04", "budget": 500}},
+        {"op": "create", "entity": "member", "tripId": "$t", "ref": "ann", "data": {"name": "Ann"}},
+        {"op": "create", "entity": "member", "tripId": "$t", "ref": "bob", "data": {"name": "Bob"}},
+        {"op": "create", "entity": "expense", "tripId": "$t", "ref": "taxi", "data": {
+            "description": "Taxi", "amount": 20, "category": "transport", "paidById": "$ann",
+            "date": "2026-03-01", "splitAmongIds": ["$ann", "$bob"]}},
+        {"op": "update", "entity": "expense", "id": "$taxi", "data": {"amount": 30}},
+    ]
+
+
+def row_counts(app):
+    with app.app_context():
+        return tuple(
+            db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+            for model in (Trip, Member, Expense)
+        )
+
+
+def batch(client, operations, partial=False):
+    return client.post("/api/batch" + ("?partial=true" if partial else ""), json={"operations": operations})
+
+
+def test_refs_resolve_to_the_ids_written_earlier_in_the_batch(app, client):
+    response = batch(client, new_trip_operations())
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == [201, 201, 201, 201, 200]
+    trip_id, ann, bob = (results[i]["data"]["id"] for i in range(3))
+    
+    expense = results[4]["data"]
+    assert expense["tripId"] == trip_id
+    assert expense["paidById"] == ann
+    assert sorted(split["memberId"] for split in expense["splitAmong"]) == sorted([ann, bob])
+    with app.app_context():
+        assert BalanceService.check_all() == []
+        balances = BalanceService.get_balances(trip_id)
+    assert (balances[ann], balances[bob]) == (15, -15)
+
+
+def test_failing_operation_rolls_back_the_whole_batch(app, client):
+    before = row_counts(app)
+    operations = new_trip_operations() + [{"op": "update", "entity": "hotel", "id": "missing", "data": {}}]
+    response = batch(client, operations)
+    assert response.status_code == 404
+    assert response.get_json() == {"message": "Hotel not found", "index": 5}
+    assert row_counts(app) == before
+
+
+def test_unknown_ref_and_malformed_ids_are_bad_requests(app, client):
+    before = row_counts(app)
+    response = batch(client, [{"op": "create", "entity": "member", "tripId": "$nope", "data": {"name": "Z"}}])
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Unknown reference: $nope", "index": 0}
+    
+    operations = new_trip_operations()[:2] + [{"op": "delete", "entity": "member", "id": {"x": 1}}]
+    response = batch(client, operations)
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "id must be an id or a $ref string", "index": 2}
+    assert row_counts(app) == before
+
+
+def test_partial_batch_commits_the_operations_that_succeed(app, client):
+    before = row_counts(app)
+    operations = new_trip_operations()[:3] + [
+        {"op": "create", "entity": "expense", "tripId": "$t", "data": {
+            "description": "Bad", "amount": "NaN", "category": "food", "paidById": "$ann", "date": "2026-03-02"}},
+        {"op": "create", "entity": "member", "tripId": "$t", "data": {"name": "Cy"}},
+    ]
+    response = batch(client, operations, partial=True)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == [201, 201, 201, 400, 201]
+    assert results[3]["message"] == "Invalid amount: 'NaN'"
+    # Trip (plus its owner member) and three members; no expense
+    assert row_counts(app) == (before[0] + 1, before[1] + 4, before[2])
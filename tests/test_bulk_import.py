@@ -0,0 +1,87 @@
+import json
+from backend.models import db, Expense
+from backend.services.balance_service import BalanceService
+
+
+def row(paid_by, amount="12.50", **fields):
+    return {"description": "Taxi", "amount": amount, "category": "transport",
+            "paidById": paid_by, "date": "2026-01-02", **fields}
+
+
+def import_rows(client, trip, body, content_type="application/json", partial=False):
+    url = f"/api/trips/{trip['id']}/expenses:bulk" + ("?partial=true" if partial else "")
+    return client.post(url, data=body, content_type=content_type)
+
+
+def expense_count(app, trip):
+    with app.app_context():
+        return db.session.execute(db.select(db.func.count()).select_from(Expense).filter_by(trip_id=trip["id"])).scalar()
+
+
+def test_valid_rows_are_all_created(app, client, trip):
+    owner, bea, _ = trip["members"]
+    rows = [row(owner, splitAmongIds=[owner, bea]), row(bea, "7")]
+    response = import_rows(client, trip, json.dumps(rows))
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 2
+    assert [result["status"] for result in response.get_json()["results"]] == ["created", "created"]
+    assert expense_count(app, trip) == 2
+    with app.app_context():
+        assert BalanceService.check_all() == []
+
+
+def test_one_invalid_row_rejects_the_whole_import(app, client, trip):
+    owner = trip["members"][0]
+    rows = [row(owner), row("not-a-member"), row(owner, amount="")]
+    response = import_rows(client, trip, json.dumps(rows))
+    assert response.status_code == 400
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == ["skipped", "error", "error"]
+    assert results[1]["message"] == "paidById not-a-member is not a member of this trip"
+    assert results[2]["message"] == "Missing field: 'amount'"
+    assert expense_count(app, trip) == 0
+
+
+def test_partial_import_keeps_the_valid_rows(app, client, trip):
+    owner = trip["members"][0]
+    rows = [row(owner), row("not-a-member"), row(owner)]
+    response = import_rows(client, trip, json.dumps(rows), partial=True)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 2
+    assert [result["status"] for result in body["results"]] == ["created", "error", "created"]
+    assert expense_count(app, trip) == 2
+
+
+def test_ndjson_reports_unparsable_lines_with_their_line_number(app, client, trip):
+    owner = trip["members"][0]
+    lines = [json.dumps(row(owner)), "", "{not json", json.dumps(row(owner))]
+    response = import_rows(client, trip, "\n".join(lines) + "\n", "application/x-ndjson", partial=True)
+    assert response.status_code == 201
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == ["created", "error", "created"]
+    assert results[1]["message"].startswith("Line 3: invalid JSON")
+    assert expense_count(app, trip) == 2
+
+
+def test_csv_rows_with_split_lists_and_errors(app, client, trip):
+    owner, bea, cai = trip["members"]
+    body = (
+        "description,amount,category,paidById,date,splitAmongIds\n"
+        f"Lunch,30,food,{owner},2026-01-02,{owner};{bea};{cai}\n"
+        f"Museum,abc,culture,{owner},2026-01-03,\n"
+    )
+    response = import_rows(client, trip, body, "text/csv")
+    assert response.status_code == 400
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == ["skipped", "error"]
+    assert results[1]["message"] == "Invalid amount: 'abc'"
+    
+    response = import_rows(client, trip, body, "text/csv", partial=True)
+    assert response.get_json()["created"] == 1
+    expense = client.get(f"/api/trips/{trip['id']}/expenses").get_json()[0]
+    assert sorted(split["memberId"] for split in expense["splitAmong"]) == sorted([owner, bea, cai])
+
+
+def test_unsupported_content_type(client, trip):
+    assert import_rows(client, trip, "x", "text/plain").status_code == 415
@@ -0,0 +1,44 @@
+import pytest
+from tests.conftest import add_expense
+
+
+def etag_of(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_matching_etag_is_answered_with_304(client, trip):
+    url = f"/api/trips/{trip['id']}"
+    etag = etag_of(client, url)
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("path, variants", [
+    ("", ["", "?view=summary", "?fields=name,budget", "?fields=budget,name"]),
+    ("/expenses", ["", "?paidBy=ref", "?limit=1", "?limit=2"]),
+    ("/export", ["", "?format=csv&table=expenses", "?format=csv&table=members", "?table=members"]),
+])
+def test_each_representation_has_its_own_etag(client, trip, path, variants):
+    owner = trip["members"][0]
+    add_expense(client, trip, 30, owner, [owner])
+    add_expense(client, trip, 20, owner, [owner])
+    base = f"/api/trips/{trip['id']}{path}"
+    etags = [etag_of(client, base + query) for query in variants]
+    assert len(set(etags)) == len(etags)
+    
+    # Revalidating one variant with another's ETag gets the full body
+    response = client.get(base + variants[1], headers={"If-None-Match": etags[0]})
+    assert response.status_code == 200
+
+
+def test_parameter_order_does_not_change_the_etag(client, trip):
+    base = f"/api/trips/{trip['id']}/export"
+    assert etag_of(client, base + "?format=csv&table=expenses") == etag_of(client, base + "?table=expenses&format=csv")
+
+
+def test_routes_of_one_trip_have_different_etags(client, trip):
+    base = f"/api/trips/{trip['id']}"
+    assert etag_of(client, base + "/members") != etag_of(client, base + "/hotels")
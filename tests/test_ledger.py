@@ -0,0 +1,53 @@
+from decimal import Decimal
+from sqlalchemy import text
+from backend.models import db
+from backend.services.balance_service import BalanceService
+from tests.conftest import add_expense
+
+
+def balances(app, trip):
+    """Ledger balances, after checking they match a recompute from the splits"""
+    with app.app_context():
+        assert BalanceService.check_all() == []
+        return BalanceService.get_balances(trip["id"])
+
+
+def test_ledger_follows_expense_writes(app, client, trip):
+    owner, bea, cai = trip["members"]
+    base = f"/api/trips/{trip['id']}/expenses"
+    first = add_expense(client, trip, 90, owner, [owner, bea, cai]).get_json()
+    second = add_expense(client, trip, "30.50", bea, [owner, bea]).get_json()
+    assert balances(app, trip) == {owner: Decimal("44.75"), bea: Decimal("-14.75"), cai: Decimal("-30.00")}
+    
+    client.put(f"{base}/{first['id']}", json={"amount": 60, "splitAmongIds": [bea, cai]})
+    client.put(f"{base}/{second['id']}", json={"paidById": cai})
+    assert balances(app, trip) == {owner: Decimal("44.75"), bea: Decimal("-45.25"), cai: Decimal("0.50")}
+    
+    client.delete(f"{base}/{first['id']}")
+    assert balances(app, trip) == {owner: Decimal("-15.25"), bea: Decimal("-15.25"), cai: Decimal("30.50")}
+
+
+def test_ledger_after_member_delete(app, client, trip):
+    owner, bea, cai = trip["members"]
+    add_expense(client, trip, 90, owner, [owner, bea, cai])
+    client.delete(f"/api/trips/{trip['id']}/members/{cai}")
+    assert cai not in balances(app, trip)
+
+
+def test_check_balances_reports_and_repairs_drift(app, client, trip):
+    owner, bea, cai = trip["members"]
+    add_expense(client, trip, 90, owner, [owner, bea, cai])
+    with app.app_context():
+        db.session.execute(text("UPDATE member_balances SET balance = balance + 1 WHERE member_id = :id"), {"id": bea})
+        db.session.commit()
+    
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["check-balances"])
+    assert result.exit_code != 0
+    assert f"member {bea}: stored -29.99, expected -30.00" in result.output
+    
+    result = runner.invoke(args=["check-balances", "--repair"])
+    assert result.exit_code == 0
+    assert "Repaired 1 ledger entries." in result.output
+    assert balances(app, trip)[bea] == Decimal("-30.00")
+    assert "Ledger is consistent." in runner.invoke(args=["check-balances"]).output
@@ -0,0 +1,94 @@
+import threading
+import pytest
+from backend import passwords
+from backend.app import create_app
+from backend.passwords import LoginThrottle
+
+
+def make_client(**config):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+        "LOGIN_LIMIT_PER_USER": 3,
+        "LOGIN_LIMIT_PER_ADDRESS": 10,
+        "PASSWORD_HASH_QUEUE": 64,
+        **config,
+    })
+    client = app.test_client()
+    client.post("/api/auth/register", json={"username": "ann", "password": "right"})
+    client.post("/api/auth/logout")
+    return client
+
+
+def login(client, password, username="ann", **kwargs):
+    return client.post("/api/auth/login", json={"username": username, "password": password}, **kwargs)
+
+
+def test_user_is_locked_out_after_the_limit():
+    client = make_client()
+    assert [login(client, "wrong").status_code for _ in range(3)] == [401, 401, 401]
+    response = login(client, "right")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_successful_login_clears_the_user_failures():
+    client = make_client()
+    codes = [login(client, password).status_code for password in ("wrong", "wrong", "right", "wrong", "wrong", "wrong", "wrong")]
+    assert codes == [401, 401, 200, 401, 401, 401, 429]
+
+
+def test_concurrent_burst_cannot_exceed_the_limit():
+    client = make_client(PASSWORD_HASH_WORKERS=8)
+    codes = []
+    start = threading.Barrier(20)
+    
+    def attempt():
+        start.wait()
+        codes.append(login(client.application.test_client(), "wrong").status_code)
+    
+    threads = [threading.Thread(target=attempt) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(codes) == [401] * 3 + [429] * 17
+
+
+def test_attempt_is_released_when_the_hash_pool_is_busy(monkeypatch):
+    client = make_client()
+    
+    def busy(password_hash, password):
+        raise passwords.HashPoolBusy("busy")
+    
+    monkeypatch.setattr(passwords.hasher, "verify", busy)
+    assert [login(client, "wrong").status_code for _ in range(5)] == [503] * 5
+    monkeypatch.undo()
+    assert [login(client, "wrong").status_code for _ in range(3)] == [401, 401, 401]
+
+
+def test_per_address_limit_uses_forwarded_address_with_proxy_hops():
+    client = make_client(PROXY_HOPS=1, LOGIN_LIMIT_PER_ADDRESS=2, LOGIN_LIMIT_PER_USER=0)
+    first = {"X-Forwarded-For": "203.0.113.1"}
+    assert [login(client, "wrong", headers=first).status_code for _ in range(3)] == [401, 401, 429]
+    assert login(client, "wrong", headers={"X-Forwarded-For": "203.0.113.2"}).status_code == 401
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(passwords.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_success_gives_back_its_own_reservation(clock):
+    throttle = LoginThrottle(per_user=0, per_address=2, window=10)
+    first = throttle.reserve("ann", "10.0.0.1")
+    clock[0] = 5
+    throttle.reserve("bob", "10.0.0.1")
+    # ann's attempt (t=0) succeeds; bob's (t=5) must stay counted
+    throttle.succeeded(first)
+    clock[0] = 6
+    assert throttle.reserve("cy", "10.0.0.1").retry_after == 0
+    clock[0] = 11
+    assert throttle.reserve("dee", "10.0.0.1").retry_after == 4
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text, Integer
+from backend import migrations
+
+
+@pytest.fixture
+def legacy_engine():
+    """An expenses table from before money was stored as integer cents"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE expenses (id VARCHAR PRIMARY KEY, amount VARCHAR)"))
+    return engine
+
+
+def insert_amounts(engine, amounts):
+    with engine.begin() as conn:
+        for i, amount in enumerate(amounts):
+            conn.execute(text("INSERT INTO expenses (id, amount) VALUES (:id, :amount)"), {"id": f"e{i}", "amount": amount})
+
+
+def test_money_columns_are_converted_to_cents(legacy_engine):
+    insert_amounts(legacy_engine, ["12.50", " 3 ", "0", "", None])
+    assert migrations.migrate_money_columns(legacy_engine) == ["expenses"]
+    
+    with legacy_engine.connect() as conn:
+        amounts = conn.execute(text("SELECT amount FROM expenses ORDER BY id")).scalars().all()
+    assert amounts == [1250, 300, 0, None, None]
+    column = next(c for c in inspect(legacy_engine).get_columns("expenses") if c["name"] == "amount")
+    assert isinstance(column["type"], Integer)
+
+
+def test_unparsable_money_values_abort_the_conversion(legacy_engine):
+    insert_amounts(legacy_engine, ["12.50", "$20", "approx 50", "20 USD"])
+    with pytest.raises(migrations.MigrationError) as error:
+        migrations.migrate_money_columns(legacy_engine)
+    
+    message = str(error.value)
+    assert message.startswith("3 money values are not numbers")
+    assert "expenses.amount='$20' (id e1)" in message
+    # Nothing was converted
+    with legacy_engine.connect() as conn:
+        amounts = conn.execute(text("SELECT amount FROM expenses ORDER BY id")).scalars().all()
+    assert amounts == ["12.50", "$20", "approx 50", "20 USD"]
@@ -0,0 +1,63 @@
+from decimal import Decimal
+import pytest
+from backend.models import to_money
+from tests.conftest import TRIP, add_expense
+
+
+@pytest.mark.parametrize("value", ["NaN", "nan", "Infinity", "-inf", float("nan"), "12abc"])
+def test_to_money_rejects_non_finite_and_garbage(value):
+    with pytest.raises(ValueError):
+        to_money(value)
+
+
+def test_to_money_rounds_to_cents():
+    assert to_money("10.005") == Decimal("10.01")
+    assert to_money("") is None
+    assert to_money(None, blank=Decimal(0)) == Decimal(0)
+
+
+def test_nan_amount_is_a_bad_request(client, trip):
+    owner = trip["members"][0]
+    assert add_expense(client, trip, "NaN", owner, [owner]).status_code == 400
+    # json accepts a bare NaN literal
+    response = client.post(
+        f"/api/trips/{trip['id']}/expenses",
+        data='{"description": "x", "amount": NaN, "category": "food", "paidById": "%s", "date": "2026-01-02"}' % owner,
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert client.put(f"/api/trips/{trip['id']}", json={"budget": "NaN"}).status_code == 400
+
+
+def test_nan_amount_in_bulk_import_is_a_row_error(client, trip):
+    owner = trip["members"][0]
+    row = {"description": "x", "amount": "NaN", "category": "food", "paidById": owner, "date": "2026-01-02"}
+    response = client.post(f"/api/trips/{trip['id']}/expenses:bulk", json=[row])
+    assert response.status_code == 400
+    assert response.get_json()["results"][0]["status"] == "error"
+
+
+def test_blank_budget_is_stored_as_zero(client):
+    response = client.post("/api/trips", json={**TRIP, "budget": ""})
+    assert response.status_code == 201
+    assert response.get_json()["budget"] == 0
+
+
+def test_blank_driver_and_hotel_cost_is_stored_as_zero(client, trip):
+    driver = client.post(f"/api/trips/{trip['id']}/drivers", json={
+        "name": "D", "contact": "c", "vehicleType": "car", "pickupLocation": "a",
+        "dropoffLocation": "b", "date": "2026-01-02", "cost": "",
+    })
+    assert driver.status_code == 201 and driver.get_json()["cost"] == 0
+    hotel = client.post(f"/api/trips/{trip['id']}/hotels", json={
+        "hotelName": "H", "location": "l", "checkInDate": "2026-01-01",
+        "checkOutDate": "2026-01-03", "roomType": "double", "guests": 2, "cost": "",
+    })
+    assert hotel.status_code == 201 and hotel.get_json()["cost"] == 0
+
+
+def test_blank_expense_amount_is_a_missing_field(client, trip):
+    owner = trip["members"][0]
+    response = add_expense(client, trip, "", owner, [owner])
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Missing field: amount"
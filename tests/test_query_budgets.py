@@ -0,0 +1,25 @@
+"""Per-route query budgets (see benchmarks/query_budgets.py)"""
+import pytest
+from benchmarks.query_budgets import ENDPOINT_BUDGETS, NOT_MODIFIED_BUDGET, SCALES, measure
+
+
+@pytest.fixture(scope="module")
+def counts():
+    """{endpoint: query count} for each data scale"""
+    return [measure(scale) for scale in SCALES]
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINT_BUDGETS))
+def test_endpoint_within_budget(counts, endpoint):
+    per_scale = [result[endpoint] for result in counts]
+    assert max(per_scale) <= ENDPOINT_BUDGETS[endpoint], f"{endpoint} ran {per_scale} queries"
+    assert len(set(per_scale)) == 1, f"{endpoint} query count grows with data: {per_scale}"
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINT_BUDGETS))
+def test_not_modified_within_budget(counts, endpoint):
+    key = endpoint + " (304)"
+    per_scale = [result[key] for result in counts if key in result]
+    if not per_scale:
+        pytest.skip(f"{endpoint} sends no ETag")
+    assert max(per_scale) <= NOT_MODIFIED_BUDGET, f"{endpoint} 304 ran {per_scale} queries"
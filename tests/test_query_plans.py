@@ -0,0 +1,7 @@
+"""No service query may full-scan a table (see benchmarks/query_plans.py)"""
+from benchmarks.query_plans import check
+
+
+def test_no_full_table_scans():
+    failures = check()
+    assert not failures, "full table scans:\n" + "\n".join(failures)
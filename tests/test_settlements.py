@@ -0,0 +1,66 @@
+import random
+from decimal import Decimal
+import pytest
+from backend.services.settlement_service import SettlementService
+from tests.conftest import add_expense
+
+
+def settled(balances, transfers):
+    """Balances left after applying the transfers (all zero when settled)"""
+    left = dict(balances)
+    for debtor, creditor, amount in transfers:
+        assert amount > 0
+        left[debtor] += amount
+        left[creditor] -= amount
+    return left
+
+
+def test_exact_solver_beats_greedy_when_balances_split_into_groups():
+    # {c: 4, f: -4} settles on its own, which greedy matching misses
+    balances = {"a": 7, "b": -2, "c": 4, "d": -2, "e": -3, "f": -4}
+    greedy = SettlementService.greedy_transfers(balances)
+    exact = SettlementService.exact_transfers(balances)
+    assert len(greedy) == 5
+    assert len(exact) == 4
+    assert not any(settled(balances, exact).values())
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_exact_solver_settles_with_no_more_transfers_than_greedy(seed):
+    rng = random.Random(seed)
+    amounts = [rng.randint(-5000, 5000) for _ in range(rng.randint(2, 7))]
+    balances = {f"m{i}": amount for i, amount in enumerate(amounts + [-sum(amounts)])}
+    exact = SettlementService.exact_transfers(balances)
+    assert not any(settled(balances, exact).values())
+    assert len(exact) <= len(SettlementService.greedy_transfers(balances))
+    assert len(exact) <= max(0, sum(1 for amount in balances.values() if amount) - 1)
+
+
+def test_rounding_residue_goes_to_the_largest_creditor():
+    plan = SettlementService.settle({"a": Decimal("10.01"), "b": Decimal("-5.00"), "c": Decimal("-5.00")})
+    assert plan["mode"] == "exact"
+    received = sum(transfer["amount"] for transfer in plan["transfers"] if transfer["toMemberId"] == "a")
+    assert received == pytest.approx(10.00)
+    assert {transfer["fromMemberId"] for transfer in plan["transfers"]} == {"b", "c"}
+
+
+def test_greedy_solver_above_the_exact_limit():
+    balances = {f"m{i}": Decimal(i + 1) for i in range(5)}
+    balances["payer"] = -sum(balances.values())
+    plan = SettlementService.settle(balances, exact_limit=3)
+    assert plan["mode"] == "greedy"
+    assert len(plan["transfers"]) == 5
+
+
+def test_settlements_endpoint_follows_expenses(client, trip):
+    owner, bea, cai = trip["members"]
+    add_expense(client, trip, 90, owner, [owner, bea, cai])
+    plan = client.get(f"/api/trips/{trip['id']}/settlements").get_json()
+    transfers = {(t["fromMemberId"], t["toMemberId"]): t["amount"] for t in plan["transfers"]}
+    assert transfers == {(bea, owner): 30.0, (cai, owner): 30.0}
+    
+    # The cached plan is replaced after the next write; Bea is now even
+    add_expense(client, trip, 60, bea, [bea, cai])
+    plan = client.get(f"/api/trips/{trip['id']}/settlements").get_json()
+    transfers = {(t["fromMemberId"], t["toMemberId"]): t["amount"] for t in plan["transfers"]}
+    assert transfers == {(cai, owner): 60.0}
@@ -0,0 +1,61 @@
+from backend.services.cache import trip_cache
+from backend.services.hotel_service import HotelService
+from tests.conftest import add_expense
+
+HOTEL = {"hotelName": "Harbour Inn", "location": "Porto", "checkInDate": "2026-01-01",
+         "checkOutDate": "2026-01-03", "roomType": "double", "guests": 2, "cost": 200}
+
+
+def counters():
+    return trip_cache.stats()
+
+
+def test_repeat_reads_are_served_from_the_cache(client, trip):
+    url = f"/api/trips/{trip['id']}"
+    first = client.get(url).get_json()
+    before = counters()
+    assert client.get(url).get_json() == first
+    after = counters()
+    assert after["localHits"] == before["localHits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+def test_write_invalidates_cached_reads_and_etags(client, trip):
+    owner = trip["members"][0]
+    url = f"/api/trips/{trip['id']}"
+    detail = client.get(url)
+    expenses = client.get(url + "/expenses")
+    assert detail.get_json()["expenses"] == [] and expenses.get_json() == []
+    
+    add_expense(client, trip, 45, owner, [owner])
+    
+    for response, path in ((detail, ""), (expenses, "/expenses")):
+        fresh = client.get(url + path, headers={"If-None-Match": response.headers["ETag"]})
+        assert fresh.status_code == 200
+        assert fresh.headers["ETag"] != response.headers["ETag"]
+    assert client.get(url).get_json()["expenses"][0]["amount"] == 45
+    assert client.get(url + "/expenses").get_json()[0]["amount"] == 45
+
+
+def test_collection_write_invalidates_that_collection(client, trip):
+    url = f"/api/trips/{trip['id']}/hotels"
+    assert client.get(url).get_json() == []
+    client.post(url, json=HOTEL)
+    assert [hotel["hotelName"] for hotel in client.get(url).get_json()] == ["Harbour Inn"]
+    
+    hotel_id = client.get(url).get_json()[0]["id"]
+    client.put(f"{url}/{hotel_id}", json={"hotelName": "Riverside"})
+    assert client.get(url).get_json()[0]["hotelName"] == "Riverside"
+    client.delete(f"{url}/{hotel_id}")
+    assert client.get(url).get_json() == []
+
+
+def test_write_outside_a_request_invalidates_too(app, client, trip):
+    # As another worker process would: the revision bump is in the database
+    url = f"/api/trips/{trip['id']}/hotels"
+    etag = client.get(url).headers["ETag"]
+    with app.app_context():
+        HotelService.book_hotel({**HOTEL, "tripId": trip["id"]})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
@@ -0,0 +1,44 @@
+from backend.models import db, User
+from backend.query_counter import QueryCounter
+from backend.services.cache import user_cache
+
+
+def current_user_id(app):
+    with app.app_context():
+        return db.session.execute(db.select(User.id).filter_by(username="tester")).scalar()
+
+
+def test_cached_user_saves_the_lookup(client):
+    client.get("/api/auth/user")
+    with QueryCounter() as counter:
+        response = client.get("/api/auth/user")
+    assert response.status_code == 200
+    assert response.get_json()["username"] == "tester"
+    assert counter.count == 0
+
+
+def test_password_hash_is_not_cached(app, client):
+    client.get("/api/auth/user")
+    _, columns = user_cache._entries[current_user_id(app)]
+    assert "password_hash" not in columns
+    assert columns["username"] == "tester"
+
+
+def test_password_change_through_a_cached_user(app, client):
+    client.get("/api/auth/user")
+    assert client.put("/api/auth/user", json={"password": "changed"}).status_code == 200
+    client.post("/api/auth/logout")
+    login = lambda password: client.post("/api/auth/login", json={"username": "tester", "password": password})
+    assert login("secret").status_code == 401
+    assert login("changed").status_code == 200
+
+
+def test_profile_update_and_delete_forget_the_entry(app, client):
+    client.get("/api/auth/user")
+    client.put("/api/auth/user", json={"email": "t@example.com"})
+    assert client.get("/api/auth/user").get_json()["email"] == "t@example.com"
+    
+    user_id = current_user_id(app)
+    assert client.delete("/api/auth/user").status_code == 200
+    assert user_id not in user_cache._entries
+    assert client.get("/api/trips").status_code == 401
@@ -0,0 +1,45 @@
+import sqlite3
+import pytest
+from sqlalchemy.exc import OperationalError
+from backend.app import create_app
+from backend.services import transaction
+
+
+def locked():
+    return OperationalError("UPDATE trips ...", {}, sqlite3.OperationalError("database is locked"))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(transaction.time, "sleep", delays.append)
+    monkeypatch.setattr(transaction.random, "uniform", lambda low, high: 1.0)
+    return delays
+
+
+def test_retry_settings_come_from_the_environment(monkeypatch, sleeps):
+    monkeypatch.setenv("WRITE_RETRY_ATTEMPTS", "3")
+    monkeypatch.setenv("WRITE_RETRY_DELAY", "0.5")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    calls = []
+    
+    def write():
+        calls.append(1)
+        if len(calls) < 3:
+            raise locked()
+        return "done"
+    
+    with app.app_context():
+        assert transaction.run_with_retry(write) == "done"
+    assert sleeps == [0.5, 1.0]
+
+
+def test_gives_up_after_the_configured_attempts(sleeps):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "WRITE_RETRY_ATTEMPTS": 2})
+    
+    def write():
+        raise locked()
+    
+    with app.app_context(), pytest.raises(OperationalError):
+        transaction.run_with_retry(write)
+    assert len(sleeps) == 1